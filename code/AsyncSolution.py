@@ -0,0 +1,347 @@
+# asyncio counterpart of the Solution.py API, for callers running on an event loop.
+# built on asyncpg (pinned in requirements.txt; without it this module imports but cannot connect, and AsyncTest
+# is skipped) and one asyncpg connection pool per process.
+# the SQL is Solution.statements (asyncpg understands the same $n placeholders and prepares each statement once per
+# connection), the entity caches are Solution's, and every function returns what its Solution.py namesake returns.
+# arguments are sent as typed parameters, so they must have the Python type of their column; Solution.py inlines
+# them as literals and lets the server cast.
+# the pool belongs to the event loop that created it: connect() / close() from the loop that makes the calls
+import asyncio
+from typing import Iterable, List
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.ReturnValue import ReturnValue
+from Utility.Exceptions import DatabaseException
+from Utility.Cache import LRUCache
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+from Business.DiskSummary import DiskSummary
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+
+# ************************************** our auxiliary functions start **************************************
+
+# SQLSTATE of a failed insert -> ReturnValue, the same mapping as Solution.add
+add_violations = {
+    "23502": ReturnValue.BAD_PARAMS,
+    "23514": ReturnValue.BAD_PARAMS,
+    "23503": ReturnValue.NOT_EXISTS,
+    "23505": ReturnValue.ALREADY_EXISTS,
+}
+# addPhotoToDisk looks both ids up inside its INSERT, a missing photo or disk is a NOT NULL violation
+place_violations = {
+    "23502": ReturnValue.NOT_EXISTS,
+    "23505": ReturnValue.ALREADY_EXISTS,
+    "23514": ReturnValue.BAD_PARAMS,
+}
+
+pool = None
+pool_lock = None
+
+
+# asyncpg.connect keyword arguments for the database.ini settings DBConnector uses
+def connect_params(params) -> dict:
+    return {'host': params.get('host'),
+            'port': int(params['port']) if params.get('port') else None,
+            'user': params.get('user'),
+            'password': params.get('password'),
+            'database': params.get('database', params.get('dbname'))}
+
+
+async def get_pool():
+    global pool_lock
+    if pool is None:
+        if pool_lock is None:
+            pool_lock = asyncio.Lock()
+        async with pool_lock:
+            if pool is None:
+                await connect()
+    return pool
+
+
+def affected(status: str) -> int:
+    # asyncpg returns the command tag, e.g. "DELETE 1" or "INSERT 0 1"
+    try:
+        return int(status.rsplit(" ", 1)[-1])
+    except (AttributeError, ValueError):
+        return 0
+
+
+# generically run an insert-like statement
+async def add(name, *params, violations=add_violations) -> ReturnValue:
+    try:
+        async with (await get_pool()).acquire() as conn:
+            await conn.execute(Solution.statements[name], *params)
+    except Exception as e:
+        return violations.get(getattr(e, 'sqlstate', None), ReturnValue.ERROR)
+    return ReturnValue.OK
+
+
+# generically run a delete-like statement
+async def delete(name, *params, is_ram_or_disk=False) -> ReturnValue:
+    try:
+        async with (await get_pool()).acquire() as conn:
+            status = await conn.execute(Solution.statements[name], *params)
+    except Exception as e:
+        return ReturnValue.ERROR
+    if is_ram_or_disk and affected(status) == 0:
+        return ReturnValue.NOT_EXISTS
+    return ReturnValue.OK
+
+
+# the first column of the first row, default when there is no row and error when the query fails
+async def fetch_value(name, *params, default=None, error=None):
+    try:
+        async with (await get_pool()).acquire() as conn:
+            row = await conn.fetchrow(Solution.statements[name], *params)
+    except Exception as e:
+        return error
+    return default if row is None else row[0]
+
+
+async def fetch_ids(name, *params) -> List[int]:
+    try:
+        async with (await get_pool()).acquire() as conn:
+            rows = await conn.fetch(Solution.statements[name], *params)
+    except Exception as e:
+        return []
+    return [row[0] for row in rows]
+
+
+# a cached or freshly read row of table as the constructor arguments of its business object, None if missing
+async def fetch_entity(table, name, entity_id, to_args):
+    cached = Solution.cached_entity(table, entity_id)
+    if cached is not LRUCache.MISSING:
+        return cached
+    generation = Solution.entity_generation(table)
+    try:
+        async with (await get_pool()).acquire() as conn:
+            row = await conn.fetchrow(Solution.statements[name], entity_id)
+    except Exception as e:
+        return None
+    if row is None:
+        return None
+    args = to_args(tuple(row))
+    Solution.cache_entity(table, entity_id, args, generation)
+    return args
+
+# ************************************** our auxiliary functions end **************************************
+
+# ************************************** Database functions start **************************************
+
+# open the pool (replacing an open one), with the connection settings DBConnector resolved
+async def connect(minSize: int = 1, maxSize: int = 10):
+    global pool
+    if asyncpg is None:
+        raise DatabaseException.ConnectionInvalid("AsyncSolution needs asyncpg, pip install asyncpg")
+    old = pool
+    pool = await asyncpg.create_pool(min_size=minSize, max_size=maxSize,
+                                     **connect_params(DBConnector.getSettings().params))
+    if old is not None:
+        await old.close()
+    return pool
+
+
+async def close():
+    global pool
+    old, pool = pool, None
+    if old is not None:
+        await old.close()
+
+# ************************************** Database functions end **************************************
+
+# ************************************** CRUD API functions start **************************************
+
+async def addPhoto(photo: Photo) -> ReturnValue:
+    result = await add("addPhoto", photo.getPhotoID(), photo.getDescription(), photo.getSize())
+    Solution.invalidate_entities("Photo", photo.getPhotoID())
+    return result
+
+
+async def getPhotoByID(photoID: int) -> Photo:
+    args = await fetch_entity("Photo", "getPhotoByID", photoID, lambda row: row)
+    return Photo.badPhoto() if args is None else Photo(*args)
+
+
+async def deletePhoto(photo: Photo) -> ReturnValue:
+    result = await delete("deletePhoto", photo.getPhotoID(), photo.getDescription(), photo.getSize(),
+                          is_ram_or_disk=True)
+    if result == ReturnValue.OK:
+        Solution.co_locate("removePhoto", photo.getPhotoID())
+    elif result == ReturnValue.NOT_EXISTS:
+        result = ReturnValue.OK
+    Solution.invalidate_entities("Photo", photo.getPhotoID())
+    Solution.clear_entities("Disk")
+    return result
+
+
+async def addDisk(disk: Disk) -> ReturnValue:
+    result = await add("addDisk", disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                       disk.getCost())
+    Solution.invalidate_entities("Disk", disk.getDiskID())
+    return result
+
+
+async def getDiskByID(diskID: int) -> Disk:
+    args = await fetch_entity("Disk", "getDiskByID", diskID, lambda row: row)
+    return Disk.badDisk() if args is None else Disk(*args)
+
+
+async def deleteDisk(diskID: int) -> ReturnValue:
+    result = await delete("deleteDisk", diskID, is_ram_or_disk=True)
+    if result == ReturnValue.OK:
+        Solution.co_locate("removeDisk", diskID)
+    Solution.invalidate_entities("Disk", diskID)
+    return result
+
+
+async def addRAM(ram: RAM) -> ReturnValue:
+    result = await add("addRAM", ram.getRamID(), ram.getSize(), ram.getCompany())
+    Solution.invalidate_entities("RAM", ram.getRamID())
+    return result
+
+
+async def getRAMByID(ramID: int) -> RAM:
+    # the table stores (id, size, company), RAM takes (id, company, size)
+    args = await fetch_entity("RAM", "getRAMByID", ramID, lambda row: (row[0], row[2], row[1]))
+    return RAM.badRAM() if args is None else RAM(*args)
+
+
+async def deleteRAM(ramID: int) -> ReturnValue:
+    result = await delete("deleteRAM", ramID, is_ram_or_disk=True)
+    Solution.invalidate_entities("RAM", ramID)
+    return result
+
+
+async def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
+    result = ReturnValue.OK
+    try:
+        async with (await get_pool()).acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(Solution.statements["addDisk"], disk.getDiskID(), disk.getCompany(),
+                                   disk.getSpeed(), disk.getFreeSpace(), disk.getCost())
+                await conn.execute(Solution.statements["addPhoto"], photo.getPhotoID(), photo.getDescription(),
+                                   photo.getSize())
+    except Exception as e:
+        result = add_violations.get(getattr(e, 'sqlstate', None), ReturnValue.ERROR)
+    Solution.invalidate_entities("Disk", disk.getDiskID())
+    Solution.invalidate_entities("Photo", photo.getPhotoID())
+    return result
+
+# ************************************** CRUD API functions end **************************************
+
+# ************************************** BASIC API functions start **************************************
+
+async def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
+    result = await add("addPhotoToDisk", photo.getPhotoID(), photo.getDescription(), photo.getSize(), diskID,
+                       violations=place_violations)
+    if result == ReturnValue.OK:
+        Solution.co_locate("add", photo.getPhotoID(), diskID)
+    Solution.invalidate_entities("Disk", diskID)
+    return result
+
+
+async def removePhotoFromDisk(photo: Photo, diskID: int) -> ReturnValue:
+    result = await delete("removePhotoFromDisk", photo.getPhotoID(), diskID)
+    if result == ReturnValue.OK:
+        Solution.co_locate("remove", photo.getPhotoID(), diskID)
+    Solution.invalidate_entities("Disk", diskID)
+    return result
+
+
+async def addRAMToDisk(ramID: int, diskID: int) -> ReturnValue:
+    return await add("addRAMToDisk", ramID, diskID)
+
+
+async def removeRAMFromDisk(ramID: int, diskID: int) -> ReturnValue:
+    return await delete("removeRAMFromDisk", ramID, diskID, is_ram_or_disk=True)
+
+
+async def averagePhotosSizeOnDisk(diskID: int) -> float:
+    return await fetch_value("averagePhotosSizeOnDisk", diskID, default=0, error=-1)
+
+
+async def getTotalRamOnDisk(diskID: int) -> int:
+    return await fetch_value("getTotalRamOnDisk", diskID, default=0, error=-1)
+
+
+async def getCostForDescription(description: str) -> int:
+    return await fetch_value("getCostForDescription", description, default=0, error=-1)
+
+
+async def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
+    return await fetch_ids("getPhotosCanBeAddedToDisk", diskID)
+
+
+async def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
+    return await fetch_ids("getPhotosCanBeAddedToDiskAndRAM", diskID)
+
+
+async def isCompanyExclusive(diskID: int) -> bool:
+    return await fetch_value("isCompanyExclusive", diskID, default=False, error=False)
+
+
+async def isDiskContainingAtLeastNumExists(description: str, num: int) -> bool:
+    return await fetch_value("isDiskContainingAtLeastNumExists", description, num, default=False, error=False)
+
+
+async def getDisksContainingTheMostData(k: int = 5) -> List[int]:
+    return await fetch_ids("getDisksContainingTheMostData", k)
+
+async def getDiskSummary(diskID: int) -> DiskSummary:
+    return (await getDiskSummaries([diskID]))[0]
+
+
+async def getDiskSummaries(diskIDs: Iterable[int]) -> List[DiskSummary]:
+    diskIDs = list(diskIDs)
+    if not diskIDs:
+        return []
+    try:
+        async with (await get_pool()).acquire() as conn:
+            rows = await conn.fetch(Solution.statements["getDiskSummaries"], diskIDs)
+    except Exception as e:
+        return [DiskSummary.badDiskSummary() for _ in diskIDs]
+    summaries = {row[0]: tuple(row) for row in rows}
+    return [Solution.disk_summary(summaries[disk_id]) for disk_id in diskIDs]
+
+# ************************************** BASIC API functions end **************************************
+
+# ************************************** ADVANCED API functions start **************************************
+
+async def getConflictingDisks() -> List[int]:
+    return await fetch_ids("getConflictingDisks")
+
+
+async def mostAvailableDisks() -> List[int]:
+    return await fetch_ids("mostAvailableDisks")
+
+
+async def getClosePhotos(photoID: int) -> List[int]:
+    index = Solution.co_location_index
+    if index is not None and type(photoID) is int:
+        close = index.closePhotos(photoID)
+        if close is not None:
+            return close
+    return await fetch_ids("getClosePhotos", photoID)
+
+
+async def getClosePhotosMany(photoIDs: Iterable[int]) -> List[List[int]]:
+    photoIDs = list(photoIDs)
+    if not photoIDs:
+        return []
+    try:
+        async with (await get_pool()).acquire() as conn:
+            rows = await conn.fetch(Solution.statements["getClosePhotosMany"], photoIDs)
+    except Exception as e:
+        return [[] for _ in photoIDs]
+    close_photos = {}
+    for photo_id, close_id in rows:
+        close_photos.setdefault(photo_id, []).append(close_id)
+    return [list(close_photos.get(photo_id, [])) for photo_id in photoIDs]
+
+# ************************************** ADVANCED API functions end **************************************
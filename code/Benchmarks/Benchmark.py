@@ -0,0 +1,364 @@
+# times every public Solution.py API function against a synthetic inventory and writes p50/p95/p99 latencies and
+# throughput to a JSON file that Benchmarks.Compare can diff against an earlier run.
+# runs against the database configured in Utility/database.ini and DROPS ALL TABLES, like the tests do.
+#
+#   cd code && python -m Benchmarks.Benchmark --disks 100 --photos 20000 --iterations 200
+#   cd code && python -m Benchmarks.Compare Benchmarks/results/before.json Benchmarks/results/after.json
+import argparse
+import datetime
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+import GroupCommit
+import Planner
+import Solution
+import Utility.DBConnector as Connector
+from Benchmarks.DataGenerator import Inventory
+from Business.Disk import Disk
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Utility.Instrumentation import Recorder
+
+# concurrent callers in the group commit cases
+WRITER_THREADS = 8
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# schema management functions are not measured, everything else in Solution must appear in a case below
+NOT_MEASURED = {"createTables", "clearTables", "dropTables", "enableEntityCache", "disableEntityCache",
+                "entityCacheStats", "enableCoLocationIndex", "disableCoLocationIndex"}
+
+
+# nearest-rank percentile of an already sorted list
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p / 100.0 * len(ordered)) - 1)]
+
+
+def summarize(latencies, operations):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {'calls': len(ordered),
+            'operations': operations,
+            'p50_ms': percentile(ordered, 50) * 1000,
+            'p95_ms': percentile(ordered, 95) * 1000,
+            'p99_ms': percentile(ordered, 99) * 1000,
+            'mean_ms': total / len(ordered) * 1000,
+            'throughput_per_s': operations / total if total else None}
+
+
+# runs the cases in order against one loaded inventory; every write case undoes its own changes, untimed, so
+# the inventory the read cases see stays the same for the whole run
+class Runner:
+    def __init__(self, inventory: Inventory, iterations: int, batch: int, seed: int):
+        self.inventory = inventory
+        self.iterations = iterations
+        self.batch = batch
+        self.rnd = random.Random(seed)
+        self.results = {}
+        # ids above everything in the inventory, used for the rows the write cases create
+        self.nextID = max(len(inventory.photos), len(inventory.disks), len(inventory.rams)) + 1
+
+    def fresh_ids(self, count):
+        start, self.nextID = self.nextID, self.nextID + count
+        return list(range(start, start + count))
+
+    def disk_id(self):
+        return self.rnd.randint(1, len(self.inventory.disks))
+
+    def photo(self):
+        return self.rnd.choice(self.inventory.photos)
+
+    # call function(*args) for every args in calls, operations is the number of rows one call handles
+    def measure(self, name, function, calls, operations=1):
+        latencies = []
+        for args in calls:
+            start = time.perf_counter()
+            function(*args)
+            latencies.append(time.perf_counter() - start)
+        if latencies:
+            self.results[name] = summarize(latencies, operations * len(latencies))
+
+    def reads(self):
+        n, inv = self.iterations, self.inventory
+        self.measure("getPhotoByID", Solution.getPhotoByID, [(self.photo().getPhotoID(),) for _ in range(n)])
+        self.measure("getDiskByID", Solution.getDiskByID, [(self.disk_id(),) for _ in range(n)])
+        self.measure("getRAMByID", Solution.getRAMByID,
+                     [(self.rnd.randint(1, max(1, len(inv.rams))),) for _ in range(n)])
+        for name in ("averagePhotosSizeOnDisk", "getTotalRamOnDisk", "getPhotosCanBeAddedToDisk",
+                     "getPhotosCanBeAddedToDiskAndRAM", "isCompanyExclusive"):
+            self.measure(name, getattr(Solution, name), [(self.disk_id(),) for _ in range(n)])
+        self.measure("getCostForDescription", Solution.getCostForDescription,
+                     [(self.rnd.choice(inv.descriptions),) for _ in range(n)])
+        self.measure("isDiskContainingAtLeastNumExists", Solution.isDiskContainingAtLeastNumExists,
+                     [(self.rnd.choice(inv.descriptions), self.rnd.randint(1, 100)) for _ in range(n)])
+        for name in ("getDisksContainingTheMostData", "getConflictingDisks", "mostAvailableDisks",
+                     "checkRamTotals"):
+            self.measure(name, getattr(Solution, name), [() for _ in range(n)])
+        self.measure("getClosePhotos", Solution.getClosePhotos, [(self.photo().getPhotoID(),) for _ in range(n)])
+        self.measure("getClosePhotosMany", Solution.getClosePhotosMany,
+                     [([self.photo().getPhotoID() for _ in range(10)],) for _ in range(n)], 10)
+        # the same calls answered by the in-process co-location index instead of the query
+        Solution.enableCoLocationIndex()
+        try:
+            self.measure("getClosePhotos (co-location index)", Solution.getClosePhotos,
+                         [(self.photo().getPhotoID(),) for _ in range(n)])
+            self.measure("getClosePhotosMany (co-location index)", Solution.getClosePhotosMany,
+                         [([self.photo().getPhotoID() for _ in range(10)],) for _ in range(n)], 10)
+        finally:
+            Solution.disableCoLocationIndex()
+
+        self.measure("batch (4 dashboard reads)", self.dashboard, [(self.disk_id(),) for _ in range(n)], 4)
+        self.measure("getDiskSummary", Solution.getDiskSummary, [(self.disk_id(),) for _ in range(n)], 6)
+        self.measure("getDiskSummaries", Solution.getDiskSummaries,
+                     [([self.disk_id() for _ in range(10)],) for _ in range(n)], 10)
+
+        # the full-table scans run a tenth as often, exportPhotosInDisks is timed until the last link was read
+        rounds = max(1, n // 10)
+        self.measure("getConflictingDisksStreamed", Solution.getConflictingDisksStreamed, [() for _ in range(rounds)])
+        # the current conflicts only, timeout=0 stops at the first wait
+        self.measure("watchConflictingDisks", lambda: sum(1 for _ in Solution.watchConflictingDisks(timeout=0)),
+                     [() for _ in range(rounds)])
+        self.measure("exportPhotosInDisks", lambda: sum(1 for _ in Solution.exportPhotosInDisks()),
+                     [() for _ in range(rounds)], len(inv.photoPlacements))
+
+    # the paginated reads: one page of each and every page of each
+    def pages(self):
+        n, rounds = self.iterations, max(1, self.iterations // 10)
+        cases = [("getPhotosCanBeAddedToDisk", lambda: (self.disk_id(),)),
+                 ("getPhotosCanBeAddedToDiskAndRAM", lambda: (self.disk_id(),)),
+                 ("getDisksContainingTheMostData", lambda: ()),
+                 ("mostAvailableDisks", lambda: ()),
+                 ("getClosePhotos", lambda: (self.photo().getPhotoID(),))]
+        for name, params in cases:
+            self.measure(name + "Page", getattr(Solution, name + "Page"), [params() for _ in range(n)])
+            paged = getattr(Solution, name + "Paged")
+            self.measure(name + "Paged", lambda *args: sum(1 for _ in paged(*args)), [params() for _ in range(rounds)])
+
+    # the four per-disk reads of a dashboard, queued on one Solution.batch()
+    @staticmethod
+    def dashboard(disk_id):
+        with Solution.batch() as reads:
+            for name in ("getTotalRamOnDisk", "averagePhotosSizeOnDisk", "isCompanyExclusive",
+                         "getPhotosCanBeAddedToDisk"):
+                getattr(reads, name)(disk_id)
+
+    @staticmethod
+    def placed_together(placements):
+        with Solution.transaction():
+            for photo, disk_id in placements:
+                Solution.addPhotoToDisk(photo, disk_id)
+
+    @staticmethod
+    def placed_concurrently(placements, writer_class):
+        writer = None if writer_class is None else writer_class()
+        place = Solution.addPhotoToDisk if writer is None else lambda *args: writer.addPhotoToDisk(*args).result()
+
+        def worker(share):
+            for photo, disk_id in share:
+                place(photo, disk_id)
+        threads = [threading.Thread(target=worker, args=(placements[start::WRITER_THREADS],))
+                   for start in range(WRITER_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if writer is not None:
+            writer.close()
+
+    def writes(self):
+        n, inv = self.iterations, self.inventory
+        photos = [Photo(i, self.rnd.choice(inv.descriptions), self.rnd.randint(0, 100)) for i in self.fresh_ids(n)]
+        placements = [(photo, self.disk_id()) for photo in photos]
+        self.measure("addPhoto", Solution.addPhoto, [(photo,) for photo in photos])
+        self.measure("addPhotoToDisk", Solution.addPhotoToDisk, placements)
+        self.measure("removePhotoFromDisk", Solution.removePhotoFromDisk, placements)
+        self.measure("deletePhoto", Solution.deletePhoto, [(photo,) for photo in photos])
+
+        # the same placements, ten per Solution.transaction(), one commit each
+        photos = [Photo(i, self.rnd.choice(inv.descriptions), self.rnd.randint(0, 100)) for i in self.fresh_ids(n)]
+        Solution.addPhotos(photos)
+        groups = [[(photo, self.disk_id()) for photo in photos[start:start + 10]] for start in range(0, n, 10)]
+        self.measure("transaction (10 addPhotoToDisk)", self.placed_together, [(group,) for group in groups], 10)
+        for photo in photos:
+            Solution.deletePhoto(photo)
+
+        # placements from WRITER_THREADS threads at once, each waiting for its own result, called directly and
+        # through a GroupCommit.GroupCommitWriter. one call is one whole run
+        rounds = max(1, n // 10)
+        for name, writer in (("addPhotoToDisk (%d threads)" % WRITER_THREADS, None),
+                             ("GroupCommitWriter (%d threads)" % WRITER_THREADS, GroupCommit.GroupCommitWriter)):
+            photos = [Photo(i, self.rnd.choice(inv.descriptions), self.rnd.randint(0, 100))
+                      for i in self.fresh_ids(n * rounds)]
+            Solution.addPhotos(photos)
+            runs = [[(photo, self.disk_id()) for photo in photos[start:start + n]]
+                    for start in range(0, len(photos), n)]
+            self.measure(name, self.placed_concurrently, [(run, writer) for run in runs], n)
+            for photo in photos:
+                Solution.deletePhoto(photo)
+
+        disks = [Disk(i, self.rnd.choice(inv.companies), 5, 10 ** 6, 5) for i in self.fresh_ids(n)]
+        rams = [RAM(i, self.rnd.choice(inv.companies), 8) for i in self.fresh_ids(n)]
+        links = [(ram.getRamID(), disk.getDiskID()) for ram, disk in zip(rams, disks)]
+        self.measure("addDisk", Solution.addDisk, [(disk,) for disk in disks])
+        self.measure("addRAM", Solution.addRAM, [(ram,) for ram in rams])
+        self.measure("addRAMToDisk", Solution.addRAMToDisk, links)
+        self.measure("removeRAMFromDisk", Solution.removeRAMFromDisk, links)
+        self.measure("deleteRAM", Solution.deleteRAM, [(ram.getRamID(),) for ram in rams])
+        self.measure("deleteDisk", Solution.deleteDisk, [(disk.getDiskID(),) for disk in disks])
+
+        pairs = [(Disk(disk_id, self.rnd.choice(inv.companies), 5, 10 ** 6, 5), Photo(photo_id, "pair", 1))
+                 for disk_id, photo_id in zip(self.fresh_ids(n), self.fresh_ids(n))]
+        self.measure("addDiskAndPhoto", Solution.addDiskAndPhoto, pairs)
+        for disk, photo in pairs:
+            Solution.deleteDisk(disk.getDiskID())
+            Solution.deletePhoto(photo)
+
+    def bulk(self):
+        rounds = max(1, self.iterations // 10)
+        inv, size = self.inventory, self.batch
+        batches = [[Photo(i, self.rnd.choice(inv.descriptions), self.rnd.randint(0, 100))
+                    for i in self.fresh_ids(size)] for _ in range(rounds)]
+        self.measure("addPhotos", Solution.addPhotos, [(batch,) for batch in batches], size)
+        self.measure("addPhotosToDisk", Solution.addPhotosToDisk,
+                     [(batch, self.disk_id()) for batch in batches], size)
+        self.measure("addPhotosToDisks", Solution.addPhotosToDisks,
+                     [([(photo, self.disk_id()) for photo in batch],) for batch in batches], size)
+        for batch in batches:
+            for photo in batch:
+                Solution.deletePhoto(photo)
+
+        # the planner alone on every photo of the inventory, then planning and placing fresh batches
+        self.measure("Planner.plan", Planner.plan, [(inv.photos, inv.disks) for _ in range(rounds)],
+                     len(inv.photos))
+        batches = [[Photo(i, self.rnd.choice(inv.descriptions), self.rnd.randint(0, 100))
+                    for i in self.fresh_ids(size)] for _ in range(rounds)]
+        for batch in batches:
+            Solution.addPhotos(batch)
+        self.measure("Planner.placePhotos", Planner.placePhotos, [(batch,) for batch in batches], size)
+        for batch in batches:
+            for photo in batch:
+                Solution.deletePhoto(photo)
+
+        disk_batches = [[Disk(i, self.rnd.choice(inv.companies), 5, 10 ** 6, 5) for i in self.fresh_ids(size)]
+                        for _ in range(rounds)]
+        ram_batches = [[RAM(i, self.rnd.choice(inv.companies), 8) for i in self.fresh_ids(size)]
+                       for _ in range(rounds)]
+        self.measure("addDisks", Solution.addDisks, [(batch,) for batch in disk_batches], size)
+        self.measure("addRAMs", Solution.addRAMs, [(batch,) for batch in ram_batches], size)
+        for batch in disk_batches:
+            for disk in batch:
+                Solution.deleteDisk(disk.getDiskID())
+        for batch in ram_batches:
+            for ram in batch:
+                Solution.deleteRAM(ram.getRamID())
+
+    def maintenance(self):
+        rounds = max(1, self.iterations // 10)
+        self.measure("rebuildRamTotals", Solution.rebuildRamTotals, [() for _ in range(rounds)])
+        self.measure("rebuildReplicaCounts", Solution.rebuildReplicaCounts, [() for _ in range(rounds)])
+        self.measure("rebuildDiskUsage", Solution.rebuildDiskUsage, [() for _ in range(rounds)])
+        self.measure("rebuildDescriptionStats", Solution.rebuildDescriptionStats, [() for _ in range(rounds)])
+        self.measure("applyIndexes", Solution.applyIndexes, [() for _ in range(rounds)])
+        Solution.enableCoLocationIndex()
+        try:
+            self.measure("rebuildCoLocationIndex", Solution.rebuildCoLocationIndex, [() for _ in range(rounds)],
+                         len(self.inventory.photoPlacements))
+        finally:
+            Solution.disableCoLocationIndex()
+
+    def run(self):
+        self.reads()
+        self.pages()
+        self.writes()
+        self.bulk()
+        self.maintenance()
+        return self.results
+
+
+# public API functions of Solution (camelCase, defined in Solution itself) that no case measured
+def unmeasured(results):
+    names = {name for name, value in vars(Solution).items()
+             if inspect.isfunction(value) and value.__module__ == Solution.__name__
+             and not name.startswith("_") and name != name.lower()}
+    return sorted(names - NOT_MEASURED - set(results))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark every Solution.py API function")
+    parser.add_argument("--disks", type=int, default=100)
+    parser.add_argument("--photos", type=int, default=20000)
+    parser.add_argument("--rams", type=int, default=1000)
+    parser.add_argument("--density", type=float, default=2.0, help="average number of disks per photo")
+    parser.add_argument("--descriptions", type=int, default=20, help="number of distinct descriptions")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per function")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per call of the bulk functions")
+    parser.add_argument("--pool", type=int, default=0, help="connection pool size, 0 disables pooling")
+    parser.add_argument("--cache", type=int, default=0, help="entity cache size, 0 disables the cache")
+    parser.add_argument("--instrument", action="store_true",
+                        help="also record per-statement latency histograms through a DBConnector hook")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file, defaults to Benchmarks/results/<time>-<commit>.json")
+    args = parser.parse_args()
+
+    inventory = Inventory(disks=args.disks, photos=args.photos, rams=args.rams, density=args.density,
+                          descriptions=args.descriptions, seed=args.seed)
+    if args.pool:
+        Connector.DBConnector.enablePool(minSize=1, maxSize=args.pool)
+    if args.cache:
+        Solution.enableEntityCache(maxSize=args.cache)
+    recorder = None
+    try:
+        failed = inventory.load()
+        if args.instrument:
+            recorder = Connector.DBConnector.addHook(Recorder())
+        results = Runner(inventory, args.iterations, args.batch, args.seed).run()
+    finally:
+        if recorder is not None:
+            Connector.DBConnector.removeHook(recorder)
+        Solution.dropTables()
+        Solution.disableEntityCache()
+        Connector.DBConnector.disablePool()
+
+    missing = unmeasured(results)
+    now = datetime.datetime.now()
+    report = {'meta': {'commit': git_commit(), 'time': now.isoformat(timespec='seconds'),
+                       'python': platform.python_version(), 'inventory': inventory.params,
+                       'loadFailures': failed, 'iterations': args.iterations, 'batch': args.batch,
+                       'pool': args.pool, 'cache': args.cache, 'unmeasured': missing},
+              'results': results}
+    if recorder is not None:
+        report['statements'] = recorder.snapshot()
+    output = args.output or os.path.join(RESULTS_DIR, "%s-%s.json" % (now.strftime("%Y%m%d-%H%M%S"),
+                                                                      report['meta']['commit'] or "unknown"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print("%-36s %10s %10s %10s %12s" % ("function", "p50 ms", "p95 ms", "p99 ms", "ops/s"))
+    for name in sorted(results):
+        r = results[name]
+        print("%-36s %10.3f %10.3f %10.3f %12.1f" % (name, r['p50_ms'], r['p95_ms'], r['p99_ms'],
+                                                     r['throughput_per_s'] or 0))
+    if missing:
+        print("not measured: " + ", ".join(missing))
+    print("results written to " + output)
+
+
+if __name__ == '__main__':
+    main()
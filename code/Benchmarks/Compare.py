@@ -0,0 +1,61 @@
+# compares two Benchmarks.Benchmark result files and flags the functions that got slower by more than a threshold.
+# exits with status 1 when there is a regression, so it can gate a change in a script
+#
+#   cd code && python -m Benchmarks.Compare Benchmarks/results/before.json Benchmarks/results/after.json
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+# run settings that have to match for the latencies to be comparable
+SETTINGS = ("inventory", "iterations", "batch", "pool", "cache")
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# (name, old value, new value, ratio, regressed) for every function present in both runs
+def compare(old, new, metric="p50_ms", threshold=0.2, floor=0.05):
+    rows = []
+    for name in sorted(set(old['results']) & set(new['results'])):
+        before, after = old['results'][name][metric], new['results'][name][metric]
+        ratio = after / before if before else None
+        # sub-floor latencies are mostly noise, they never count as a regression
+        regressed = ratio is not None and ratio > 1 + threshold and after - before > floor
+        rows.append((name, before, after, ratio, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compare two benchmark result files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--metric", choices=METRICS, default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown, 0.2 is 20%%")
+    parser.add_argument("--floor", type=float, default=0.05, help="ignore slowdowns smaller than this many ms")
+    args = parser.parse_args()
+
+    old, new = read(args.old), read(args.new)
+    for key in SETTINGS:
+        if old['meta'].get(key) != new['meta'].get(key):
+            print("warning: the runs used a different %s, the numbers are not directly comparable" % key)
+    rows = compare(old, new, args.metric, args.threshold, args.floor)
+
+    print("%-36s %12s %12s %8s" % ("function", "old " + args.metric, "new " + args.metric, "ratio"))
+    for name, before, after, ratio, regressed in rows:
+        print("%-36s %12.3f %12.3f %8s%s" % (name, before, after, "-" if ratio is None else "%.2fx" % ratio,
+                                            "  REGRESSION" if regressed else ""))
+    for name in sorted(set(old['results']) ^ set(new['results'])):
+        print("%-36s only in %s" % (name, "old" if name in old['results'] else "new"))
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print("%d regression(s): %s" % (len(regressions), ", ".join(regressions)))
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == '__main__':
+    main()
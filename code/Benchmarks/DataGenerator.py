@@ -0,0 +1,53 @@
+# synthetic inventories for the benchmarks: N disks, M photos, K RAMs, placement density and description
+# cardinality are parameters, the same seed always produces the same inventory
+import random
+import Solution
+from Business.Disk import Disk
+from Business.Photo import Photo
+from Business.RAM import RAM
+
+
+class Inventory:
+    # density: average number of disks each photo is placed on (0 leaves every photo unplaced)
+    # ramDensity: fraction of the RAMs that are placed on some disk
+    def __init__(self, disks: int = 100, photos: int = 10000, rams: int = 1000, density: float = 2.0,
+                 descriptions: int = 20, companies: int = 3, ramDensity: float = 0.8, maxPhotoSize: int = 1000,
+                 seed: int = 0):
+        if density > disks:
+            raise ValueError("density cannot exceed the number of disks")
+        self.params = {'disks': disks, 'photos': photos, 'rams': rams, 'density': density,
+                       'descriptions': descriptions, 'companies': companies, 'ramDensity': ramDensity,
+                       'maxPhotoSize': maxPhotoSize, 'seed': seed}
+        rnd = random.Random(seed)
+        self.descriptions = ["description-%d" % i for i in range(descriptions)]
+        self.companies = ["company-%d" % i for i in range(companies)]
+        self.photos = [Photo(i, rnd.choice(self.descriptions), rnd.randint(0, maxPhotoSize))
+                       for i in range(1, photos + 1)]
+
+        # place the photos first, every disk then gets its used space plus some slack as free space
+        whole, fraction = int(density), density - int(density)
+        used = [0] * (disks + 1)
+        self.photoPlacements = []
+        for photo in self.photos:
+            copies = whole + (1 if rnd.random() < fraction else 0)
+            for disk_id in rnd.sample(range(1, disks + 1), copies):
+                self.photoPlacements.append((photo, disk_id))
+                used[disk_id] += photo.getSize()
+        self.disks = [Disk(i, rnd.choice(self.companies), rnd.randint(1, 10),
+                           used[i] + rnd.randint(0, maxPhotoSize * 50), rnd.randint(1, 10))
+                      for i in range(1, disks + 1)]
+
+        self.rams = [RAM(i, rnd.choice(self.companies), rnd.randint(1, 64)) for i in range(1, rams + 1)]
+        self.ramPlacements = [(ram.getRamID(), rnd.randint(1, disks)) for ram in self.rams
+                              if disks and rnd.random() < ramDensity]
+
+    # recreate the schema and bulk-load the inventory, returns the number of rows that failed to load
+    def load(self) -> int:
+        Solution.dropTables()
+        Solution.createTables()
+        results = Solution.addDisks(self.disks)
+        results += Solution.addPhotos(self.photos)
+        results += Solution.addRAMs(self.rams)
+        results += Solution.addPhotosToDisks(self.photoPlacements)
+        results += Solution.add_many("RAMInDisk", ("ram_id", "disk_id"), self.ramPlacements)
+        return sum(1 for result in results if result != Solution.ReturnValue.OK)
@@ -0,0 +1,100 @@
+# shows how the secondary indexes in Solution.indexes change the plans of the hot read queries:
+# loads a synthetic inventory, runs EXPLAIN ANALYZE for each query without the indexes and again with them.
+# runs against the database configured in Utility/database.ini and DROPS ALL TABLES, like the tests do.
+#
+#   cd code && python -m Benchmarks.IndexPlans --disks 200 --photos 50000
+import argparse
+import json
+import Solution
+import Utility.DBConnector as Connector
+from Benchmarks.DataGenerator import Inventory
+from psycopg2 import sql
+
+# statement name -> params used for the EXPLAIN
+QUERIES = {
+    "averagePhotosSizeOnDisk": (1,),
+    "getTotalRamOnDisk": (1,),
+    "getCostForDescription": ("description-1",),
+    "isDiskContainingAtLeastNumExists": ("description-1", 1000),
+    "getPhotosCanBeAddedToDisk": (1,),
+    "getPhotosCanBeAddedToDiskAndRAM": (1,),
+    "isCompanyExclusive": (1,),
+    "mostAvailableDisks": (),
+}
+
+
+# (node descriptions, execution time in ms) of one EXPLAIN ANALYZE
+def explain(conn, name, params):
+    query = Connector.PreparedQuery(name, Solution.statements[name], params).inline()
+    _, entries = conn.execute(sql.SQL("EXPLAIN (ANALYZE, FORMAT JSON) ") + query)
+    plan = entries.rows[0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = []
+
+    def walk(node):
+        target = node.get("Index Name") or node.get("Relation Name")
+        nodes.append(node["Node Type"] + (" on " + target if target else ""))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return nodes, plan[0]["Execution Time"]
+
+
+# best of repeats, the first run also pays for reading the pages into the cache
+def best_of(conn, name, params, repeats=3):
+    runs = [explain(conn, name, params) for _ in range(repeats)]
+    return runs[-1][0], min(ms for _, ms in runs)
+
+
+def plans():
+    conn = Connector.DBConnector()
+    try:
+        # VACUUM also sets the visibility map, without it index-only scans still visit the heap
+        conn.setAutocommit(True)
+        conn.execute("VACUUM ANALYZE")
+        return {name: best_of(conn, name, params) for name, params in QUERIES.items()}
+    finally:
+        conn.close()
+
+
+def drop_indexes():
+    conn = Connector.DBConnector()
+    try:
+        conn.execute(sql.SQL("DROP INDEX IF EXISTS {names}").format(
+            names=sql.SQL(", ").join(sql.Identifier(name) for name, _, _ in Solution.indexes)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="show the plans of the hot read queries without and with the indexes")
+    parser.add_argument("--disks", type=int, default=200)
+    parser.add_argument("--photos", type=int, default=50000)
+    parser.add_argument("--rams", type=int, default=2000)
+    parser.add_argument("--descriptions", type=int, default=50)
+    parser.add_argument("--density", type=float, default=2.0, help="average number of disks per photo")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    Inventory(disks=args.disks, photos=args.photos, rams=args.rams, density=args.density,
+              descriptions=args.descriptions, seed=args.seed).load()
+    drop_indexes()
+    before = plans()
+    Solution.applyIndexes()
+    after = plans()
+    Solution.dropTables()
+
+    for name in QUERIES:
+        (before_nodes, before_ms), (after_nodes, after_ms) = before[name], after[name]
+        print("%s: %.2f ms -> %.2f ms%s" % (name, before_ms, after_ms,
+                                           "" if before_nodes != after_nodes else " (same plan)"))
+        if before_nodes != after_nodes:
+            print("    without indexes: " + " / ".join(before_nodes))
+            print("    with indexes:    " + " / ".join(after_nodes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+from Business.Disk import Disk
+
+
+# everything the per-disk read functions report about one disk: getDiskByID, getTotalRamOnDisk,
+# averagePhotosSizeOnDisk, isCompanyExclusive, getPhotosCanBeAddedToDisk and getPhotosCanBeAddedToDiskAndRAM
+class DiskSummary:
+    def __init__(self, disk=None, total_ram=None, average_photos_size=None, company_exclusive=None,
+                 photos_can_be_added=None, photos_can_be_added_with_ram=None):
+        self.__disk = disk if disk is not None else Disk.badDisk()
+        self.__total_ram = total_ram
+        self.__average_photos_size = average_photos_size
+        self.__company_exclusive = company_exclusive
+        self.__photos_can_be_added = photos_can_be_added
+        self.__photos_can_be_added_with_ram = photos_can_be_added_with_ram
+
+    def getDisk(self):
+        return self.__disk
+
+    def setDisk(self, disk):
+        self.__disk = disk
+
+    def getTotalRam(self):
+        return self.__total_ram
+
+    def setTotalRam(self, total_ram):
+        self.__total_ram = total_ram
+
+    def getAveragePhotosSize(self):
+        return self.__average_photos_size
+
+    def setAveragePhotosSize(self, average_photos_size):
+        self.__average_photos_size = average_photos_size
+
+    def isCompanyExclusive(self):
+        return self.__company_exclusive
+
+    def setCompanyExclusive(self, company_exclusive):
+        self.__company_exclusive = company_exclusive
+
+    def getPhotosCanBeAdded(self):
+        return self.__photos_can_be_added
+
+    def setPhotosCanBeAdded(self, photos_can_be_added):
+        self.__photos_can_be_added = photos_can_be_added
+
+    def getPhotosCanBeAddedWithRAM(self):
+        return self.__photos_can_be_added_with_ram
+
+    def setPhotosCanBeAddedWithRAM(self, photos_can_be_added_with_ram):
+        self.__photos_can_be_added_with_ram = photos_can_be_added_with_ram
+
+    @staticmethod
+    def badDiskSummary():
+        return DiskSummary()
+
+    def __str__(self):
+        return "Disk=(" + str(self.__disk) + "), total ram=" + str(self.__total_ram) + ", average photos size=" + \
+               str(self.__average_photos_size) + ", company exclusive=" + str(self.__company_exclusive) + \
+               ", photos can be added=" + str(self.__photos_can_be_added) + ", photos can be added with ram=" + \
+               str(self.__photos_can_be_added_with_ram)
@@ -0,0 +1,161 @@
+# group commit: a background writer that runs the write calls submitted by many threads in short batches, each
+# batch in one Solution.transaction(), so a batch pays for one COMMIT (and one WAL flush) instead of one per call.
+#
+# a batch starts with the first call waiting and closes after maxDelay seconds or maxBatch calls, whichever comes
+# first. callers that wait for their result cannot fill a batch until the previous one has committed, so the
+# calls queued during a commit make the next batch and maxDelay only has to be long enough to pick up the calls
+# that are on their way.
+# every call keeps the ReturnValue it would have returned on its own (see Solution.transaction), and a call that
+# raises gets its exception on its Future alone; if the commit itself fails, every call of the batch gets
+# ReturnValue.ERROR. consecutive addPhotoToDisk calls of a batch run as one Solution.addPhotosToDisks, which judges
+# them exactly as consecutive addPhotoToDisk calls would; if that fails as a whole they run one by one.
+# a Future cancelled before its batch starts is skipped
+import inspect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+import Solution
+from Utility.ReturnValue import ReturnValue
+
+# the Solution functions a writer accepts, each returns a single ReturnValue
+WRITES = ("addPhoto", "deletePhoto", "addDisk", "deleteDisk", "addRAM", "deleteRAM", "addPhotoToDisk",
+          "removePhotoFromDisk", "addRAMToDisk", "removeRAMFromDisk")
+
+
+# writer.addPhotoToDisk(photo, diskID) (or any other name in WRITES) queues the call and returns a Future resolved
+# with its ReturnValue once its batch has committed. close() runs what is queued and stops the writer thread
+class GroupCommitWriter:
+    def __init__(self, maxBatch: int = 100, maxDelay: float = 0.001):
+        if maxBatch < 1:
+            raise ValueError("maxBatch must be positive")
+        self.maxBatch = maxBatch
+        self.maxDelay = maxDelay
+        self.__queue = queue.Queue()
+        self.__closed = False
+        self.__lock = threading.Lock()
+        self.__stats = {'calls': 0, 'batches': 0, 'failedCommits': 0}
+        self.__thread = threading.Thread(target=self.__run, name="GroupCommitWriter", daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        if name not in WRITES:
+            raise AttributeError("%s cannot be group committed" % name)
+
+        def submit(*params) -> Future:
+            return self.submit(name, *params)
+        return submit
+
+    # raises ValueError for a function not in WRITES and TypeError for params it does not take
+    def submit(self, name, *params) -> Future:
+        if name not in WRITES:
+            raise ValueError("%s cannot be group committed" % name)
+        inspect.signature(getattr(Solution, name)).bind(*params)
+        future = Future()
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError("the writer is closed")
+            self.__queue.put((name, params, future))
+        return future
+
+    # run every call queued so far and stop the writer thread
+    def close(self):
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(None)
+        self.__thread.join()
+
+    # calls run, batches committed (or rolled back) and commits that failed
+    def stats(self) -> dict:
+        with self.__lock:
+            return dict(self.__stats)
+
+    def __run(self):
+        stopping = False
+        while not stopping:
+            first = self.__queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.maxDelay
+            while len(batch) < self.maxBatch:
+                try:
+                    call = self.__queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if call is None:
+                    stopping = True
+                    break
+                batch.append(call)
+            batch = [call for call in batch if call[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            # nothing may end the thread while callers wait on their Futures
+            try:
+                self.__commit(batch)
+            except Exception as e:
+                logging.getLogger("DB2.groupcommit").exception("group commit batch failed")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def __commit(self, batch):
+        results = None
+        try:
+            with Solution.transaction() as unit:
+                results = GroupCommitWriter.__apply([(name, params) for name, params, _ in batch])
+            committed = unit.committed
+        except Exception:
+            committed = False
+        if not committed:
+            results = [ReturnValue.ERROR] * len(batch)
+        with self.__lock:
+            self.__stats['calls'] += len(batch)
+            self.__stats['batches'] += 1
+            self.__stats['failedCommits'] += 0 if committed else 1
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    # the ReturnValue of every call (or the exception it raised), in order, run in the caller's unit of work
+    @staticmethod
+    def __apply(calls: List[Tuple[str, tuple]]) -> list:
+        results = []
+        start = 0
+        while start < len(calls):
+            name, params = calls[start]
+            if name != "addPhotoToDisk":
+                results.append(GroupCommitWriter.__call(name, params))
+                start += 1
+                continue
+            end = start
+            while end < len(calls) and calls[end][0] == "addPhotoToDisk":
+                end += 1
+            run = [params for _, params in calls[start:end]]
+            placed = GroupCommitWriter.__call("addPhotosToDisks", (run,)) if len(run) > 1 else None
+            # addPhotosToDisks answers ERROR for every placement when anything failed, find out which one did
+            if not isinstance(placed, list) or ReturnValue.ERROR in placed:
+                placed = [GroupCommitWriter.__call("addPhotoToDisk", params) for params in run]
+            results.extend(placed)
+            start = end
+        return results
+
+    @staticmethod
+    def __call(name, params):
+        try:
+            return getattr(Solution, name)(*params)
+        except Exception as e:
+            return e
@@ -0,0 +1,170 @@
+# placement planner: assigns a set of photos to disks in memory and places the whole assignment with
+# Solution.addPhotosToDisks, in one transaction.
+#
+# photos are placed largest first. "first-fit" puts each photo on the most preferred disk it fits on (cheapest
+# cost_per_byte for the "cost" objective, fastest for "speed", lowest id for None), "best-fit" on the disk it
+# leaves the least free space on, preferred disk first among equals. with respectRam a photo only goes to a disk
+# whose RAM total is at least its size, the rule of getPhotosCanBeAddedToDiskAndRAM.
+# photos of one size are placed together: the disk chosen for a photo stays the choice for the next photo of the
+# same size until it is full, so the planner does one lookup per (size, disk) step rather than one per photo
+import bisect
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+import Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+STRATEGIES = ("first-fit", "best-fit")
+OBJECTIVES = ("cost", "speed", None)
+
+# rows read per round trip when loading the photos to place
+LOAD_BATCH_SIZE = 10000
+
+queries = {
+    "unplacedPhotos": """
+        SELECT id, description, disk_free_space_needed FROM "Photo"
+        WHERE NOT EXISTS (SELECT 1 FROM "PhotoInDisk" WHERE "PhotoInDisk".photo_id = "Photo".id)
+        ORDER BY id""",
+    "placementDisks": """
+        SELECT "Disk".id, "Disk".manufacturing_company, "Disk".speed, "Disk".free_space, "Disk".cost_per_byte,
+            COALESCE("TotalRAMInDisk".total_ram, 0)
+        FROM "Disk" LEFT OUTER JOIN "TotalRAMInDisk" ON "TotalRAMInDisk".disk_id = "Disk".id
+        ORDER BY "Disk".id""",
+}
+
+
+class Plan(NamedTuple):
+    # (photo, diskID) in placement order, ready for Solution.addPhotosToDisks
+    placements: List[Tuple[Photo, int]]
+    # photos no disk had room for
+    unplaced: List[Photo]
+
+
+# disks in objective order, most preferred first
+def preference(disks: List[Disk], objective) -> List[Disk]:
+    if objective == "cost":
+        return sorted(disks, key=lambda disk: (disk.getCost(), disk.getDiskID()))
+    if objective == "speed":
+        return sorted(disks, key=lambda disk: (-disk.getSpeed(), disk.getDiskID()))
+    return sorted(disks, key=lambda disk: disk.getDiskID())
+
+
+# free space per disk position with the leftmost position holding at least a given space in O(log n);
+# a position that is not open yet holds -1
+class FirstFit:
+    def __init__(self, count: int):
+        self.size = 1
+        while self.size < count:
+            self.size *= 2
+        self.tree = [-1] * (2 * self.size)
+
+    def set(self, position: int, space: int):
+        node = position + self.size
+        self.tree[node] = space
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def find(self, space: int):
+        tree = self.tree
+        if tree[1] < space:
+            return None
+        node = 1
+        while node < self.size:
+            node = 2 * node if tree[2 * node] >= space else 2 * node + 1
+        return node - self.size
+
+
+# (free space, position) of the open disks in ascending order, the tightest disk holding a given space first
+class BestFit:
+    def __init__(self, count: int):
+        self.entries = []
+        self.space = [-1] * count
+
+    def set(self, position: int, space: int):
+        if self.space[position] >= 0:
+            del self.entries[bisect.bisect_left(self.entries, (self.space[position], position))]
+        self.space[position] = space
+        bisect.insort(self.entries, (space, position))
+
+    def find(self, space: int):
+        index = bisect.bisect_left(self.entries, (space, -1))
+        return None if index == len(self.entries) else self.entries[index][1]
+
+
+# assign photos to disks, nothing is written. ram maps a disk id to its RAM total and is only needed with respectRam
+def plan(photos: Iterable[Photo], disks: Iterable[Disk], strategy: str = "first-fit", objective="cost",
+         respectRam: bool = False, ram: Dict[int, int] = None) -> Plan:
+    if strategy not in STRATEGIES:
+        raise ValueError("strategy must be one of %s" % (STRATEGIES,))
+    if objective not in OBJECTIVES:
+        raise ValueError("objective must be one of %s" % (OBJECTIVES,))
+    disks = preference([disk for disk in disks if disk.getFreeSpace() is not None], objective)
+    free = [disk.getFreeSpace() for disk in disks]
+    fit = (FirstFit if strategy == "first-fit" else BestFit)(len(disks))
+
+    # a disk opens once the photos left are small enough for its RAM, all of them open at once without respectRam
+    if respectRam:
+        ram = ram or {}
+        limits = [ram.get(disk.getDiskID(), 0) for disk in disks]
+        closed = sorted(range(len(disks)), key=lambda position: limits[position])
+    else:
+        for position in range(len(disks)):
+            fit.set(position, free[position])
+        closed = []
+
+    by_size = {}
+    for photo in photos:
+        by_size.setdefault(photo.getSize(), []).append(photo)
+    placements, unplaced = [], []
+    for size in sorted(by_size, reverse=True):
+        group = by_size[size]
+        while closed and limits[closed[-1]] >= size:
+            position = closed.pop()
+            fit.set(position, free[position])
+        placed = 0
+        while placed < len(group):
+            position = fit.find(size)
+            if position is None:
+                break
+            count = len(group) - placed if size == 0 else min(len(group) - placed, free[position] // size)
+            disk_id = disks[position].getDiskID()
+            placements.extend((photo, disk_id) for photo in group[placed:placed + count])
+            placed += count
+            free[position] -= count * size
+            fit.set(position, free[position])
+        unplaced.extend(group[placed:])
+    return Plan(placements, unplaced)
+
+
+# the photos that are on no disk, in id order
+def unplacedPhotos() -> List[Photo]:
+    query = Connector.PreparedQuery("unplacedPhotos", queries["unplacedPhotos"], ())
+    with Solution.open_connection() as conn:
+        with conn.stream(query, LOAD_BATCH_SIZE) as rows:
+            return [Photo(*row) for row in rows.tuples()]
+
+
+# every disk as it is now, with its RAM total
+def currentDisks() -> Tuple[List[Disk], Dict[int, int]]:
+    query = Connector.PreparedQuery("placementDisks", queries["placementDisks"], ())
+    with Solution.open_connection() as conn:
+        _, entries = conn.execute(query)
+    return [Disk(*row[:5]) for row in entries.rows], {row[0]: row[5] for row in entries.rows}
+
+
+# plan photos (by default every photo on no disk) against the current disks and place the plan in one transaction.
+# returns the plan and the addPhotosToDisks result of each placement; a placement whose disk changed since it was
+# read is refused by addPhotosToDisks like any other. on a database error nothing is placed
+def placePhotos(photos: Iterable[Photo] = None, strategy: str = "first-fit", objective="cost",
+                respectRam: bool = False) -> Tuple[Plan, List[ReturnValue]]:
+    try:
+        disks, ram = currentDisks()
+        if photos is None:
+            photos = unplacedPhotos()
+    except Exception as e:
+        return Plan([], list(photos or [])), []
+    placement = plan(photos, disks, strategy, objective, respectRam, ram)
+    return placement, Solution.addPhotosToDisks(placement.placements)
@@ -1,11 +1,21 @@
-from typing import List
+import contextvars
+import inspect
+import itertools
+import json
+from concurrent.futures import Future
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Tuple
 import Utility.DBConnector as Connector
 from Utility.ReturnValue import ReturnValue
 from Utility.Exceptions import DatabaseException
+from Utility.Cache import LRUCache
+from Utility.CoLocationIndex import CoLocationIndex
 from Business.Photo import Photo
 from Business.RAM import RAM
 from Business.Disk import Disk
-from psycopg2 import sql
+from Business.DiskSummary import DiskSummary
+from psycopg2 import extensions, sql
 
 
 # ************************************** our auxiliary functions start **************************************
@@ -64,33 +74,490 @@ def create_ram_in_disk_table():
     """
 
 
+# per-disk RAM total, kept up to date by triggers instead of aggregating "RAMInDisk" on every read.
+# "TotalRAMInDisk" used to be a view with the same columns, an existing view is replaced and backfilled
+def create_ram_totals():
+    return """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_views WHERE viewname = 'TotalRAMInDisk' AND schemaname = current_schema()) THEN
+                DROP VIEW "TotalRAMInDisk";
+            END IF;
+        END $$;
+
+        CREATE TABLE IF NOT EXISTS "TotalRAMInDisk"
+            (
+                disk_id integer NOT NULL PRIMARY KEY,
+                total_ram bigint NOT NULL DEFAULT 0,
+                FOREIGN KEY (disk_id) REFERENCES "Disk" (id) ON DELETE CASCADE
+            );
+
+        -- every disk starts with no RAM
+        CREATE OR REPLACE FUNCTION ram_totals_add_disk() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO "TotalRAMInDisk" (disk_id, total_ram) VALUES (NEW.id, 0);
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION ram_totals_link() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE "TotalRAMInDisk"
+                SET total_ram = total_ram - COALESCE((SELECT size FROM "RAM" WHERE id = OLD.ram_id), 0)
+                WHERE disk_id = OLD.disk_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE "TotalRAMInDisk"
+                SET total_ram = total_ram + COALESCE((SELECT size FROM "RAM" WHERE id = NEW.ram_id), 0)
+                WHERE disk_id = NEW.disk_id;
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        -- a cascaded delete would only reach "RAMInDisk" after the RAM row (and its size) is gone,
+        -- so unlink the RAM first while ram_totals_link can still see it
+        CREATE OR REPLACE FUNCTION ram_totals_delete_ram() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM "RAMInDisk" WHERE ram_id = OLD.id;
+            RETURN OLD;
+        END $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION ram_totals_resize_ram() RETURNS trigger AS $$
+        BEGIN
+            UPDATE "TotalRAMInDisk" SET total_ram = total_ram + NEW.size - OLD.size
+            WHERE disk_id IN (SELECT disk_id FROM "RAMInDisk" WHERE ram_id = NEW.id);
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS ram_totals_add_disk ON "Disk";
+        CREATE TRIGGER ram_totals_add_disk AFTER INSERT ON "Disk"
+            FOR EACH ROW EXECUTE FUNCTION ram_totals_add_disk();
+        DROP TRIGGER IF EXISTS ram_totals_link ON "RAMInDisk";
+        CREATE TRIGGER ram_totals_link AFTER INSERT OR UPDATE OR DELETE ON "RAMInDisk"
+            FOR EACH ROW EXECUTE FUNCTION ram_totals_link();
+        DROP TRIGGER IF EXISTS ram_totals_delete_ram ON "RAM";
+        CREATE TRIGGER ram_totals_delete_ram BEFORE DELETE ON "RAM"
+            FOR EACH ROW EXECUTE FUNCTION ram_totals_delete_ram();
+        DROP TRIGGER IF EXISTS ram_totals_resize_ram ON "RAM";
+        CREATE TRIGGER ram_totals_resize_ram AFTER UPDATE OF size ON "RAM"
+            FOR EACH ROW EXECUTE FUNCTION ram_totals_resize_ram();
+    """ + rebuild_ram_totals()
+
+
+# recompute every disk's total from "RAMInDisk", writers are blocked meanwhile
+def rebuild_ram_totals():
+    return """
+        LOCK TABLE "RAMInDisk" IN SHARE MODE;
+        INSERT INTO "TotalRAMInDisk" (disk_id, total_ram)
+        SELECT "Disk".id, COALESCE(SUM("RAM".size), 0)
+        FROM "Disk"
+        LEFT OUTER JOIN "RAMInDisk" ON "Disk".id = "RAMInDisk".disk_id
+        LEFT OUTER JOIN "RAM" ON "RAM".id = "RAMInDisk".ram_id
+        GROUP BY "Disk".id
+        ON CONFLICT (disk_id) DO UPDATE SET total_ram = EXCLUDED.total_ram
+        WHERE "TotalRAMInDisk".total_ram <> EXCLUDED.total_ram;
+    """
+
+
+# LISTEN / NOTIFY channel of the replica counts trigger, see watchConflictingDisks
+CONFLICTS_CHANNEL = "photo_conflicts"
+
+
+# number of disks holding each photo, kept up to date by a trigger on "PhotoInDisk" (a photo on no disk has no row).
+# a link that leaves its photo on more than one disk is announced on CONFLICTS_CHANNEL with the photo's disk ids
+def create_replica_counts():
+    return """
+        CREATE TABLE IF NOT EXISTS "PhotoReplicaCount"
+            (
+                photo_id integer NOT NULL PRIMARY KEY,
+                replicas integer NOT NULL
+            );
+
+        CREATE OR REPLACE FUNCTION replica_counts_link() RETURNS trigger AS $$
+        DECLARE
+            new_replicas integer;
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE "PhotoReplicaCount" SET replicas = replicas - 1 WHERE photo_id = OLD.photo_id;
+                DELETE FROM "PhotoReplicaCount" WHERE photo_id = OLD.photo_id AND replicas <= 0;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO "PhotoReplicaCount" AS counts (photo_id, replicas) VALUES (NEW.photo_id, 1)
+                ON CONFLICT (photo_id) DO UPDATE SET replicas = counts.replicas + 1
+                RETURNING counts.replicas INTO new_replicas;
+                IF new_replicas > 1 THEN
+                    PERFORM pg_notify('""" + CONFLICTS_CHANNEL + """',
+                        (SELECT string_agg(disk_id::text, ',') FROM "PhotoInDisk" WHERE photo_id = NEW.photo_id));
+                END IF;
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS replica_counts_link ON "PhotoInDisk";
+        CREATE TRIGGER replica_counts_link AFTER INSERT OR UPDATE OR DELETE ON "PhotoInDisk"
+            FOR EACH ROW EXECUTE FUNCTION replica_counts_link();
+    """ + rebuild_replica_counts()
+
+
+# recompute every photo's count from "PhotoInDisk", writers are blocked meanwhile
+def rebuild_replica_counts():
+    return """
+        LOCK TABLE "PhotoInDisk" IN SHARE MODE;
+        DELETE FROM "PhotoReplicaCount"
+        WHERE NOT EXISTS (SELECT 1 FROM "PhotoInDisk" WHERE "PhotoInDisk".photo_id = "PhotoReplicaCount".photo_id);
+        INSERT INTO "PhotoReplicaCount" (photo_id, replicas)
+        SELECT photo_id, COUNT(*) FROM "PhotoInDisk" GROUP BY photo_id
+        ON CONFLICT (photo_id) DO UPDATE SET replicas = EXCLUDED.replicas
+        WHERE "PhotoReplicaCount".replicas <> EXCLUDED.replicas;
+    """
+
+
+# bytes of photos (and number of photos) on each disk that holds any, kept up to date by triggers instead of
+# aggregating "PhotoInDisk" for every getDisksContainingTheMostData
+def create_disk_usage():
+    return """
+        CREATE TABLE IF NOT EXISTS "DiskUsage"
+            (
+                disk_id integer NOT NULL PRIMARY KEY,
+                used_bytes bigint NOT NULL,
+                photos integer NOT NULL,
+                FOREIGN KEY (disk_id) REFERENCES "Disk" (id) ON DELETE CASCADE
+            );
+
+        -- one aggregated update per statement, so placing many photos at once touches each disk once
+        CREATE OR REPLACE FUNCTION disk_usage_links() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE "DiskUsage" SET used_bytes = "DiskUsage".used_bytes - changed.used_bytes,
+                    photos = "DiskUsage".photos - changed.photos
+                FROM (
+                    SELECT removed.disk_id, COALESCE(SUM("Photo".disk_free_space_needed), 0) AS used_bytes,
+                        COUNT(*) AS photos
+                    FROM removed LEFT OUTER JOIN "Photo" ON "Photo".id = removed.photo_id
+                    GROUP BY removed.disk_id
+                ) AS changed
+                WHERE "DiskUsage".disk_id = changed.disk_id;
+                DELETE FROM "DiskUsage" WHERE disk_id IN (SELECT disk_id FROM removed) AND photos <= 0;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO "DiskUsage" AS usage (disk_id, used_bytes, photos)
+                SELECT added.disk_id, COALESCE(SUM("Photo".disk_free_space_needed), 0), COUNT(*)
+                FROM added LEFT OUTER JOIN "Photo" ON "Photo".id = added.photo_id
+                GROUP BY added.disk_id
+                ORDER BY added.disk_id
+                ON CONFLICT (disk_id) DO UPDATE
+                SET used_bytes = usage.used_bytes + EXCLUDED.used_bytes, photos = usage.photos + EXCLUDED.photos;
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        -- a cascaded delete would only reach "PhotoInDisk" after the photo row (and its size) is gone,
+        -- so unlink the photo first while disk_usage_links can still see it
+        CREATE OR REPLACE FUNCTION disk_usage_delete_photo() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM "PhotoInDisk" WHERE photo_id = OLD.id;
+            RETURN OLD;
+        END $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION disk_usage_resize_photo() RETURNS trigger AS $$
+        BEGIN
+            UPDATE "DiskUsage" SET used_bytes = used_bytes + NEW.disk_free_space_needed - OLD.disk_free_space_needed
+            WHERE disk_id IN (SELECT disk_id FROM "PhotoInDisk" WHERE photo_id = NEW.id);
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        -- a trigger with transition tables can only have one event
+        DROP TRIGGER IF EXISTS disk_usage_add_links ON "PhotoInDisk";
+        CREATE TRIGGER disk_usage_add_links AFTER INSERT ON "PhotoInDisk"
+            REFERENCING NEW TABLE AS added FOR EACH STATEMENT EXECUTE FUNCTION disk_usage_links();
+        DROP TRIGGER IF EXISTS disk_usage_remove_links ON "PhotoInDisk";
+        CREATE TRIGGER disk_usage_remove_links AFTER DELETE ON "PhotoInDisk"
+            REFERENCING OLD TABLE AS removed FOR EACH STATEMENT EXECUTE FUNCTION disk_usage_links();
+        DROP TRIGGER IF EXISTS disk_usage_move_links ON "PhotoInDisk";
+        CREATE TRIGGER disk_usage_move_links AFTER UPDATE ON "PhotoInDisk"
+            REFERENCING OLD TABLE AS removed NEW TABLE AS added FOR EACH STATEMENT EXECUTE FUNCTION disk_usage_links();
+        DROP TRIGGER IF EXISTS disk_usage_delete_photo ON "Photo";
+        CREATE TRIGGER disk_usage_delete_photo BEFORE DELETE ON "Photo"
+            FOR EACH ROW EXECUTE FUNCTION disk_usage_delete_photo();
+        DROP TRIGGER IF EXISTS disk_usage_resize_photo ON "Photo";
+        CREATE TRIGGER disk_usage_resize_photo AFTER UPDATE OF disk_free_space_needed ON "Photo"
+            FOR EACH ROW EXECUTE FUNCTION disk_usage_resize_photo();
+    """ + rebuild_disk_usage()
+
+
+# recompute every disk's usage from "PhotoInDisk", writers are blocked meanwhile
+def rebuild_disk_usage():
+    return """
+        LOCK TABLE "PhotoInDisk" IN SHARE MODE;
+        DELETE FROM "DiskUsage"
+        WHERE NOT EXISTS (SELECT 1 FROM "PhotoInDisk" WHERE "PhotoInDisk".disk_id = "DiskUsage".disk_id);
+        INSERT INTO "DiskUsage" (disk_id, used_bytes, photos)
+        SELECT "PhotoInDisk".disk_id, SUM("Photo".disk_free_space_needed), COUNT(*)
+        FROM "PhotoInDisk" INNER JOIN "Photo" ON "Photo".id = "PhotoInDisk".photo_id
+        GROUP BY "PhotoInDisk".disk_id
+        ON CONFLICT (disk_id) DO UPDATE SET used_bytes = EXCLUDED.used_bytes, photos = EXCLUDED.photos
+        WHERE ("DiskUsage".used_bytes, "DiskUsage".photos) <> (EXCLUDED.used_bytes, EXCLUDED.photos);
+    """
+
+
+# per (description, disk): how many photos of the description the disk holds and their bytes, and per description
+# the cost of all of them, kept up to date by triggers so getCostForDescription and
+# isDiskContainingAtLeastNumExists read one row instead of joining "PhotoInDisk" with "Photo"
+def create_description_stats():
+    return """
+        CREATE TABLE IF NOT EXISTS "DescriptionDiskCount"
+            (
+                description TEXT NOT NULL,
+                disk_id integer NOT NULL,
+                photos integer NOT NULL,
+                bytes bigint NOT NULL,
+                PRIMARY KEY (description, disk_id)
+            );
+
+        CREATE TABLE IF NOT EXISTS "DescriptionStats"
+            (
+                description TEXT NOT NULL PRIMARY KEY,
+                total_cost bigint NOT NULL
+            );
+
+        -- add photo_delta photos of bytes_delta bytes of tag to disk (negative to remove them)
+        CREATE OR REPLACE FUNCTION description_stats_change(tag text, disk integer, photo_delta bigint,
+                                                            bytes_delta bigint) RETURNS void AS $$
+        BEGIN
+            INSERT INTO "DescriptionDiskCount" AS counts (description, disk_id, photos, bytes)
+            VALUES (tag, disk, photo_delta, bytes_delta)
+            ON CONFLICT (description, disk_id) DO UPDATE
+            SET photos = counts.photos + EXCLUDED.photos, bytes = counts.bytes + EXCLUDED.bytes;
+            DELETE FROM "DescriptionDiskCount" WHERE description = tag AND disk_id = disk AND photos <= 0;
+            INSERT INTO "DescriptionStats" AS stats (description, total_cost)
+            VALUES (tag, bytes_delta * COALESCE((SELECT cost_per_byte FROM "Disk" WHERE id = disk), 0))
+            ON CONFLICT (description) DO UPDATE SET total_cost = stats.total_cost + EXCLUDED.total_cost;
+            DELETE FROM "DescriptionStats" WHERE description = tag
+            AND NOT EXISTS (SELECT 1 FROM "DescriptionDiskCount" WHERE description = tag);
+        END $$ LANGUAGE plpgsql;
+
+        -- whole statements at once: one pass over the transition table per table it updates. rows are locked in
+        -- (description, disk_id) order, as disk_usage_links does by disk, so concurrent statements cannot deadlock:
+        -- inserts upsert in that order, removals lock the rows they update first
+        CREATE OR REPLACE FUNCTION description_stats_links() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                PERFORM 1 FROM "DescriptionDiskCount" AS counts
+                WHERE (counts.description, counts.disk_id) IN
+                    (SELECT "Photo".description, removed.disk_id
+                     FROM removed INNER JOIN "Photo" ON "Photo".id = removed.photo_id)
+                ORDER BY counts.description, counts.disk_id FOR UPDATE;
+                PERFORM 1 FROM "DescriptionStats" AS stats
+                WHERE stats.description IN
+                    (SELECT "Photo".description FROM removed INNER JOIN "Photo" ON "Photo".id = removed.photo_id)
+                ORDER BY stats.description FOR UPDATE;
+                WITH changed AS (
+                    SELECT "Photo".description, removed.disk_id, COUNT(*) AS photos,
+                        SUM("Photo".disk_free_space_needed) AS bytes
+                    FROM removed INNER JOIN "Photo" ON "Photo".id = removed.photo_id
+                    GROUP BY "Photo".description, removed.disk_id
+                ), counts AS (
+                    UPDATE "DescriptionDiskCount" AS counts
+                    SET photos = counts.photos - changed.photos, bytes = counts.bytes - changed.bytes
+                    FROM changed WHERE counts.description = changed.description AND counts.disk_id = changed.disk_id
+                )
+                UPDATE "DescriptionStats" AS stats SET total_cost = stats.total_cost - costs.cost
+                FROM (
+                    SELECT changed.description, SUM(changed.bytes * COALESCE("Disk".cost_per_byte, 0)) AS cost
+                    FROM changed LEFT OUTER JOIN "Disk" ON "Disk".id = changed.disk_id
+                    GROUP BY changed.description
+                ) AS costs
+                WHERE stats.description = costs.description;
+                DELETE FROM "DescriptionDiskCount" WHERE photos <= 0 AND (description, disk_id) IN
+                    (SELECT "Photo".description, removed.disk_id
+                     FROM removed INNER JOIN "Photo" ON "Photo".id = removed.photo_id);
+                DELETE FROM "DescriptionStats" AS stats WHERE stats.description IN
+                    (SELECT "Photo".description FROM removed INNER JOIN "Photo" ON "Photo".id = removed.photo_id)
+                AND NOT EXISTS (SELECT 1 FROM "DescriptionDiskCount" WHERE description = stats.description);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                WITH changed AS (
+                    SELECT "Photo".description, added.disk_id, COUNT(*) AS photos,
+                        SUM("Photo".disk_free_space_needed) AS bytes
+                    FROM added INNER JOIN "Photo" ON "Photo".id = added.photo_id
+                    GROUP BY "Photo".description, added.disk_id
+                ), counts AS (
+                    INSERT INTO "DescriptionDiskCount" AS counts (description, disk_id, photos, bytes)
+                    SELECT description, disk_id, photos, bytes FROM changed ORDER BY description, disk_id
+                    ON CONFLICT (description, disk_id) DO UPDATE
+                    SET photos = counts.photos + EXCLUDED.photos, bytes = counts.bytes + EXCLUDED.bytes
+                )
+                INSERT INTO "DescriptionStats" AS stats (description, total_cost)
+                SELECT changed.description, SUM(changed.bytes * "Disk".cost_per_byte)
+                FROM changed INNER JOIN "Disk" ON "Disk".id = changed.disk_id
+                GROUP BY changed.description
+                ORDER BY changed.description
+                ON CONFLICT (description) DO UPDATE SET total_cost = stats.total_cost + EXCLUDED.total_cost;
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        -- a photo that changes description or size moves between the counts of its disks
+        CREATE OR REPLACE FUNCTION description_stats_update_photo() RETURNS trigger AS $$
+        DECLARE
+            disk integer;
+        BEGIN
+            FOR disk IN SELECT disk_id FROM "PhotoInDisk" WHERE photo_id = NEW.id ORDER BY disk_id LOOP
+                PERFORM description_stats_change(OLD.description, disk, -1, -OLD.disk_free_space_needed);
+                PERFORM description_stats_change(NEW.description, disk, 1, NEW.disk_free_space_needed);
+            END LOOP;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION description_stats_update_cost() RETURNS trigger AS $$
+        BEGIN
+            PERFORM 1 FROM "DescriptionStats" AS stats
+            WHERE stats.description IN (SELECT description FROM "DescriptionDiskCount" WHERE disk_id = NEW.id)
+            ORDER BY stats.description FOR UPDATE;
+            UPDATE "DescriptionStats"
+            SET total_cost = total_cost + changed.bytes * (NEW.cost_per_byte - OLD.cost_per_byte)
+            FROM (SELECT description, bytes FROM "DescriptionDiskCount" WHERE disk_id = NEW.id) AS changed
+            WHERE "DescriptionStats".description = changed.description;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql;
+
+        -- a cascaded delete would only reach "PhotoInDisk" after the disk row (and its cost) is gone,
+        -- so unlink the disk first while description_stats_change can still see it
+        CREATE OR REPLACE FUNCTION description_stats_delete_disk() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM "PhotoInDisk" WHERE disk_id = OLD.id;
+            RETURN OLD;
+        END $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS description_stats_add_links ON "PhotoInDisk";
+        CREATE TRIGGER description_stats_add_links AFTER INSERT ON "PhotoInDisk"
+            REFERENCING NEW TABLE AS added FOR EACH STATEMENT EXECUTE FUNCTION description_stats_links();
+        DROP TRIGGER IF EXISTS description_stats_remove_links ON "PhotoInDisk";
+        CREATE TRIGGER description_stats_remove_links AFTER DELETE ON "PhotoInDisk"
+            REFERENCING OLD TABLE AS removed FOR EACH STATEMENT EXECUTE FUNCTION description_stats_links();
+        DROP TRIGGER IF EXISTS description_stats_move_links ON "PhotoInDisk";
+        CREATE TRIGGER description_stats_move_links AFTER UPDATE ON "PhotoInDisk"
+            REFERENCING OLD TABLE AS removed NEW TABLE AS added
+            FOR EACH STATEMENT EXECUTE FUNCTION description_stats_links();
+        DROP TRIGGER IF EXISTS description_stats_update_photo ON "Photo";
+        CREATE TRIGGER description_stats_update_photo AFTER UPDATE OF description, disk_free_space_needed ON "Photo"
+            FOR EACH ROW EXECUTE FUNCTION description_stats_update_photo();
+        DROP TRIGGER IF EXISTS description_stats_update_cost ON "Disk";
+        CREATE TRIGGER description_stats_update_cost AFTER UPDATE OF cost_per_byte ON "Disk"
+            FOR EACH ROW EXECUTE FUNCTION description_stats_update_cost();
+        DROP TRIGGER IF EXISTS description_stats_delete_disk ON "Disk";
+        CREATE TRIGGER description_stats_delete_disk BEFORE DELETE ON "Disk"
+            FOR EACH ROW EXECUTE FUNCTION description_stats_delete_disk();
+    """ + rebuild_description_stats()
+
+
+# recompute both tables from "PhotoInDisk", writers are blocked meanwhile
+def rebuild_description_stats():
+    return """
+        LOCK TABLE "PhotoInDisk" IN SHARE MODE;
+        DELETE FROM "DescriptionDiskCount";
+        DELETE FROM "DescriptionStats";
+        INSERT INTO "DescriptionDiskCount" (description, disk_id, photos, bytes)
+        SELECT "Photo".description, "PhotoInDisk".disk_id, COUNT(*), SUM("Photo".disk_free_space_needed)
+        FROM "PhotoInDisk" INNER JOIN "Photo" ON "Photo".id = "PhotoInDisk".photo_id
+        GROUP BY "Photo".description, "PhotoInDisk".disk_id;
+        INSERT INTO "DescriptionStats" (description, total_cost)
+        SELECT "DescriptionDiskCount".description, SUM("DescriptionDiskCount".bytes * "Disk".cost_per_byte)
+        FROM "DescriptionDiskCount" INNER JOIN "Disk" ON "Disk".id = "DescriptionDiskCount".disk_id
+        GROUP BY "DescriptionDiskCount".description;
+    """
+
+
 def create_view_tables():
     return """
-        CREATE OR REPLACE VIEW "TotalRAMInDisk" as 
-        select "Disk".id as disk_id,COALESCE(SUM("RAM".size), 0) as total_ram
-        from "Disk"
-        left outer join "RAMInDisk" on "Disk".id = "RAMInDisk".disk_id
-        left outer join  "RAM" on "RAM".id = "RAMInDisk".ram_id
-        GROUP BY "Disk".id;
-        
-        -- return (disk -> how many more single photos he can save) mapping and disk's speed
-        CREATE OR REPLACE VIEW "DiskPhotoCounts" AS 
-        SELECT 
-            "Disk".id AS disk_id, 
-            COALESCE(COUNT("Photo".id), 0) AS photo_count, 
-            "Disk".speed AS disk_speed 
-        FROM "Disk" 
-        LEFT JOIN "Photo" ON "Disk".free_space >= "Photo".disk_free_space_needed
-        GROUP BY "Disk".id, "Disk".speed;     
+        -- return (disk -> how many more single photos he can save) mapping and disk's speed.
+        -- instead of joining every disk with every photo that fits, disks and photos are merged into one list
+        -- sorted by space (a photo before a disk of equal space) and each disk counts the photos seen before it
+        CREATE OR REPLACE VIEW "DiskPhotoCounts" AS
+        SELECT disk_id, photo_count, disk_speed
+        FROM (
+            SELECT
+                id AS disk_id,
+                COUNT(*) FILTER (WHERE NOT is_disk) OVER (ORDER BY space, is_disk ROWS UNBOUNDED PRECEDING)
+                    AS photo_count,
+                speed AS disk_speed,
+                is_disk
+            FROM (
+                SELECT "Disk".id, "Disk".speed, "Disk".free_space AS space, TRUE AS is_disk FROM "Disk"
+                UNION ALL
+                SELECT NULL, NULL, "Photo".disk_free_space_needed, FALSE FROM "Photo"
+            ) AS events
+        ) AS counted
+        WHERE is_disk;
     """
 
 
+# secondary indexes for the hot predicates: (name, table, definition).
+# createTables builds them with the tables, applyIndexes adds them online to databases created before them
+indexes = [
+    # averagePhotosSizeOnDisk, getDisksContainingTheMostData, getCostForDescription: links of one disk
+    ("photo_in_disk_disk_idx", "PhotoInDisk", "(disk_id, photo_id)"),
+    # isCompanyExclusive and the RAM totals triggers: RAM of one disk
+    ("ram_in_disk_disk_idx", "RAMInDisk", "(disk_id, ram_id)"),
+    # getPhotosCanBeAddedToDisk(AndRAM), DiskPhotoCounts: photos in size order
+    ("photo_size_idx", "Photo", "(disk_free_space_needed, id)"),
+    # getConflictingDisks: only the photos on more than one disk
+    ("photo_replica_conflict_idx", "PhotoReplicaCount", "(photo_id) WHERE replicas > 1"),
+    # getDisksContainingTheMostData: the disks in result order, read until k of them were found
+    ("disk_usage_top_idx", "DiskUsage", "(used_bytes DESC, disk_id ASC)"),
+    # isDiskContainingAtLeastNumExists: the largest count of one description is the last entry of its range
+    ("description_disk_count_photos_idx", "DescriptionDiskCount", "(description, photos)"),
+    # description_stats_update_cost: the descriptions on one disk
+    ("description_disk_count_disk_idx", "DescriptionDiskCount", "(disk_id)"),
+]
+
+# indexes earlier versions created that nothing reads any more, dropped by createTables and applyIndexes so
+# existing databases stop maintaining them
+retired_indexes = [
+    # replaced by the maintained "DescriptionDiskCount" and "DescriptionStats"
+    "photo_description_idx",
+]
+
+
+def create_index(name, table, definition, concurrently=False):
+    return sql.SQL("CREATE INDEX {concurrently} IF NOT EXISTS {name} ON {table} {definition};").format(
+        concurrently=sql.SQL("CONCURRENTLY" if concurrently else ""),
+        name=sql.Identifier(name),
+        table=sql.Identifier(table),
+        definition=sql.SQL(definition))
+
+
+def create_indexes():
+    return sql.Composed([create_index(name, table, definition) for name, table, definition in indexes])
+
+
+def drop_index(name, concurrently=False):
+    return sql.SQL("DROP INDEX {concurrently} IF EXISTS {name};").format(
+        concurrently=sql.SQL("CONCURRENTLY" if concurrently else ""),
+        name=sql.Identifier(name))
+
+
+def drop_retired_indexes():
+    return sql.Composed([drop_index(name) for name in retired_indexes])
+
+
+# the unit of work of the transaction() block running in this thread (or asyncio task), None outside of one
+current_unit = contextvars.ContextVar("current_unit", default=None)
+
+
+# the connection an API function runs on: its own DBConnector, or inside transaction() a call on the unit's
+# connection that the function commits, rolls back and closes as if it were its own
+def open_connection():
+    unit = current_unit.get()
+    return Connector.DBConnector() if unit is None else unit.call()
+
+
 # generically add tuple to table
 def add(query) -> ReturnValue:
     result = ReturnValue.OK
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         conn.execute(query)
         conn.commit()
     except (DatabaseException.CHECK_VIOLATION, DatabaseException.NOT_NULL_VIOLATION):
@@ -115,7 +582,7 @@ def delete(query, is_ram_or_disk=False):
     result = ReturnValue.OK
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             conn.commit()
@@ -130,6 +597,375 @@ def delete(query, is_ram_or_disk=False):
         return result
 
 
+# hot queries, executed as server-side prepared statements on pooled connections (see Connector.PreparedQuery)
+statements = {
+    "addPhoto": 'INSERT INTO "Photo" VALUES ($1, $2, $3)',
+    "getPhotoByID": 'SELECT * FROM "Photo" WHERE id = $1',
+    # the disks are credited in a CTE so the statement's row count is the DELETE's; both parts see the links as
+    # they were before the photo (and, by cascade, its links) went away
+    "deletePhoto": """
+        WITH credited AS (
+            UPDATE "Disk" SET free_space = free_space + $3 WHERE id IN
+                (SELECT "PhotoInDisk".disk_id FROM "PhotoInDisk"
+                    INNER JOIN "Photo" ON "Photo".id = "PhotoInDisk".photo_id
+                    WHERE ("Photo".id, "Photo".description, "Photo".disk_free_space_needed) = ($1, $2, $3))
+        )
+        DELETE FROM "Photo" WHERE (id, description, disk_free_space_needed) = ($1, $2, $3)""",
+    "addDisk": """
+        INSERT INTO "Disk" (id, manufacturing_company, speed, free_space, cost_per_byte)
+        VALUES ($1, $2, $3, $4, $5)""",
+    "getDiskByID": 'SELECT * FROM "Disk" WHERE id = $1',
+    "deleteDisk": 'DELETE FROM "Disk" where id = $1',
+    "addRAM": 'INSERT INTO "RAM" VALUES ($1, $2, $3)',
+    "getRAMByID": 'SELECT * FROM "RAM" WHERE id = $1',
+    "deleteRAM": 'DELETE FROM "RAM" where id = $1',
+    # one statement instead of INSERT + UPDATE; the link is still inserted first, so NOT NULL / UNIQUE violations
+    # win over the free_space CHECK as before
+    "addPhotoToDisk": """
+        WITH link AS (
+            INSERT INTO "PhotoInDisk" VALUES ((SELECT COALESCE("Photo".id) FROM "Photo" WHERE
+            id = $1 AND description = $2 AND disk_free_space_needed = $3),
+            (SELECT COALESCE("Disk".id) FROM "Disk" WHERE "Disk".id = $4))
+            RETURNING disk_id
+        )
+        UPDATE "Disk" SET free_space = free_space - $3 WHERE "Disk".id IN (SELECT disk_id FROM link)""",
+    # the link is deleted first and the disk gets back the stored size of the photo it held, nothing if it held none
+    "removePhotoFromDisk": """
+        WITH link AS (
+            DELETE FROM "PhotoInDisk" WHERE photo_id = $1 AND disk_id = $2
+            RETURNING photo_id
+        )
+        UPDATE "Disk" SET free_space = free_space + COALESCE(
+            (SELECT "Photo".disk_free_space_needed FROM "Photo" INNER JOIN link ON "Photo".id = link.photo_id), 0)
+        WHERE "Disk".id = $2""",
+    "addRAMToDisk": 'INSERT INTO "RAMInDisk" VALUES ($1, $2)',
+    "removeRAMFromDisk": 'DELETE FROM "RAMInDisk" where ram_id = $1 and disk_id = $2',
+    "averagePhotosSizeOnDisk": """
+        SELECT COALESCE(
+        (SELECT AVG("Photo".disk_free_space_needed)
+        FROM "Photo" INNER JOIN "PhotoInDisk" ON "PhotoInDisk".disk_id = $1 AND "Photo".id = "PhotoInDisk".photo_id)
+        , 0)""",
+    "getTotalRamOnDisk": """
+        select total_ram
+        from "TotalRAMInDisk"
+        where "TotalRAMInDisk".disk_id = $1""",
+    "getCostForDescription": """
+        SELECT COALESCE((SELECT total_cost FROM "DescriptionStats" WHERE description = $1), 0)""",
+    "getPhotosCanBeAddedToDisk": """
+        SELECT "Photo".id FROM "Disk" INNER JOIN "Photo" ON "Photo".disk_free_space_needed <= "Disk".free_space
+        where "Disk".id = $1 ORDER BY "Photo".id DESC LIMIT 5""",
+    "getPhotosCanBeAddedToDiskAndRAM": """
+        SELECT "Photo".id FROM "Disk"
+        LEFT OUTER JOIN "TotalRAMInDisk" ON "TotalRAMInDisk".disk_id="Disk".id
+        LEFT OUTER JOIN "Photo" ON "Photo".disk_free_space_needed <= "Disk".free_space
+        AND "Photo".disk_free_space_needed <= "TotalRAMInDisk".total_ram
+        WHERE "Disk".id = $1 AND "Photo".id IS NOT NULL
+        ORDER BY "Photo".id ASC
+        LIMIT 5""",
+    "isCompanyExclusive": """
+        SELECT (COUNT(DISTINCT "RAM".company) = 1
+        AND MIN("Disk".manufacturing_company) = MIN("RAM".company))
+        OR (COUNT(DISTINCT "RAM".company) = 0 AND EXISTS(SELECT "Disk".id FROM "Disk" WHERE "Disk".id = $1))
+        AS is_exclusive
+        FROM "Disk"
+        LEFT JOIN "RAMInDisk" ON "Disk".id = "RAMInDisk".disk_id
+        LEFT JOIN "RAM" ON "RAMInDisk".ram_id = "RAM".id
+        WHERE "Disk".id = $1""",
+    # MAX(photos) of one description is a single probe of description_disk_count_photos_idx
+    "isDiskContainingAtLeastNumExists": """
+        SELECT COALESCE(MAX(photos) >= $2, FALSE) AS result FROM "DescriptionDiskCount" WHERE description = $1""",
+    # the first $1 entries of disk_usage_top_idx; disks holding no photo have no "DiskUsage" row
+    "getDisksContainingTheMostData": """
+        SELECT disk_id FROM "DiskUsage" ORDER BY used_bytes DESC, disk_id ASC LIMIT $1""",
+    # the disks of the photos counted on more than one disk, instead of self-joining "PhotoInDisk"
+    "getConflictingDisks": """
+        SELECT DISTINCT "PhotoInDisk".disk_id
+        FROM "PhotoReplicaCount" INNER JOIN "PhotoInDisk" ON "PhotoInDisk".photo_id = "PhotoReplicaCount".photo_id
+        WHERE "PhotoReplicaCount".replicas > 1
+        ORDER BY "PhotoInDisk".disk_id ASC""",
+    # one row per distinct id in $1 with the values of getDiskByID, getTotalRamOnDisk, averagePhotosSizeOnDisk,
+    # isCompanyExclusive, getPhotosCanBeAddedToDisk and getPhotosCanBeAddedToDiskAndRAM, each computed with the
+    # same expression as its own statement, so a missing disk gets the same values the functions return for it
+    "getDiskSummaries": """
+        SELECT ids.id, "Disk".id, "Disk".manufacturing_company, "Disk".speed, "Disk".free_space, "Disk".cost_per_byte,
+            COALESCE("TotalRAMInDisk".total_ram, 0),
+            COALESCE(
+            (SELECT AVG("Photo".disk_free_space_needed)
+            FROM "Photo"
+            INNER JOIN "PhotoInDisk" ON "PhotoInDisk".disk_id = ids.id AND "Photo".id = "PhotoInDisk".photo_id)
+            , 0),
+            (SELECT (COUNT(DISTINCT "RAM".company) = 1 AND "Disk".manufacturing_company = MIN("RAM".company))
+                OR (COUNT(DISTINCT "RAM".company) = 0 AND "Disk".id IS NOT NULL)
+            FROM "RAMInDisk" INNER JOIN "RAM" ON "RAMInDisk".ram_id = "RAM".id
+            WHERE "RAMInDisk".disk_id = ids.id),
+            ARRAY(SELECT "Photo".id FROM "Photo" WHERE "Photo".disk_free_space_needed <= "Disk".free_space
+                ORDER BY "Photo".id DESC LIMIT 5),
+            ARRAY(SELECT "Photo".id FROM "Photo" WHERE "Photo".disk_free_space_needed <= "Disk".free_space
+                AND "Photo".disk_free_space_needed <= "TotalRAMInDisk".total_ram
+                ORDER BY "Photo".id ASC LIMIT 5)
+        FROM (SELECT DISTINCT unnest($1::integer[]) AS id) AS ids
+        LEFT OUTER JOIN "Disk" ON "Disk".id = ids.id
+        LEFT OUTER JOIN "TotalRAMInDisk" ON "TotalRAMInDisk".disk_id = ids.id""",
+    "exportPhotosInDisks": 'SELECT photo_id, disk_id FROM "PhotoInDisk" ORDER BY photo_id, disk_id',
+    "mostAvailableDisks": """
+        SELECT disk_id
+        FROM "DiskPhotoCounts"
+        ORDER BY photo_count DESC, disk_speed DESC, disk_id ASC
+        LIMIT 5""",
+    # photos sharing at least half of $1's disks, or every other photo when $1 is on no disk; 10 smallest ids
+    "getClosePhotos": """
+        WITH disks AS (SELECT disk_id FROM "PhotoInDisk" WHERE photo_id = $1)
+        (SELECT PID.photo_id FROM "PhotoInDisk" PID
+        WHERE PID.disk_id IN (SELECT disk_id FROM disks) AND PID.photo_id <> $1
+        GROUP BY PID.photo_id
+        HAVING COUNT(PID.photo_id) >= (SELECT COUNT(*) FROM disks) * 0.5
+        ORDER BY PID.photo_id ASC
+        LIMIT 10)
+        UNION ALL
+        (SELECT "Photo".id FROM "Photo" WHERE NOT EXISTS (SELECT 1 FROM disks) AND "Photo".id <> $1
+        ORDER BY "Photo".id ASC LIMIT 10)""",
+    # (photo, close photo) for every distinct photo in $1, ordered by both: the disks of all the photos are read
+    # once, joined to their links once and ranked per photo, instead of one getClosePhotos per photo
+    "getClosePhotosMany": """
+        WITH targets AS (SELECT DISTINCT unnest($1::integer[]) AS photo_id),
+        disks AS (
+            SELECT targets.photo_id, "PhotoInDisk".disk_id
+            FROM targets INNER JOIN "PhotoInDisk" ON "PhotoInDisk".photo_id = targets.photo_id
+        ),
+        disk_counts AS (SELECT photo_id, COUNT(*) AS disks FROM disks GROUP BY photo_id),
+        shared AS (
+            SELECT disks.photo_id, PID.photo_id AS close_id, COUNT(*) AS disks
+            FROM disks INNER JOIN "PhotoInDisk" PID ON PID.disk_id = disks.disk_id AND PID.photo_id <> disks.photo_id
+            GROUP BY disks.photo_id, PID.photo_id
+        ),
+        close AS (
+            SELECT shared.photo_id, shared.close_id,
+                ROW_NUMBER() OVER (PARTITION BY shared.photo_id ORDER BY shared.close_id ASC) AS rank
+            FROM shared INNER JOIN disk_counts ON disk_counts.photo_id = shared.photo_id
+            WHERE shared.disks >= disk_counts.disks * 0.5
+        )
+        SELECT photo_id, close_id FROM close WHERE rank <= 10
+        UNION ALL
+        SELECT targets.photo_id, others.id
+        FROM targets CROSS JOIN LATERAL (
+            SELECT "Photo".id FROM "Photo" WHERE "Photo".id <> targets.photo_id ORDER BY "Photo".id ASC LIMIT 10
+        ) AS others
+        WHERE NOT EXISTS (SELECT 1 FROM disk_counts WHERE disk_counts.photo_id = targets.photo_id)
+        ORDER BY 1, 2""",
+    # keyset pages of the LIMIT 5 / LIMIT 10 reads: the rows after the sort key in the middle placeholders, in the
+    # same order, at most the last placeholder of them. each row is the id followed by the rest of its sort key.
+    # the sort key placeholders are cast to bigint: PREPARE would type them after the integer columns they are
+    # compared with, and the MIN_KEY / MAX_KEY tokens of a first page do not fit in an integer
+    "getPhotosCanBeAddedToDiskPage": """
+        SELECT "Photo".id FROM "Disk" INNER JOIN "Photo" ON "Photo".disk_free_space_needed <= "Disk".free_space
+        WHERE "Disk".id = $1 AND "Photo".id < $2::bigint
+        ORDER BY "Photo".id DESC LIMIT $3""",
+    "getPhotosCanBeAddedToDiskAndRAMPage": """
+        SELECT "Photo".id FROM "Disk"
+        INNER JOIN "TotalRAMInDisk" ON "TotalRAMInDisk".disk_id = "Disk".id
+        INNER JOIN "Photo" ON "Photo".disk_free_space_needed <= "Disk".free_space
+        AND "Photo".disk_free_space_needed <= "TotalRAMInDisk".total_ram
+        WHERE "Disk".id = $1 AND "Photo".id > $2::bigint
+        ORDER BY "Photo".id ASC LIMIT $3""",
+    # used_bytes <= $1 is the range of disk_usage_top_idx to scan, the rest only skips the ties already returned
+    "getDisksContainingTheMostDataPage": """
+        SELECT disk_id, used_bytes FROM "DiskUsage"
+        WHERE used_bytes <= $1::bigint AND (used_bytes < $1::bigint OR disk_id > $2::bigint)
+        ORDER BY used_bytes DESC, disk_id ASC LIMIT $3""",
+    "mostAvailableDisksPage": """
+        SELECT disk_id, photo_count, disk_speed FROM "DiskPhotoCounts"
+        WHERE photo_count <= $1::bigint AND (photo_count < $1::bigint OR disk_speed < $2::bigint
+            OR (disk_speed = $2::bigint AND disk_id > $3::bigint))
+        ORDER BY photo_count DESC, disk_speed DESC, disk_id ASC LIMIT $4""",
+    "getClosePhotosPage": """
+        WITH disks AS (SELECT disk_id FROM "PhotoInDisk" WHERE photo_id = $1)
+        (SELECT PID.photo_id FROM "PhotoInDisk" PID
+        WHERE PID.disk_id IN (SELECT disk_id FROM disks) AND PID.photo_id <> $1 AND PID.photo_id > $2::bigint
+        GROUP BY PID.photo_id
+        HAVING COUNT(PID.photo_id) >= (SELECT COUNT(*) FROM disks) * 0.5
+        ORDER BY PID.photo_id ASC
+        LIMIT $3)
+        UNION ALL
+        (SELECT "Photo".id FROM "Photo"
+        WHERE NOT EXISTS (SELECT 1 FROM disks) AND "Photo".id <> $1 AND "Photo".id > $2::bigint
+        ORDER BY "Photo".id ASC LIMIT $3)""",
+}
+
+
+# bind params to one of the statements above
+def prepared(name, *params) -> Connector.PreparedQuery:
+    return Connector.PreparedQuery(name, statements[name], params)
+
+
+# optional read-through caches of "Photo" / "Disk" / "RAM" rows keyed by id, empty until enableEntityCache().
+# a cached row is stored as the constructor arguments of its business object, so every hit returns a fresh object
+entity_caches = {}
+
+
+def cached_entity(table, entity_id):
+    cache = entity_caches.get(table)
+    # a unit of work reads its own uncommitted writes, which the cache does not have
+    if cache is None or type(entity_id) is not int or current_unit.get() is not None:
+        return LRUCache.MISSING
+    return cache.get(entity_id)
+
+
+def entity_generation(table):
+    cache = entity_caches.get(table)
+    return None if cache is None else cache.generation()
+
+
+def cache_entity(table, entity_id, args, generation):
+    cache = entity_caches.get(table)
+    if cache is not None and type(entity_id) is int and current_unit.get() is None:
+        cache.put(entity_id, args, generation)
+
+
+# called by every write path after it ran, whatever its outcome. inside a unit of work the entries are dropped
+# again once it has committed, a reader may have cached the committed row in the meantime
+def invalidate_entities(table, *entity_ids):
+    cache = entity_caches.get(table)
+    if cache is not None:
+        cache.invalidate(*(entity_id for entity_id in entity_ids if type(entity_id) is int))
+        unit = current_unit.get()
+        if unit is not None:
+            unit.afterCommit(invalidate_entities, table, *entity_ids)
+
+
+def clear_entities(*tables):
+    for table in tables:
+        cache = entity_caches.get(table)
+        if cache is not None:
+            cache.clear()
+    unit = current_unit.get()
+    if unit is not None and any(table in entity_caches for table in tables):
+        unit.afterCommit(clear_entities, *tables)
+
+
+# optional in-process index of "PhotoInDisk" answering getClosePhotos, None until enableCoLocationIndex()
+co_location_index = None
+
+
+# called by every write path that changed "PhotoInDisk", e.g. co_locate("add", photo_id, disk_id).
+# inside a unit of work the change is applied once it has committed
+def co_locate(method, *ids):
+    index = co_location_index
+    if index is not None and all(type(entity_id) is int for entity_id in ids):
+        unit = current_unit.get()
+        if unit is not None:
+            unit.afterCommit(co_locate, method, *ids)
+        else:
+            getattr(index, method)(*ids)
+
+
+# rows per COPY in the bulk API, a failing chunk is split in half until the bad rows are isolated
+BULK_CHUNK_SIZE = 10000
+
+violation_to_return_value = {
+    DatabaseException.CHECK_VIOLATION: ReturnValue.BAD_PARAMS,
+    DatabaseException.NOT_NULL_VIOLATION: ReturnValue.BAD_PARAMS,
+    DatabaseException.FOREIGN_KEY_VIOLATION: ReturnValue.NOT_EXISTS,
+    DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS,
+}
+
+
+# generically add many tuples to table in one transaction, returns a ReturnValue per row (same as add() per row)
+def add_many(table, columns, rows, chunk_size=BULK_CHUNK_SIZE) -> List[ReturnValue]:
+    rows = iter(rows)
+    results = []
+    count = 0
+    conn = None
+    try:
+        conn = open_connection()
+        chunk = []
+        for row in rows:
+            count += 1
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                results.extend(copy_chunk(conn, table, columns, chunk))
+                chunk = []
+        if chunk:
+            results.extend(copy_chunk(conn, table, columns, chunk))
+        conn.commit()
+    except Exception:
+        if conn is not None:
+            conn.rollback()
+        # nothing was committed, rows not reached yet count as failed too
+        count += sum(1 for _ in rows)
+        results = [ReturnValue.ERROR] * count
+    finally:
+        if conn is not None:
+            conn.close()
+    return results
+
+
+# COPY chunk under a savepoint; on a violation roll back and bisect, so rows before and after a bad row still go in
+# and every row ends up with the ReturnValue a single INSERT of it would have produced
+def copy_chunk(conn, table, columns, chunk) -> List[ReturnValue]:
+    conn.execute("SAVEPOINT bulk_chunk")
+    try:
+        conn.copyFrom(table, columns, chunk)
+        conn.execute("RELEASE SAVEPOINT bulk_chunk")
+        return [ReturnValue.OK] * len(chunk)
+    except Exception as e:
+        conn.execute("ROLLBACK TO SAVEPOINT bulk_chunk")
+        conn.execute("RELEASE SAVEPOINT bulk_chunk")
+        if len(chunk) == 1:
+            return [violation_to_return_value.get(type(e), ReturnValue.ERROR)]
+    middle = len(chunk) // 2
+    return copy_chunk(conn, table, columns, chunk[:middle]) + copy_chunk(conn, table, columns, chunk[middle:])
+
+
+# rows per round trip of the server-side cursors used to stream large results
+STREAM_BATCH_SIZE = 10000
+
+# rows per page of the paginated reads
+PAGE_SIZE = 1000
+
+# sort key values before every real one, the token of a first page. MIN_KEY is not -2 ** 63: inlined, that
+# literal is negated after its ::bigint cast and overflows
+MAX_KEY = 2 ** 63 - 1
+MIN_KEY = -MAX_KEY
+
+# paginated reads: name -> (token of the first page, page row -> its token). a token is the sort key of the last
+# row of a page, its "<name>Page" statement takes the read's own params, the token and the page size
+paged_reads = {
+    "getPhotosCanBeAddedToDisk": ((MAX_KEY,), lambda row: (row[0],)),
+    "getPhotosCanBeAddedToDiskAndRAM": ((MIN_KEY,), lambda row: (row[0],)),
+    "getDisksContainingTheMostData": ((MAX_KEY, MIN_KEY), lambda row: (row[1], row[0])),
+    "mostAvailableDisks": ((MAX_KEY, MAX_KEY, MIN_KEY), lambda row: (row[1], row[2], row[0])),
+    "getClosePhotos": ((MIN_KEY,), lambda row: (row[0],)),
+}
+
+
+# (ids of one page, token of the next page or None after the last one); a database error is raised
+def read_page(name, params, after, page_size) -> Tuple[List[int], Optional[tuple]]:
+    first, token_of = paged_reads[name]
+    query = prepared(name + "Page", *params, *(first if after is None else tuple(after)), page_size)
+    with open_connection() as conn:
+        _, entries = conn.execute(query)
+    rows = entries.rows
+    return [row[0] for row in rows], token_of(rows[-1]) if len(rows) == page_size else None
+
+
+# (ids of one page, next token) as a public page function returns them: ([], None) if the page cannot be read
+def page_or_empty(name, params, after, page_size) -> Tuple[List[int], Optional[tuple]]:
+    try:
+        return read_page(name, params, after, page_size)
+    except Exception as e:
+        return [], None
+
+
+# every id from the page after token on, one page in memory at a time; a database error is raised, a partial
+# result is never silent
+def read_pages(name, params, after, page_size) -> Iterator[int]:
+    while True:
+        ids, after = read_page(name, params, after, page_size)
+        yield from ids
+        if after is None:
+            return
+
+
 # ************************************** our auxiliary functions end **************************************
 
 # ************************************** Database functions start **************************************
@@ -137,76 +973,188 @@ def delete(query, is_ram_or_disk=False):
 def createTables():
     base_tables = create_base_tables()
     new_tables = create_new_tables()
+    ram_totals = create_ram_totals()
+    replica_counts = create_replica_counts()
+    disk_usage = create_disk_usage()
+    description_stats = create_description_stats()
     views = create_view_tables()
-    query = base_tables + new_tables + views
+    query = sql.SQL(base_tables + new_tables + ram_totals + replica_counts + disk_usage + description_stats +
+                    views) + create_indexes() + drop_retired_indexes()
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         conn.execute(query)
         conn.commit()
     except Exception as e:
         conn.rollback()
     finally:
         conn.close()
+    clear_entities("Photo", "Disk", "RAM")
+    co_locate("clear")
 
 
 def clearTables():
     base_tables = ["Photo", "Disk", "RAM"]
     new_tables = ["PhotoInDisk", "RAMInDisk"]
-    queries = ['DELETE FROM "{table}";'.format(table=table) for table in base_tables + new_tables]
+    maintained_tables = ["TotalRAMInDisk", "PhotoReplicaCount", "DiskUsage", "DescriptionDiskCount",
+                         "DescriptionStats"]
+    # links first, in one statement each: deleting a photo or disk that still has links unlinks it row by row
+    queries = ['DELETE FROM "{table}";'.format(table=table) for table in new_tables + base_tables + maintained_tables]
     query = "\n".join(queries)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         conn.execute(query)
         conn.commit()
     except Exception as e:
         conn.rollback()
     finally:
         conn.close()
+    clear_entities("Photo", "Disk", "RAM")
+    co_locate("clear")
 
 
 def dropTables():
     base_tables = ["Photo", "Disk", "RAM"]
     new_tables = ["PhotoInDisk", "RAMInDisk"]
-    view_tables = ["TotalRAMInDisk", "DiskPhotoCounts"]
+    maintained_tables = ["TotalRAMInDisk", "PhotoReplicaCount", "DiskUsage", "DescriptionDiskCount",
+                         "DescriptionStats"]
+    view_tables = ["DiskPhotoCounts"]
+    functions = ["ram_totals_add_disk()", "ram_totals_link()", "ram_totals_delete_ram()", "ram_totals_resize_ram()",
+                 "replica_counts_link()", "disk_usage_links()", "disk_usage_delete_photo()",
+                 "disk_usage_resize_photo()", "description_stats_change(text, integer, bigint, bigint)",
+                 "description_stats_links()", "description_stats_update_photo()", "description_stats_update_cost()",
+                 "description_stats_delete_disk()"]
     queries = ['DROP TABLE IF EXISTS "{table}" CASCADE;'.format(table=table) for table in
-               base_tables + new_tables + view_tables]
+               base_tables + new_tables + maintained_tables + view_tables]
+    queries += ['DROP FUNCTION IF EXISTS {function} CASCADE;'.format(function=function) for function in functions]
     query = "\n".join(queries)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         conn.execute(query)
         conn.commit()
     except Exception as e:
         conn.rollback()
     finally:
         conn.close()
+    clear_entities("Photo", "Disk", "RAM")
+    co_locate("clear")
+
+
+# disks whose maintained "TotalRAMInDisk" row disagrees with "RAMInDisk" (or is missing), [] when consistent
+def checkRamTotals() -> List[int]:
+    query = sql.SQL("""
+        SELECT "Disk".id
+        FROM "Disk"
+        LEFT OUTER JOIN "TotalRAMInDisk" ON "TotalRAMInDisk".disk_id = "Disk".id
+        LEFT OUTER JOIN (
+            SELECT "RAMInDisk".disk_id, SUM("RAM".size) AS total_ram
+            FROM "RAMInDisk" INNER JOIN "RAM" ON "RAM".id = "RAMInDisk".ram_id
+            GROUP BY "RAMInDisk".disk_id
+        ) AS actual ON actual.disk_id = "Disk".id
+        WHERE "TotalRAMInDisk".total_ram IS DISTINCT FROM COALESCE(actual.total_ram, 0)
+        ORDER BY "Disk".id ASC
+        """)
+    conn = None
+    disks_ids = []
+    try:
+        conn = open_connection()
+        _, results = conn.execute(query)
+        for row in results.rows:
+            disks_ids.append(row[0])
+    except Exception as e:
+        pass
+    finally:
+        conn.close()
+    return disks_ids
+
+
+def rebuildRamTotals() -> ReturnValue:
+    return add(rebuild_ram_totals())
+
+
+def rebuildReplicaCounts() -> ReturnValue:
+    return add(rebuild_replica_counts())
+
+
+def rebuildDiskUsage() -> ReturnValue:
+    return add(rebuild_disk_usage())
+
+
+def rebuildDescriptionStats() -> ReturnValue:
+    return add(rebuild_description_stats())
+
+
+# reload the co-location index from "PhotoInDisk", e.g. after writes made by another process.
+# writes made here while the links are read are replayed on the new copy
+def rebuildCoLocationIndex() -> ReturnValue:
+    index = co_location_index
+    if index is None:
+        return ReturnValue.OK
+    index.beginRebuild()
+    try:
+        index.finishRebuild(exportPhotosInDisks())
+    except Exception as e:
+        index.abortRebuild()
+        return ReturnValue.ERROR
+    return ReturnValue.OK
+
+
+# build the indexes in the registry on an existing database. with concurrently=True every index is built with
+# CREATE INDEX CONCURRENTLY (one statement per transaction, writers are not blocked); an index left INVALID by an
+# earlier interrupted concurrent build is dropped and rebuilt, and the retired indexes are dropped
+def applyIndexes(concurrently: bool = True) -> ReturnValue:
+    result = ReturnValue.OK
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        conn.setAutocommit(True)
+        _, invalid = conn.execute(sql.SQL("""
+            SELECT index_class.relname FROM pg_index
+            INNER JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+            WHERE NOT pg_index.indisvalid AND index_class.relname = ANY({names})
+            """).format(names=sql.Literal([name for name, _, _ in indexes])))
+        for row in invalid.rows:
+            conn.execute(drop_index(row[0], concurrently))
+        for name, table, definition in indexes:
+            conn.execute(create_index(name, table, definition, concurrently))
+        for name in retired_indexes:
+            conn.execute(drop_index(name, concurrently))
+    except Exception as e:
+        result = ReturnValue.ERROR
+    finally:
+        conn.close()
+    return result
+
 # ************************************** Database functions end **************************************
 
 # ************************************** CRUD API functions start **************************************
 
 def addPhoto(photo: Photo) -> ReturnValue:
-    query = sql.SQL('INSERT INTO "Photo" VALUES ({photo_id}, {description}, {disk_free_space_needed})').format(
-        photo_id=sql.Literal(photo.getPhotoID()),
-        description=sql.Literal(photo.getDescription()),
-        disk_free_space_needed=sql.Literal(photo.getSize())
-    )
-    return add(query)
+    query = prepared("addPhoto", photo.getPhotoID(), photo.getDescription(), photo.getSize())
+    result = add(query)
+    invalidate_entities("Photo", photo.getPhotoID())
+    return result
 
 
 def getPhotoByID(photoID: int) -> Photo:
+    cached = cached_entity("Photo", photoID)
+    if cached is not LRUCache.MISSING:
+        return Photo(*cached)
+    generation = entity_generation("Photo")
     result = Photo.badPhoto()
-    query = sql.SQL('SELECT * FROM "Photo" WHERE id = {id} ').format(id=sql.Literal(photoID))
+    query = prepared("getPhotoByID", photoID)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             photo_id, description, size = entries[0].values()
             result.setPhotoID(photo_id)
             result.setDescription(description)
             result.setSize(size)
+            cache_entity("Photo", photoID, (photo_id, description, size), generation)
     except Exception as e:
         pass
     finally:
@@ -215,40 +1163,37 @@ def getPhotoByID(photoID: int) -> Photo:
 
 
 def deletePhoto(photo: Photo) -> ReturnValue:
-    query = sql.SQL(
-        """
-        UPDATE "Disk" SET free_space = free_space + {disk_free_space_needed} WHERE id IN
-            (SELECT "PhotoInDisk".Disk_id FROM "PhotoInDisk" INNER JOIN "Photo" ON "Photo".id = "PhotoInDisk".photo_id  
-                WHERE ("Photo".id, "Photo".description, "Photo".disk_free_space_needed) =
-                                                                ({id}, {description}, {disk_free_space_needed}));          
-        DELETE FROM "Photo" WHERE (id, description, disk_free_space_needed) =
-                                                    ({id}, {description}, {disk_free_space_needed});
-        """).format(
-        id=sql.Literal(photo.getPhotoID()),
-        description=sql.Literal(photo.getDescription()),
-        disk_free_space_needed=sql.Literal(photo.getSize()))
-    return delete(query)
+    query = prepared("deletePhoto", photo.getPhotoID(), photo.getDescription(), photo.getSize())
+    result = delete(query, is_ram_or_disk=True)
+    if result == ReturnValue.OK:
+        co_locate("removePhoto", photo.getPhotoID())
+    # deleting a photo that is not there is not an error
+    elif result == ReturnValue.NOT_EXISTS:
+        result = ReturnValue.OK
+    invalidate_entities("Photo", photo.getPhotoID())
+    # the free_space of every disk that held the photo went up
+    clear_entities("Disk")
+    return result
 
 
 def addDisk(disk: Disk) -> ReturnValue:
-    query = sql.SQL("""
-        INSERT INTO "Disk" (id, manufacturing_company, speed, free_space, cost_per_byte) 
-        VALUES ({disk_id}, {manufacturing_company}, {speed}, {free_space}, {cost_per_byte});""").format(
-        disk_id=sql.Literal(disk.getDiskID()),
-        manufacturing_company=sql.Literal(disk.getCompany()),
-        speed=sql.Literal(disk.getSpeed()),
-        free_space=sql.Literal(disk.getFreeSpace()),
-        cost_per_byte=sql.Literal(disk.getCost())
-    )
-    return add(query)
+    query = prepared("addDisk", disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                     disk.getCost())
+    result = add(query)
+    invalidate_entities("Disk", disk.getDiskID())
+    return result
 
 
 def getDiskByID(diskID: int) -> Disk:
+    cached = cached_entity("Disk", diskID)
+    if cached is not LRUCache.MISSING:
+        return Disk(*cached)
+    generation = entity_generation("Disk")
     result = Disk.badDisk()
-    query = sql.SQL('SELECT * FROM "Disk" WHERE id = {id} ').format(id=sql.Literal(diskID))
+    query = prepared("getDiskByID", diskID)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             disk_id, manufacturing_company, speed, free_space, cost_per_byte = entries[0].values()
@@ -257,6 +1202,7 @@ def getDiskByID(diskID: int) -> Disk:
             result.setSpeed(speed)
             result.setFreeSpace(free_space)
             result.setCost(cost_per_byte)
+            cache_entity("Disk", diskID, (disk_id, manufacturing_company, speed, free_space, cost_per_byte), generation)
     except Exception as e:
         pass
     finally:
@@ -265,31 +1211,38 @@ def getDiskByID(diskID: int) -> Disk:
 
 
 def deleteDisk(diskID: int) -> ReturnValue:
-    query = sql.SQL('DELETE FROM "Disk" where id = {id}').format(id=sql.Literal(diskID))
-    return delete(query=query, is_ram_or_disk=True)
+    query = prepared("deleteDisk", diskID)
+    result = delete(query=query, is_ram_or_disk=True)
+    if result == ReturnValue.OK:
+        co_locate("removeDisk", diskID)
+    invalidate_entities("Disk", diskID)
+    return result
 
 
 def addRAM(ram: RAM) -> ReturnValue:
-    query = sql.SQL('INSERT INTO "RAM" VALUES ({id}, {size}, {company})').format(
-        id=sql.Literal(ram.getRamID()),
-        size=sql.Literal(ram.getSize()),
-        company=sql.Literal(ram.getCompany())
-    )
-    return add(query)
+    query = prepared("addRAM", ram.getRamID(), ram.getSize(), ram.getCompany())
+    result = add(query)
+    invalidate_entities("RAM", ram.getRamID())
+    return result
 
 
 def getRAMByID(ramID: int) -> RAM:
+    cached = cached_entity("RAM", ramID)
+    if cached is not LRUCache.MISSING:
+        return RAM(*cached)
+    generation = entity_generation("RAM")
     result = RAM.badRAM()
-    query = sql.SQL('SELECT * FROM "RAM" WHERE id = {id} ').format(id=sql.Literal(ramID))
+    query = prepared("getRAMByID", ramID)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             ram_id, size, company = entries[0].values()
             result.setRamID(ram_id)
             result.setCompany(company)
             result.setSize(size)
+            cache_entity("RAM", ramID, (ram_id, company, size), generation)
     except Exception as e:
         pass
     finally:
@@ -298,18 +1251,17 @@ def getRAMByID(ramID: int) -> RAM:
 
 
 def deleteRAM(ramID: int) -> ReturnValue:
-    query = sql.SQL(
-        'DELETE FROM "RAM" where id = {id}').format(
-        id=sql.Literal(ramID))
-    return delete(query=query, is_ram_or_disk=True)
+    query = prepared("deleteRAM", ramID)
+    result = delete(query=query, is_ram_or_disk=True)
+    invalidate_entities("RAM", ramID)
+    return result
 
 
 def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
+    # both rows are inserted in add()'s transaction, a failing second insert rolls back the first
     query = sql.SQL("""
-        BEGIN TRANSACTION;
         INSERT INTO "Disk" VALUES ({disk_id}, {manufacturing_company}, {speed}, {free_space}, {cost_per_byte});
         INSERT INTO "Photo" VALUES ({photo_id}, {description}, {disk_free_space_needed});
-        COMMIT;
         """).format(
         disk_id=sql.Literal(disk.getDiskID()),
         manufacturing_company=sql.Literal(disk.getCompany()),
@@ -320,7 +1272,64 @@ def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
         description=sql.Literal(photo.getDescription()),
         disk_free_space_needed=sql.Literal(photo.getSize())
     )
-    return add(query)
+    result = add(query)
+    invalidate_entities("Disk", disk.getDiskID())
+    invalidate_entities("Photo", photo.getPhotoID())
+    return result
+
+
+def addPhotos(photos: Iterable[Photo]) -> List[ReturnValue]:
+    rows = [(photo.getPhotoID(), photo.getDescription(), photo.getSize()) for photo in photos]
+    results = add_many("Photo", ("id", "description", "disk_free_space_needed"), rows)
+    invalidate_entities("Photo", *(row[0] for row in rows))
+    return results
+
+
+def addDisks(disks: Iterable[Disk]) -> List[ReturnValue]:
+    rows = [(disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(), disk.getCost())
+            for disk in disks]
+    results = add_many("Disk", ("id", "manufacturing_company", "speed", "free_space", "cost_per_byte"), rows)
+    invalidate_entities("Disk", *(row[0] for row in rows))
+    return results
+
+
+def addRAMs(rams: Iterable[RAM]) -> List[ReturnValue]:
+    rows = [(ram.getRamID(), ram.getSize(), ram.getCompany()) for ram in rams]
+    results = add_many("RAM", ("id", "size", "company"), rows)
+    invalidate_entities("RAM", *(row[0] for row in rows))
+    return results
+
+
+# cache getPhotoByID / getDiskByID / getRAMByID results, at most maxSize rows per table for up to ttl seconds.
+# the write paths above invalidate what they touch; writes made by other processes are seen once the ttl expires
+def enableEntityCache(maxSize: int = 10000, ttl: float = 60.0):
+    for table in ("Photo", "Disk", "RAM"):
+        entity_caches[table] = LRUCache(maxSize=maxSize, ttl=ttl)
+
+
+def disableEntityCache():
+    entity_caches.clear()
+
+
+# hit / miss / eviction counters per table, empty when the cache is disabled
+def entityCacheStats() -> dict:
+    return {table: cache.stats() for table, cache in entity_caches.items()}
+
+
+# answer getClosePhotos from an in-process index of "PhotoInDisk", loaded now and kept up to date by this
+# process's writes. writes made by other processes are not seen until rebuildCoLocationIndex()
+def enableCoLocationIndex() -> ReturnValue:
+    global co_location_index
+    co_location_index = CoLocationIndex()
+    result = rebuildCoLocationIndex()
+    if result != ReturnValue.OK:
+        co_location_index = None
+    return result
+
+
+def disableCoLocationIndex():
+    global co_location_index
+    co_location_index = None
 
 
 # ************************************** CRUD API functions end **************************************
@@ -328,22 +1337,11 @@ def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
 # ************************************** BASIC API functions start **************************************
 
 def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
-    query = sql.SQL("""
-    BEGIN TRANSACTION;  
-    INSERT INTO "PhotoInDisk" VALUES ((SELECT COALESCE("Photo".id) FROM "Photo" WHERE
-    id = {photo_id} AND description = {photo_description} AND disk_free_space_needed = {photo_size}),
-    (SELECT COALESCE("Disk".id) FROM "Disk" WHERE "Disk".id = {disk_id}));
-    UPDATE "Disk" SET free_space = free_space - {photo_size} WHERE "Disk".id = {disk_id};
-    COMMIT;
-    """).format(
-        photo_id=sql.Literal(photo.getPhotoID()),
-        photo_description=sql.Literal(photo.getDescription()),
-        photo_size=sql.Literal(photo.getSize()),
-        disk_id=sql.Literal(diskID))
+    query = prepared("addPhotoToDisk", photo.getPhotoID(), photo.getDescription(), photo.getSize(), diskID)
     result = ReturnValue.OK
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         conn.execute(query)
         conn.commit()
     except DatabaseException.NOT_NULL_VIOLATION:
@@ -360,57 +1358,113 @@ def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
         result = ReturnValue.ERROR
     finally:
         conn.close()
+        if result == ReturnValue.OK:
+            co_locate("add", photo.getPhotoID(), diskID)
+        invalidate_entities("Disk", diskID)
         return result
 
 
+def addPhotosToDisk(photos: Iterable[Photo], diskID: int) -> List[ReturnValue]:
+    return addPhotosToDisks((photo, diskID) for photo in photos)
+
+
+# places every (photo, diskID) pair in one transaction: the disks are locked once, all links are inserted with a
+# single statement and each disk's free_space is decremented once by the total size placed on it.
+# the pairs are judged in order exactly as consecutive addPhotoToDisk calls would judge them
+def addPhotosToDisks(placements: Iterable[Tuple[Photo, int]]) -> List[ReturnValue]:
+    placements = [(photo.getPhotoID(), photo.getDescription(), photo.getSize(), diskID)
+                  for photo, diskID in placements]
+    if not placements:
+        return []
+    photo_ids = sorted({photo_id for photo_id, _, _, _ in placements if photo_id is not None})
+    disk_ids = sorted({disk_id for _, _, _, disk_id in placements if disk_id is not None})
+    results = []
+    conn = None
+    try:
+        conn = open_connection()
+        # lock in id order so concurrent batches cannot deadlock each other
+        _, entries = conn.execute(sql.SQL("""
+            SELECT id, free_space FROM "Disk" WHERE id = ANY({disk_ids}::integer[]) ORDER BY id FOR UPDATE
+            """).format(disk_ids=sql.Literal(disk_ids)))
+        free_space = {disk_id: space for disk_id, space in entries.rows}
+        _, entries = conn.execute(sql.SQL("""
+            SELECT id, description, disk_free_space_needed FROM "Photo" WHERE id = ANY({photo_ids}::integer[])
+            """).format(photo_ids=sql.Literal(photo_ids)))
+        photos = {row[0]: row for row in entries.rows}
+        _, entries = conn.execute(sql.SQL("""
+            SELECT photo_id, disk_id FROM "PhotoInDisk"
+            WHERE photo_id = ANY({photo_ids}::integer[]) AND disk_id = ANY({disk_ids}::integer[])
+            """).format(photo_ids=sql.Literal(photo_ids), disk_ids=sql.Literal(disk_ids)))
+        links = set(entries.rows)
+
+        new_links = []
+        used_space = {}
+        for photo_id, description, size, disk_id in placements:
+            if disk_id not in free_space or photos.get(photo_id) != (photo_id, description, size):
+                results.append(ReturnValue.NOT_EXISTS)
+            elif (photo_id, disk_id) in links:
+                results.append(ReturnValue.ALREADY_EXISTS)
+            elif size > free_space[disk_id]:
+                results.append(ReturnValue.BAD_PARAMS)
+            else:
+                results.append(ReturnValue.OK)
+                links.add((photo_id, disk_id))
+                new_links.append((photo_id, disk_id))
+                free_space[disk_id] -= size
+                used_space[disk_id] = used_space.get(disk_id, 0) + size
+
+        if new_links:
+            conn.execute(sql.SQL("""
+                INSERT INTO "PhotoInDisk" (photo_id, disk_id)
+                SELECT * FROM unnest({photo_ids}::integer[], {disk_ids}::integer[]);
+                UPDATE "Disk" SET free_space = free_space - used.space
+                FROM unnest({used_disk_ids}::integer[], {used_space}::bigint[]) AS used(disk_id, space)
+                WHERE "Disk".id = used.disk_id;
+                """).format(
+                photo_ids=sql.Literal([photo_id for photo_id, _ in new_links]),
+                disk_ids=sql.Literal([disk_id for _, disk_id in new_links]),
+                used_disk_ids=sql.Literal(list(used_space.keys())),
+                used_space=sql.Literal(list(used_space.values()))))
+        conn.commit()
+    except Exception:
+        if conn is not None:
+            conn.rollback()
+        results = [ReturnValue.ERROR] * len(placements)
+    finally:
+        if conn is not None:
+            conn.close()
+    for (photo_id, _, _, disk_id), result in zip(placements, results):
+        if result == ReturnValue.OK:
+            co_locate("add", photo_id, disk_id)
+    invalidate_entities("Disk", *disk_ids)
+    return results
+
+
 def removePhotoFromDisk(photo: Photo, diskID: int) -> ReturnValue:
-    query = sql.SQL("""
-        CREATE OR REPLACE VIEW "PhotoSize" AS
-        SELECT COALESCE(
-        (
-            SELECT "Photo".disk_free_space_needed
-            FROM "Photo"
-            INNER JOIN "PhotoInDisk"
-            ON "PhotoInDisk".disk_id = {diskID} AND "Photo".id = "PhotoInDisk".photo_id AND "Photo".id = {photoID}
-        ), 0);
-        
-        UPDATE "Disk" set free_space=free_space + (SELECT * FROM "PhotoSize") where id = {diskID};
-        DELETE FROM "PhotoInDisk" where Photo_id = {photoID} and disk_id = {diskID};
-        """).format(
-        photoID=sql.Literal(photo.getPhotoID()),
-        PhotoSize=sql.Literal(photo.getSize()),
-        diskID=sql.Literal(diskID))
-    return delete(query=query)
+    query = prepared("removePhotoFromDisk", photo.getPhotoID(), diskID)
+    result = delete(query=query)
+    if result == ReturnValue.OK:
+        co_locate("remove", photo.getPhotoID(), diskID)
+    invalidate_entities("Disk", diskID)
+    return result
 
 
 def addRAMToDisk(ramID: int, diskID: int) -> ReturnValue:
-    query = sql.SQL("""INSERT INTO "RAMInDisk" VALUES ({ram_id},{disk_id} )""").format(
-        ram_id=sql.Literal(ramID),
-        disk_id=sql.Literal(diskID)
-    )
+    query = prepared("addRAMToDisk", ramID, diskID)
     return add(query)
 
 
 def removeRAMFromDisk(ramID: int, diskID: int) -> ReturnValue:
-    query = sql.SQL("""
-        DELETE FROM "RAMInDisk" where ram_id = {ramID} and disk_id = {diskID};
-        """).format(
-        ramID=sql.Literal(ramID),
-        diskID=sql.Literal(diskID))
+    query = prepared("removeRAMFromDisk", ramID, diskID)
     return delete(query=query, is_ram_or_disk=True)
 
 
 def averagePhotosSizeOnDisk(diskID: int) -> float:
-    query = sql.SQL("""
-    SELECT COALESCE(       
-    (SELECT AVG("Photo".disk_free_space_needed)
-    FROM "Photo" INNER JOIN "PhotoInDisk" ON "PhotoInDisk".disk_id = {diskID} AND "Photo".id = "PhotoInDisk".photo_id)
-    , 0);
-   """).format(diskID=sql.Literal(diskID))
+    query = prepared("averagePhotosSizeOnDisk", diskID)
     conn = None
     avg_size = 0
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             avg_size = entries.rows[0][0]
@@ -423,15 +1477,10 @@ def averagePhotosSizeOnDisk(diskID: int) -> float:
 
 def getTotalRamOnDisk(diskID: int) -> int:
     total_ram_available = 0
-    query = sql.SQL("""
-        select total_ram
-        from "TotalRAMInDisk"
-        where "TotalRAMInDisk".disk_id = {diskID}
-        """).format(
-        diskID=sql.Literal(diskID))
+    query = prepared("getTotalRamOnDisk", diskID)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             total_ram_available = entries.rows[0][0]
@@ -446,19 +1495,11 @@ def getTotalRamOnDisk(diskID: int) -> int:
 
 
 def getCostForDescription(description: str) -> int:
-    query = sql.SQL("""
-        SELECT COALESCE(
-        (select sum("Disk".cost_per_byte * "Photo".disk_free_space_needed)
-        from "Disk"
-        inner join "PhotoInDisk" on "PhotoInDisk".disk_id = "Disk".id
-        inner join "Photo" on "Photo".id = "PhotoInDisk".photo_id and "Photo".description = {description})
-        , 0)
-        """).format(
-        description=sql.Literal(description))
+    query = prepared("getCostForDescription", description)
     conn = None
     cost = 0
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         if row_effected != 0:
             cost = entries.rows[0][0]
@@ -469,14 +1510,11 @@ def getCostForDescription(description: str) -> int:
     return cost
 
 def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
-    query = sql.SQL("""
-     SELECT "Photo".id FROM "Disk" INNER JOIN "Photo" ON "Photo".disk_free_space_needed <= "Disk".free_space 
-     where "Disk".id = {disk_id} ORDER BY "Photo".id DESC LIMIT 5
-    """).format(disk_id=sql.Literal(diskID))
+    query = prepared("getPhotosCanBeAddedToDisk", diskID)
     conn = None
     photos_ids = []
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         for row in entries.rows:
             photos_ids.append(row[0])
@@ -488,19 +1526,11 @@ def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
 
 
 def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
-    query = sql.SQL("""
-    SELECT "Photo".id FROM "Disk" 
-    LEFT OUTER JOIN "TotalRAMInDisk" ON "TotalRAMInDisk".disk_id="Disk".id
-    LEFT OUTER JOIN "Photo" ON "Photo".disk_free_space_needed <= "Disk".free_space 
-    AND "Photo".disk_free_space_needed <= "TotalRAMInDisk".total_ram
-    WHERE "Disk".id = {disk_id} AND "Photo".id IS NOT NULL
-    ORDER BY "Photo".id ASC 
-    LIMIT 5;
-    """).format(disk_id=sql.Literal(diskID))
+    query = prepared("getPhotosCanBeAddedToDiskAndRAM", diskID)
     conn = None
     photos_ids = []
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         row_effected, entries = conn.execute(query)
         for row in entries.rows:
             photos_ids.append(row[0])
@@ -512,19 +1542,10 @@ def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
 
 def isCompanyExclusive(diskID: int) -> bool:
     is_exclusive = False
-    query = sql.SQL("""
-    SELECT (COUNT(DISTINCT "RAM".company) = 1 
-    AND MIN("Disk".manufacturing_company) = MIN("RAM".company)) 
-    OR (COUNT(DISTINCT "RAM".company) = 0 AND EXISTS(SELECT "Disk".id FROM "Disk" WHERE "Disk".id = {disk_id})) 
-    AS is_exclusive
-    FROM "Disk"
-    LEFT JOIN "RAMInDisk" ON "Disk".id = "RAMInDisk".disk_id
-    LEFT JOIN "RAM" ON "RAMInDisk".ram_id = "RAM".id
-    WHERE "Disk".id = {disk_id}
-    """).format(disk_id=sql.Literal(diskID))
+    query = prepared("isCompanyExclusive", diskID)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         rows_effected, entries = conn.execute(query)
         is_exclusive = entries.rows[0][0]
     except Exception as e:
@@ -536,22 +1557,10 @@ def isCompanyExclusive(diskID: int) -> bool:
 
 def isDiskContainingAtLeastNumExists(description: str, num: int) -> bool:
     result = False
-    query = sql.SQL("""
-    SELECT EXISTS 
-    (
-        SELECT 1 FROM "PhotoInDisk"
-        INNER JOIN "Photo" ON "Photo".id = "PhotoInDisk".photo_id
-        WHERE "Photo".description = {description}
-        GROUP BY "PhotoInDisk".disk_id
-        HAVING COUNT(*) >= {num}
-    ) AS result
-    """).format(
-        description=sql.Literal(description),
-        num=sql.Literal(num)
-    )
+    query = prepared("isDiskContainingAtLeastNumExists", description, num)
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         _, results = conn.execute(query)
         result = results.rows[0][0]
     except Exception as e:
@@ -560,20 +1569,13 @@ def isDiskContainingAtLeastNumExists(description: str, num: int) -> bool:
         conn.close()
     return result
 
-def getDisksContainingTheMostData() -> List[int]:
-    query = sql.SQL("""
-    SELECT DISTINCT "Disk".id
-    FROM "Disk"
-    JOIN "PhotoInDisk" ON "Disk".id = "PhotoInDisk".disk_id
-    JOIN "Photo" ON "PhotoInDisk".photo_id = "Photo".id
-    GROUP BY "Disk".id
-    ORDER BY SUM("Photo".disk_free_space_needed) DESC, "Disk".id ASC
-    LIMIT 5;
-    """)
+# the k disks holding the most bytes of photos, ties broken by id; disks holding no photo are not listed
+def getDisksContainingTheMostData(k: int = 5) -> List[int]:
+    query = prepared("getDisksContainingTheMostData", k)
     disks_ids = []
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         _, results = conn.execute(query)
         for row in results.rows:
             disks_ids.append(row[0])
@@ -583,19 +1585,59 @@ def getDisksContainingTheMostData() -> List[int]:
         conn.close()
     return disks_ids
 
+
+# a getDiskSummaries row as a DiskSummary
+def disk_summary(row) -> DiskSummary:
+    disk = Disk.badDisk() if row[1] is None else Disk(*row[1:6])
+    return DiskSummary(disk, row[6], row[7], row[8], list(row[9]), list(row[10]))
+
+
+# the results of the six per-disk read functions for diskID, from a single query
+def getDiskSummary(diskID: int) -> DiskSummary:
+    return getDiskSummaries([diskID])[0]
+
+
+# one DiskSummary per id in diskIDs (in the same order, duplicates included) from a single query;
+# a bad summary for every id if the query fails
+def getDiskSummaries(diskIDs: Iterable[int]) -> List[DiskSummary]:
+    diskIDs = list(diskIDs)
+    if not diskIDs:
+        return []
+    query = prepared("getDiskSummaries", diskIDs)
+    conn = None
+    summaries = None
+    try:
+        conn = open_connection()
+        _, entries = conn.execute(query)
+        summaries = {row[0]: row for row in entries.rows}
+    except Exception as e:
+        pass
+    finally:
+        conn.close()
+    if summaries is None:
+        return [DiskSummary.badDiskSummary() for _ in diskIDs]
+    return [disk_summary(summaries[disk_id]) for disk_id in diskIDs]
+
+
+# every (photo_id, disk_id) link ordered by photo, read through a server-side cursor batchSize rows at a time so
+# the table never has to fit in memory. a database error is raised, a partial export is never silent
+def exportPhotosInDisks(batchSize: int = STREAM_BATCH_SIZE) -> Iterator[Tuple[int, int]]:
+    with open_connection() as conn:
+        with conn.stream(prepared("exportPhotosInDisks"), batchSize) as rows:
+            for batch in rows.batches():
+                yield from batch
+
+
 # ************************************** BASIC API functions end **************************************
 
 # ************************************** ADVANCED API functions start **************************************
 
 def getConflictingDisks() -> List[int]:
-    query = sql.SQL("""
-    SELECT DISTINCT p1.disk_id FROM "PhotoInDisk" AS p1 JOIN "PhotoInDisk" AS p2 ON p1.photo_id = p2.photo_id
-    WHERE p1.disk_id <> p2.disk_id ORDER BY p1.disk_id ASC;
-    """)
+    query = prepared("getConflictingDisks")
     conn = None
     disks_ids = []
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         _, results = conn.execute(query)
         for row in results.rows:
             disks_ids.append(row[0])
@@ -606,17 +1648,57 @@ def getConflictingDisks() -> List[int]:
     return disks_ids
 
 
+# same result as getConflictingDisks, computed client-side from the links streamed in photo order, so memory stays
+# bounded by the number of disks rather than the size of the self-join
+def getConflictingDisksStreamed(batchSize: int = STREAM_BATCH_SIZE) -> List[int]:
+    conflicting = set()
+    try:
+        current, disks = None, []
+        for photo_id, disk_id in exportPhotosInDisks(batchSize):
+            if photo_id != current:
+                if len(disks) > 1:
+                    conflicting.update(disks)
+                current, disks = photo_id, []
+            disks.append(disk_id)
+        if len(disks) > 1:
+            conflicting.update(disks)
+    except Exception as e:
+        return []
+    return sorted(conflicting)
+
+
+# every disk conflicting now, then every disk as it becomes conflicting, each disk once. the trigger on
+# "PhotoInDisk" announces each link that leaves a photo on several disks when its transaction commits.
+# stops after timeout seconds without an announcement (None waits forever); a database error is raised
+def watchConflictingDisks(timeout: float = None) -> Iterator[int]:
+    conn = Connector.DBConnector()
+    try:
+        # listen first, so a conflict committed while the current ones are read is announced rather than missed
+        conn.listen(CONFLICTS_CHANNEL)
+        _, results = conn.execute(prepared("getConflictingDisks"))
+        reported = set()
+        for row in results.rows:
+            reported.add(row[0])
+            yield row[0]
+        while True:
+            notifications = conn.notifications(timeout)
+            if not notifications:
+                return
+            for _, payload in notifications:
+                for disk_id in sorted(int(disk_id) for disk_id in payload.split(",")):
+                    if disk_id not in reported:
+                        reported.add(disk_id)
+                        yield disk_id
+    finally:
+        conn.close()
+
+
 def mostAvailableDisks() -> List[int]:
-    query = sql.SQL("""
-    SELECT disk_id 
-    FROM "DiskPhotoCounts"
-    ORDER BY photo_count DESC, disk_speed DESC, disk_id ASC 
-    LIMIT 5;
-    """)
+    query = prepared("mostAvailableDisks")
     conn = None
     disks_ids = []
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         _, results = conn.execute(query)
         for row in results.rows:
             disks_ids.append(row[0])
@@ -628,32 +1710,17 @@ def mostAvailableDisks() -> List[int]:
 
 
 def getClosePhotos(photoID: int) -> List[int]:
-    query = sql.SQL(""" 
-    -- return TRUE if photo not saved on any disk
-    CREATE OR REPLACE VIEW "PhotoNotSavedOnSomeDisk" AS
-    SELECT NOT EXISTS (SELECT * FROM "PhotoInDisk" WHERE "PhotoInDisk".photo_id = {photo_id});
-    
-    -- return all disks the photo is saved on 
-    CREATE OR REPLACE VIEW "DisksPhotoSavedOn" AS
-    SELECT "PhotoInDisk".disk_id FROM "PhotoInDisk" WHERE "PhotoInDisk".photo_id = {photo_id}; 
-     
-    (SELECT DISTINCT PID.photo_id FROM "PhotoInDisk" PID 
-    WHERE PID.disk_id IN (SELECT * FROM "DisksPhotoSavedOn") AND PID.photo_id <> {photo_id}
-    GROUP BY PID.photo_id
-    HAVING COUNT(PID.photo_id) >= (SELECT COUNT(*) FROM "DisksPhotoSavedOn")  * 0.5 
-    ORDER BY PID.photo_id ASC
-    LIMIT 10)
-    
-    UNION ALL
-    
-    (SELECT "Photo".id FROM "Photo" WHERE (SELECT * FROM "PhotoNotSavedOnSomeDisk") AND "Photo".id <> {photo_id}
-    ORDER BY "Photo".id ASC LIMIT 10);
-
-    """).format(photo_id=sql.Literal(photoID))
+    index = co_location_index
+    if index is not None and type(photoID) is int:
+        close = index.closePhotos(photoID)
+        # a photo the index has on no disk is left to the query, which lists every other photo for it
+        if close is not None:
+            return close
+    query = prepared("getClosePhotos", photoID)
     conn = None
     photos_ids = []
     try:
-        conn = Connector.DBConnector()
+        conn = open_connection()
         _, results = conn.execute(query)
         for row in results.rows:
             photos_ids.append(row[0])
@@ -662,4 +1729,347 @@ def getClosePhotos(photoID: int) -> List[int]:
     finally:
         conn.close()
     return photos_ids
-# ************************************** ADVANCED API functions end **************************************
\ No newline at end of file
+
+
+# getClosePhotos of every id in photoIDs (in the same order, duplicates included) from a single query for the ids
+# the co-location index cannot answer; [] for every id if the query fails
+def getClosePhotosMany(photoIDs: Iterable[int]) -> List[List[int]]:
+    photoIDs = list(photoIDs)
+    index = co_location_index
+    indexed = {}
+    if index is not None:
+        for photo_id in photoIDs:
+            close = index.closePhotos(photo_id) if type(photo_id) is int else None
+            if close is not None:
+                indexed[photo_id] = close
+    queried = [photo_id for photo_id in photoIDs if photo_id not in indexed]
+    if not queried:
+        return [list(indexed[photo_id]) for photo_id in photoIDs]
+    query = prepared("getClosePhotosMany", queried)
+    conn = None
+    close_photos = None
+    try:
+        conn = open_connection()
+        _, results = conn.execute(query)
+        close_photos = {}
+        for photo_id, close_id in results.rows:
+            close_photos.setdefault(photo_id, []).append(close_id)
+    except Exception as e:
+        pass
+    finally:
+        conn.close()
+    if close_photos is None:
+        return [[] for _ in photoIDs]
+    close_photos.update(indexed)
+    return [list(close_photos.get(photo_id, [])) for photo_id in photoIDs]
+# ************************************** ADVANCED API functions end **************************************
+
+# ************************************** PAGINATED API functions start **************************************
+# unbounded, keyset-paginated variants of the LIMIT 5 / LIMIT 10 reads, in the same order.
+# "<name>Page" returns one page of ids and the token of the next page (None after the last page): pass it back as
+# after to continue where the page ended, rows added or removed meanwhile never shift the pages.
+# "<name>Paged" yields every id, reading pageSize rows at a time, from the start or from the page after a token
+
+def getPhotosCanBeAddedToDiskPage(diskID: int, after: tuple = None,
+                                  pageSize: int = PAGE_SIZE) -> Tuple[List[int], Optional[tuple]]:
+    return page_or_empty("getPhotosCanBeAddedToDisk", (diskID,), after, pageSize)
+
+
+def getPhotosCanBeAddedToDiskPaged(diskID: int, pageSize: int = PAGE_SIZE, after: tuple = None) -> Iterator[int]:
+    return read_pages("getPhotosCanBeAddedToDisk", (diskID,), after, pageSize)
+
+
+def getPhotosCanBeAddedToDiskAndRAMPage(diskID: int, after: tuple = None,
+                                        pageSize: int = PAGE_SIZE) -> Tuple[List[int], Optional[tuple]]:
+    return page_or_empty("getPhotosCanBeAddedToDiskAndRAM", (diskID,), after, pageSize)
+
+
+def getPhotosCanBeAddedToDiskAndRAMPaged(diskID: int, pageSize: int = PAGE_SIZE,
+                                         after: tuple = None) -> Iterator[int]:
+    return read_pages("getPhotosCanBeAddedToDiskAndRAM", (diskID,), after, pageSize)
+
+
+def getDisksContainingTheMostDataPage(after: tuple = None,
+                                      pageSize: int = PAGE_SIZE) -> Tuple[List[int], Optional[tuple]]:
+    return page_or_empty("getDisksContainingTheMostData", (), after, pageSize)
+
+
+def getDisksContainingTheMostDataPaged(pageSize: int = PAGE_SIZE, after: tuple = None) -> Iterator[int]:
+    return read_pages("getDisksContainingTheMostData", (), after, pageSize)
+
+
+# every page reads the whole "DiskPhotoCounts" view, which is computed rather than indexed
+def mostAvailableDisksPage(after: tuple = None, pageSize: int = PAGE_SIZE) -> Tuple[List[int], Optional[tuple]]:
+    return page_or_empty("mostAvailableDisks", (), after, pageSize)
+
+
+def mostAvailableDisksPaged(pageSize: int = PAGE_SIZE, after: tuple = None) -> Iterator[int]:
+    return read_pages("mostAvailableDisks", (), after, pageSize)
+
+
+def getClosePhotosPage(photoID: int, after: tuple = None,
+                       pageSize: int = PAGE_SIZE) -> Tuple[List[int], Optional[tuple]]:
+    return page_or_empty("getClosePhotos", (photoID,), after, pageSize)
+
+
+def getClosePhotosPaged(photoID: int, pageSize: int = PAGE_SIZE, after: tuple = None) -> Iterator[int]:
+    return read_pages("getClosePhotos", (photoID,), after, pageSize)
+
+# ************************************** PAGINATED API functions end **************************************
+
+# ************************************** BATCH API functions start **************************************
+
+# reads that batch() can queue: name -> (rows -> result, entity cache table or None, row -> cached args).
+# rows are the statement's rows as tuples, exactly as the function itself would have fetched them
+def first_value(default, cast=None):
+    def convert(rows):
+        if not rows:
+            return default
+        return rows[0][0] if cast is None or rows[0][0] is None else cast(rows[0][0])
+    return convert
+
+
+def first_column(rows):
+    return [row[0] for row in rows]
+
+
+batch_reads = {
+    "getPhotoByID": (lambda rows: Photo(*rows[0]) if rows else Photo.badPhoto(), "Photo", lambda row: row),
+    "getDiskByID": (lambda rows: Disk(*rows[0]) if rows else Disk.badDisk(), "Disk", lambda row: row),
+    "getRAMByID": (lambda rows: RAM(rows[0][0], rows[0][2], rows[0][1]) if rows else RAM.badRAM(), "RAM",
+                   lambda row: (row[0], row[2], row[1])),
+    # AVG is numeric, which psycopg2 returns as a Decimal
+    "averagePhotosSizeOnDisk": (first_value(0, Decimal), None, None),
+    "getTotalRamOnDisk": (first_value(0), None, None),
+    "getCostForDescription": (first_value(0), None, None),
+    "getPhotosCanBeAddedToDisk": (first_column, None, None),
+    "getPhotosCanBeAddedToDiskAndRAM": (first_column, None, None),
+    "isCompanyExclusive": (first_value(False), None, None),
+    "isDiskContainingAtLeastNumExists": (first_value(False), None, None),
+    "getDisksContainingTheMostData": (first_column, None, None),
+    "getConflictingDisks": (first_column, None, None),
+    "mostAvailableDisks": (first_column, None, None),
+}
+
+batch_entities = {"Photo": Photo, "Disk": Disk, "RAM": RAM}
+
+# statements per round trip, far below PostgreSQL's limit of 1664 columns in a select list
+BATCH_MAX_READS = 500
+
+
+# queues Solution reads and runs them together: every queued statement becomes one json_agg column of a single
+# SELECT, so the whole batch costs one connection and one round trip. each call returns a Future that is resolved
+# by run(). if the combined query fails (one bad statement aborts all of them) every read of that round trip falls
+# back to its own Solution call, so results and error values are always those of the individual functions
+class ReadBatch:
+    def __init__(self):
+        self.__pending = []
+
+    def __getattr__(self, name):
+        if name not in batch_reads:
+            raise AttributeError("%s cannot be batched" % name)
+
+        def queue(*params) -> Future:
+            return self.queue(name, *params)
+        return queue
+
+    def queue(self, name, *params) -> Future:
+        convert, table, _ = batch_reads[name]
+        # the statement needs every parameter, including those left to the function's defaults
+        arguments = inspect.signature(globals()[name]).bind(*params)
+        arguments.apply_defaults()
+        params = tuple(arguments.arguments.values())
+        future = Future()
+        if table is not None:
+            cached = cached_entity(table, params[0])
+            if cached is not LRUCache.MISSING:
+                future.set_result(batch_entities[table](*cached))
+                return future
+        generation = None if table is None else entity_generation(table)
+        self.__pending.append((name, params, future, generation))
+        return future
+
+    def __len__(self):
+        return len(self.__pending)
+
+    # drop the queued reads, their futures are cancelled
+    def cancel(self):
+        pending, self.__pending = self.__pending, []
+        for _, _, future, _ in pending:
+            future.cancel()
+
+    def run(self):
+        pending, self.__pending = self.__pending, []
+        for start in range(0, len(pending), BATCH_MAX_READS):
+            self.__runChunk(pending[start:start + BATCH_MAX_READS])
+
+    def __runChunk(self, chunk):
+        query = sql.SQL("SELECT ") + sql.SQL(", ").join(
+            sql.SQL("(SELECT COALESCE(json_agg(q), '[]')::text FROM (") + prepared(name, *params).inline() +
+            sql.SQL(") AS q)") for name, params, _, _ in chunk)
+        values = None
+        conn = None
+        try:
+            conn = open_connection()
+            _, entries = conn.execute(query, name="batch")
+            values = entries.rows[0]
+        except Exception as e:
+            pass
+        finally:
+            if conn is not None:
+                conn.close()
+        for index, (name, params, future, generation) in enumerate(chunk):
+            if values is None:
+                future.set_result(globals()[name](*params))
+                continue
+            # numbers with a fraction are numeric (AVG), parse them as psycopg2 would; a row object becomes the
+            # tuple of its values in column order
+            rows = json.loads(values[index], parse_float=Decimal,
+                              object_pairs_hook=lambda pairs: tuple(value for _, value in pairs))
+            convert, table, cache_args = batch_reads[name]
+            if table is not None and rows:
+                cache_entity(table, params[0], cache_args(rows[0]), generation)
+            future.set_result(convert(rows))
+
+
+# with batch() as reads: queue reads on it (reads.getTotalRamOnDisk(1), ...) and read the futures after the block
+@contextmanager
+def batch():
+    reads = ReadBatch()
+    try:
+        yield reads
+    except BaseException:
+        reads.cancel()
+        raise
+    reads.run()
+
+# ************************************** BATCH API functions end **************************************
+
+# ************************************** TRANSACTION API functions start **************************************
+
+# one API call made inside a UnitOfWork, run under its own savepoint. commit() releases the savepoint, rollback()
+# undoes this call alone, and close() releases a call that did neither (a read, a delete that matched nothing)
+# or rolls back one whose statement failed
+class UnitCall:
+    def __init__(self, conn: Connector.DBConnector, savepoint: str):
+        self.connection = conn.connection
+        self.__conn = conn
+        self.__savepoint = sql.Identifier(savepoint)
+        self.__open = True
+        self.__control("SAVEPOINT {name}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # savepoint statements go straight to the cursor, the query hooks only see the calls' own statements
+    def __control(self, command):
+        try:
+            self.__conn.cursor.execute(sql.SQL(command).format(name=self.__savepoint))
+        except Exception:
+            raise DatabaseException.ConnectionInvalid("Could not control the savepoint")
+
+    def __check(self):
+        if not self.__open:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+
+    def execute(self, query, printSchema=False, name: str = None):
+        self.__check()
+        return self.__conn.execute(query, printSchema, name)
+
+    def stream(self, query, batchSize: int = 1000, name: str = None):
+        self.__check()
+        return self.__conn.stream(query, batchSize, name)
+
+    def copyFrom(self, table: str, columns, rows) -> int:
+        self.__check()
+        return self.__conn.copyFrom(table, columns, rows)
+
+    def explain(self, query) -> str:
+        self.__check()
+        return self.__conn.explain(query)
+
+    def commit(self):
+        if self.__open:
+            self.__open = False
+            self.__control("RELEASE SAVEPOINT {name}")
+
+    def rollback(self):
+        if self.__open:
+            self.__open = False
+            self.__control("ROLLBACK TO SAVEPOINT {name}")
+            self.__control("RELEASE SAVEPOINT {name}")
+
+    def close(self):
+        if self.__open:
+            if self.connection.get_transaction_status() == extensions.TRANSACTION_STATUS_INERROR:
+                self.rollback()
+            else:
+                self.commit()
+
+
+# the API calls made in one transaction() block, run on one connection and committed once. every call keeps its
+# own ReturnValue: a call that fails is rolled back to its savepoint, the calls before and after it stay.
+# what the calls do to the entity caches and the co-location index is applied once the unit has committed
+class UnitOfWork:
+    def __init__(self):
+        self.committed = False
+        self.__conn = Connector.DBConnector()
+        self.__savepoints = itertools.count(1)
+        self.__afterCommit = []
+        self.__rollbackOnly = False
+
+    def call(self) -> UnitCall:
+        return UnitCall(self.__conn, "unit_call_%d" % next(self.__savepoints))
+
+    # run callback(*args) once the unit has committed, never if it is rolled back
+    def afterCommit(self, callback, *args):
+        self.__afterCommit.append((callback, args))
+
+    # roll the whole unit back when the block ends, even if it ends normally
+    def setRollbackOnly(self):
+        self.__rollbackOnly = True
+
+    def isRollbackOnly(self) -> bool:
+        return self.__rollbackOnly
+
+    # commit (or roll back) and close the connection; a failed commit raises DatabaseException.ConnectionInvalid
+    def finish(self, commit: bool):
+        try:
+            if commit and not self.__rollbackOnly:
+                self.__conn.commit()
+                self.committed = True
+            else:
+                self.__conn.rollback()
+        finally:
+            self.__conn.close()
+        callbacks, self.__afterCommit = self.__afterCommit, []
+        if self.committed:
+            for callback, args in callbacks:
+                callback(*args)
+
+
+# with transaction() as unit: every Solution call made in the block, in this thread, runs on one connection and
+# all of them are committed together when the block ends; an exception (or unit.setRollbackOnly()) rolls all of
+# them back. a nested transaction() joins the enclosing unit
+@contextmanager
+def transaction():
+    unit = current_unit.get()
+    if unit is not None:
+        yield unit
+        return
+    unit = UnitOfWork()
+    token = current_unit.set(unit)
+    try:
+        yield unit
+    except BaseException:
+        current_unit.reset(token)
+        unit.finish(False)
+        raise
+    current_unit.reset(token)
+    unit.finish(True)
+
+# ************************************** TRANSACTION API functions end **************************************
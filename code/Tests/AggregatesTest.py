@@ -0,0 +1,28 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def test_ram_totals(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 10, 10, 10), Disk(2, "DELL", 10, 10, 10)])
+        Solution.addRAMs([RAM(1, "DELL", 4), RAM(2, "DELL", 6)])
+        self.assertEqual(0, Solution.getTotalRamOnDisk(1), "New disk has no RAM")
+        self.assertEqual(ReturnValue.OK, Solution.addRAMToDisk(1, 1), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.addRAMToDisk(2, 1), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.addRAMToDisk(2, 2), "Should work")
+        self.assertEqual(10, Solution.getTotalRamOnDisk(1), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.removeRAMFromDisk(1, 1), "Should work")
+        self.assertEqual(6, Solution.getTotalRamOnDisk(1), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.deleteRAM(2), "Should work")
+        self.assertEqual(0, Solution.getTotalRamOnDisk(1), "Deleting RAM should update every disk holding it")
+        self.assertEqual(0, Solution.getTotalRamOnDisk(2), "Deleting RAM should update every disk holding it")
+        self.assertEqual([], Solution.checkRamTotals(), "Totals should be consistent")
+        self.assertEqual(ReturnValue.OK, Solution.rebuildRamTotals(), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
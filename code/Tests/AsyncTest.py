@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+import AsyncSolution
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+@unittest.skipIf(AsyncSolution.asyncpg is None, "asyncpg is not installed")
+class Test(AbstractTest):
+    def run_async(self, scenario):
+        async def run():
+            await AsyncSolution.connect(minSize=1, maxSize=4)
+            try:
+                return await scenario()
+            finally:
+                await AsyncSolution.close()
+        return asyncio.run(run())
+
+    def test_crud(self) -> None:
+        async def scenario():
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addDisk(Disk(1, "DELL", 10, 10, 10)),
+                             "Should work")
+            self.assertEqual(ReturnValue.BAD_PARAMS, await AsyncSolution.addPhoto(Photo(1, "Tree", -1)),
+                             "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addRAM(RAM(1, "DELL", 5)), "Should work")
+            self.assertEqual("DELL", (await AsyncSolution.getRAMByID(1)).getCompany(), "Should work")
+            self.assertEqual(None, (await AsyncSolution.getDiskByID(2)).getDiskID(), "Should work")
+            self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.addPhotoToDisk(Photo(1, "Tree", 4), 2),
+                             "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addPhotoToDisk(Photo(1, "Tree", 4), 1),
+                             "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addRAMToDisk(1, 1), "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addDiskAndPhoto(Disk(2, "HP", 1, 1, 1),
+                                                                                 Photo(2, "Sky", 1)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS,
+                             await AsyncSolution.addDiskAndPhoto(Disk(3, "HP", 1, 1, 1), Photo(2, "Sky", 1)),
+                             "Should work")
+            self.assertEqual(None, (await AsyncSolution.getDiskByID(3)).getDiskID(), "Should be rolled back")
+            self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.deleteRAM(7), "Should work")
+        self.run_async(scenario)
+        self.assertEqual(6, Solution.getDiskByID(1).getFreeSpace(), "Should be visible to Solution")
+        self.assertEqual(5, Solution.getTotalRamOnDisk(1), "Should maintain the RAM totals")
+
+    def test_queries_match_solution(self) -> None:
+        for disk_id in range(1, 4):
+            Solution.addDisk(Disk(disk_id, "DELL", disk_id, 20, disk_id))
+        for photo_id in range(1, 6):
+            Solution.addPhoto(Photo(photo_id, "Tree" if photo_id % 2 else "Sky", photo_id))
+            Solution.addPhotoToDisk(Photo(photo_id, "Tree" if photo_id % 2 else "Sky", photo_id), 1 + photo_id % 3)
+        Solution.addPhotoToDisk(Photo(1, "Tree", 1), 1)
+        Solution.addRAM(RAM(1, "DELL", 3))
+        Solution.addRAMToDisk(1, 2)
+        calls = [("averagePhotosSizeOnDisk", (2,)), ("getTotalRamOnDisk", (2,)), ("getCostForDescription", ("Tree",)),
+                 ("getPhotosCanBeAddedToDisk", (1,)), ("getPhotosCanBeAddedToDiskAndRAM", (2,)),
+                 ("isCompanyExclusive", (2,)), ("isDiskContainingAtLeastNumExists", ("Tree", 2)),
+                 ("getConflictingDisks", ()), ("mostAvailableDisks", ()), ("getDisksContainingTheMostData", ()),
+                 ("getClosePhotos", (1,)), ("getClosePhotosMany", ([1, 2, 7],))]
+        expected = [getattr(Solution, name)(*args) for name, args in calls]
+
+        async def scenario():
+            # every call at once, multiplexed on the pool
+            return await asyncio.gather(*(getattr(AsyncSolution, name)(*args) for name, args in calls))
+        self.assertEqual(expected, self.run_async(scenario), "Should return what Solution returns")
+
+        async def summaries():
+            return [str(summary) for summary in await AsyncSolution.getDiskSummaries([1, 2, 4])]
+        self.assertEqual([str(summary) for summary in Solution.getDiskSummaries([1, 2, 4])], self.run_async(summaries),
+                         "Should return what Solution returns")
+
+        async def deletes():
+            return [await AsyncSolution.removePhotoFromDisk(Photo(2, "Sky", 2), 3),
+                    await AsyncSolution.deletePhoto(Photo(1, "Tree", 1)), await AsyncSolution.deleteDisk(3)]
+        self.assertEqual([ReturnValue.OK] * 3, self.run_async(deletes), "Should work")
+        self.assertEqual(16, Solution.getDiskByID(2).getFreeSpace(), "Deleting a photo should free its space")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
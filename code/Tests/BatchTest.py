@@ -0,0 +1,66 @@
+import unittest
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.Instrumentation import Recorder
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        for disk_id in range(1, 4):
+            Solution.addDisk(Disk(disk_id, "DELL", disk_id, 20, disk_id))
+        for photo_id in range(1, 6):
+            photo = Photo(photo_id, "Tree" if photo_id % 2 else "Sky", photo_id)
+            Solution.addPhoto(photo)
+            Solution.addPhotoToDisk(photo, 1 + photo_id % 3)
+        Solution.addRAM(RAM(1, "DELL", 3))
+        Solution.addRAMToDisk(1, 2)
+
+    def test_results_match_the_functions(self) -> None:
+        calls = [("getTotalRamOnDisk", (2,)), ("averagePhotosSizeOnDisk", (2,)), ("averagePhotosSizeOnDisk", (7,)),
+                 ("isCompanyExclusive", (2,)), ("getPhotosCanBeAddedToDisk", (2,)),
+                 ("getCostForDescription", ("Tree",)), ("getPhotosCanBeAddedToDiskAndRAM", (2,)),
+                 ("isDiskContainingAtLeastNumExists", ("Tree", 1)), ("getConflictingDisks", ()),
+                 ("mostAvailableDisks", ())]
+        recorder = DBConnector.addHook(Recorder())
+        try:
+            with Solution.batch() as reads:
+                futures = [getattr(reads, name)(*params) for name, params in calls]
+        finally:
+            DBConnector.removeHook(recorder)
+        self.assertEqual(['batch'], list(recorder.snapshot()['queries']), "Should be a single round trip")
+        for (name, params), future in zip(calls, futures):
+            expected = getattr(Solution, name)(*params)
+            self.assertEqual(expected, future.result(), name)
+            self.assertEqual(type(expected), type(future.result()), name)
+
+    def test_entities(self) -> None:
+        with Solution.batch() as reads:
+            photo, disk, ram, missing = reads.getPhotoByID(3), reads.getDiskByID(2), reads.getRAMByID(1), \
+                                        reads.getDiskByID(9)
+        self.assertEqual((3, "Tree", 3), (photo.result().getPhotoID(), photo.result().getDescription(),
+                                          photo.result().getSize()), "Should work")
+        self.assertEqual(Solution.getDiskByID(2).getFreeSpace(), disk.result().getFreeSpace(), "Should work")
+        self.assertEqual(("DELL", 3), (ram.result().getCompany(), ram.result().getSize()), "Should work")
+        self.assertEqual(None, missing.result().getDiskID(), "Should work")
+
+    def test_failure_falls_back_to_single_calls(self) -> None:
+        with Solution.batch() as reads:
+            total = reads.getTotalRamOnDisk(2)
+            # a text id makes the combined query fail
+            bad = reads.getPhotosCanBeAddedToDisk("x")
+        self.assertEqual(3, total.result(), "Should still be answered")
+        self.assertEqual(Solution.getPhotosCanBeAddedToDisk("x"), bad.result(), "Should match the single call")
+
+    def test_only_reads(self) -> None:
+        with Solution.batch() as reads:
+            self.assertRaises(AttributeError, lambda: reads.addPhoto)
+        self.assertEqual(0, len(reads), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,46 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def test_addPhotos(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        photos = [Photo(2, "Tree", 10), Photo(1, "Tree", 10), Photo(3, "Tree", -1), Photo(4, None, 1),
+                  Photo(5, "Sea\twith\\tab", 5), Photo(5, "Sea", 5)]
+        expected = [ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.BAD_PARAMS, ReturnValue.BAD_PARAMS,
+                    ReturnValue.OK, ReturnValue.ALREADY_EXISTS]
+        self.assertEqual(expected, Solution.addPhotos(photos), "Each row should get its own ReturnValue")
+        self.assertEqual(2, Solution.getPhotoByID(2).getPhotoID(), "Valid rows should be inserted")
+        self.assertEqual("Sea\twith\\tab", Solution.getPhotoByID(5).getDescription(), "Text should round-trip")
+        self.assertEqual(None, Solution.getPhotoByID(3).getPhotoID(), "Bad rows should not be inserted")
+
+    def test_addDisks_and_addRAMs(self) -> None:
+        self.assertEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.BAD_PARAMS],
+                         Solution.addDisks([Disk(1, "DELL", 10, 10, 10), Disk(1, "DELL", 10, 10, 10),
+                                            Disk(2, "DELL", 0, 10, 10)]), "Should work")
+        self.assertEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS],
+                         Solution.addRAMs([RAM(1, "HP", 10), RAM(2, "HP", 0)]), "Should work")
+        self.assertEqual([], Solution.addRAMs([]), "Empty batch")
+
+    def test_addPhotosToDisk(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 10, 25, 10), Disk(2, "DELL", 10, 5, 10)])
+        Solution.addPhotos([Photo(1, "Tree", 10), Photo(2, "Tree", 10), Photo(3, "Tree", 10), Photo(4, "Tree", 5)])
+        photos = [Photo(1, "Tree", 10), Photo(1, "Tree", 10), Photo(2, "Tree", 10), Photo(3, "Tree", 10),
+                  Photo(4, "Tree", 5), Photo(5, "Tree", 1), Photo(2, "Sea", 10)]
+        expected = [ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.OK, ReturnValue.BAD_PARAMS,
+                    ReturnValue.OK, ReturnValue.NOT_EXISTS, ReturnValue.NOT_EXISTS]
+        self.assertEqual(expected, Solution.addPhotosToDisk(photos, 1), "Should match one call per photo")
+        self.assertEqual(0, Solution.getDiskByID(1).getFreeSpace(), "free_space should drop by the placed sizes")
+        self.assertEqual([ReturnValue.BAD_PARAMS, ReturnValue.OK, ReturnValue.NOT_EXISTS],
+                         Solution.addPhotosToDisks([(Photo(1, "Tree", 10), 2), (Photo(4, "Tree", 5), 2),
+                                                    (Photo(4, "Tree", 5), 3)]), "Should work")
+        self.assertEqual(0, Solution.getDiskByID(2).getFreeSpace(), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,37 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        Solution.enableEntityCache(maxSize=10, ttl=60.0)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Solution.disableEntityCache()
+
+    def test_hits_and_invalidation(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should be served from the cache")
+        self.assertEqual(1, Solution.entityCacheStats()["Disk"]["hits"], "Second lookup should hit")
+        self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(1, "Tree", 4), 1), "Should work")
+        self.assertEqual(6, Solution.getDiskByID(1).getFreeSpace(), "Placement should invalidate the disk")
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(1, "Tree", 4)), "Should work")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Deleting a photo should invalidate disks")
+        self.assertEqual(None, Solution.getPhotoByID(1).getPhotoID(), "Deleted photo should not be cached")
+
+    def test_returns_fresh_objects(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+        Solution.getPhotoByID(1).setDescription("Changed")
+        self.assertEqual("Tree", Solution.getPhotoByID(1).getDescription(), "Callers must not mutate the cache")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,44 @@
+import random
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def test_matches_definition(self) -> None:
+        rnd = random.Random(7)
+        photos = [Photo(photo_id, "Tree", 1) for photo_id in range(1, 41)]
+        self.assertEqual([ReturnValue.OK] * 6, Solution.addDisks([Disk(i, "DELL", 1, 1000, 1) for i in range(1, 7)]),
+                         "Should work")
+        self.assertEqual([ReturnValue.OK] * len(photos), Solution.addPhotos(photos), "Should work")
+        links = set()
+        for photo in photos[:30]:
+            for disk_id in rnd.sample(range(1, 7), rnd.randint(1, 4)):
+                self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(photo, disk_id), "Should work")
+                links.add((photo.getPhotoID(), disk_id))
+        photo_ids = [photo.getPhotoID() for photo in photos]
+        queried = photo_ids + [99, 3]
+        expected = [self.close_photos(photo_id, photo_ids, links)[:10] for photo_id in queried]
+        self.assertEqual(expected, [Solution.getClosePhotos(photo_id) for photo_id in queried], "Should work")
+        self.assertEqual(expected, Solution.getClosePhotosMany(queried), "Should match getClosePhotos")
+        self.assertEqual([], Solution.getClosePhotosMany([]), "Should work")
+
+    def test_no_ddl(self) -> None:
+        Solution.addDisk(Disk(1, "DELL", 1, 10, 1))
+        Solution.addPhoto(Photo(1, "Tree", 4))
+        Solution.addPhotoToDisk(Photo(1, "Tree", 4), 1)
+        self.assertEqual([], Solution.getClosePhotos(1), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.removePhotoFromDisk(Photo(1, "Tree", 4), 1), "Should work")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should free the photo's space")
+        self.assertEqual(ReturnValue.OK, Solution.removePhotoFromDisk(Photo(1, "Tree", 4), 1), "Should work")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should not free space twice")
+        views = self.rows("SELECT viewname FROM pg_views WHERE viewname IN "
+                          "('PhotoSize', 'PhotoNotSavedOnSomeDisk', 'DisksPhotoSavedOn')")
+        self.assertEqual([], views, "Should not create views")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
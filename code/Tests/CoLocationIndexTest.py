@@ -0,0 +1,90 @@
+import random
+import unittest
+import Solution
+from Utility.CoLocationIndex import CoLocationIndex
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def tearDown(self) -> None:
+        Solution.disableCoLocationIndex()
+        super().tearDown()
+
+    # getClosePhotos of every photo, answered by the index when enabled and by the query when not
+    def close_photos(self, photo_ids):
+        with_index = [Solution.getClosePhotos(photo_id) for photo_id in photo_ids]
+        with_many = Solution.getClosePhotosMany(photo_ids)
+        index = Solution.co_location_index
+        Solution.disableCoLocationIndex()
+        expected = [Solution.getClosePhotos(photo_id) for photo_id in photo_ids]
+        Solution.co_location_index = index
+        self.assertEqual(expected, with_index, "The index should answer like the query")
+        self.assertEqual(expected, with_many, "Should work")
+
+    def test_maintained_by_writes(self) -> None:
+        rnd = random.Random(3)
+        photos = [Photo(photo_id, "Tree", 1) for photo_id in range(1, 31)]
+        Solution.addDisks([Disk(disk_id, "DELL", 1, 1000, 1) for disk_id in range(1, 7)])
+        Solution.addPhotos(photos)
+        for photo in photos[:10]:
+            Solution.addPhotoToDisk(photo, rnd.randint(1, 6))
+        self.assertEqual(ReturnValue.OK, Solution.enableCoLocationIndex(), "Should work")
+        photo_ids = [photo.getPhotoID() for photo in photos] + [99]
+        self.close_photos(photo_ids)
+        for photo in photos[10:25]:
+            Solution.addPhotoToDisk(photo, rnd.randint(1, 6))
+        Solution.addPhotosToDisks([(photo, rnd.randint(1, 6)) for photo in photos[:25]])
+        self.close_photos(photo_ids)
+        for photo in photos[:5]:
+            Solution.removePhotoFromDisk(photo, rnd.randint(1, 6))
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(photos[6]), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(7, "Sky", 1)), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.deleteDisk(2), "Should work")
+        self.close_photos(photo_ids)
+        Solution.clearTables()
+        self.assertEqual({'disks': 0, 'photos': 0, 'links': 0}, Solution.co_location_index.stats(), "Should work")
+
+    def test_rebuild(self) -> None:
+        Solution.addDisk(Disk(1, "DELL", 1, 1000, 1))
+        for photo_id in (1, 2):
+            Solution.addPhoto(Photo(photo_id, "Tree", 1))
+        Solution.addPhotoToDisk(Photo(1, "Tree", 1), 1)
+        self.assertEqual(ReturnValue.OK, Solution.enableCoLocationIndex(), "Should work")
+        # a write the index is not told about
+        self.execute('INSERT INTO "PhotoInDisk" VALUES (2, 1)')
+        self.assertEqual([], Solution.getClosePhotos(1), "The index should not see other writers")
+        self.assertEqual(ReturnValue.OK, Solution.rebuildCoLocationIndex(), "Should work")
+        self.assertEqual([2], Solution.getClosePhotos(1), "Should work")
+
+    def test_drop_and_create(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.enableCoLocationIndex(), "Should work")
+        Solution.addDisk(Disk(1, "DELL", 1, 1000, 1))
+        for photo_id in (1, 2):
+            Solution.addPhoto(Photo(photo_id, "Tree", 1))
+            Solution.addPhotoToDisk(Photo(photo_id, "Tree", 1), 1)
+        Solution.dropTables()
+        self.assertEqual({'disks': 0, 'photos': 0, 'links': 0}, Solution.co_location_index.stats(),
+                         "dropTables should clear the index")
+        Solution.createTables()
+        Solution.addDisk(Disk(1, "DELL", 1, 1000, 1))
+        for photo_id in (1, 3):
+            Solution.addPhoto(Photo(photo_id, "Tree", 1))
+            Solution.addPhotoToDisk(Photo(photo_id, "Tree", 1), 1)
+        self.assertEqual([3], Solution.getClosePhotos(1), "Links of dropped tables should be gone")
+
+    def test_rebuild_replays_writes(self) -> None:
+        index = CoLocationIndex()
+        index.add(1, 1)
+        index.beginRebuild()
+        index.add(2, 1)
+        index.remove(1, 1)
+        index.finishRebuild([(1, 1), (3, 1)])
+        self.assertEqual([3], index.closePhotos(2), "Writes during a rebuild should be replayed")
+        self.assertEqual(None, index.closePhotos(1), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,78 @@
+import random
+import threading
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    @staticmethod
+    def replica_counts():
+        return Test.rows('SELECT photo_id, replicas FROM "PhotoReplicaCount" ORDER BY photo_id')
+
+    @staticmethod
+    def expected_counts(links):
+        counts = {}
+        for photo_id, _ in links:
+            counts[photo_id] = counts.get(photo_id, 0) + 1
+        return sorted(counts.items())
+
+    @staticmethod
+    def expected_conflicts(links):
+        counts = dict(Test.expected_counts(links))
+        return sorted({disk_id for photo_id, disk_id in links if counts[photo_id] > 1})
+
+    def test_counts_follow_links(self) -> None:
+        rnd = random.Random(5)
+        photos = [Photo(photo_id, "Tree", 1) for photo_id in range(1, 21)]
+        Solution.addDisks([Disk(disk_id, "DELL", 1, 1000, 1) for disk_id in range(1, 9)])
+        Solution.addPhotos(photos)
+        links = set()
+        for photo in photos[:10]:
+            disk_id = rnd.randint(1, 8)
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(photo, disk_id), "Should work")
+            links.add((photo.getPhotoID(), disk_id))
+        links |= self.place([(photo, rnd.randint(1, 8)) for photo in photos])
+        self.assertEqual(self.expected_counts(links), self.replica_counts(), "Should count every link")
+        self.assertEqual(self.expected_conflicts(links), Solution.getConflictingDisks(), "Should work")
+        self.assertEqual(Solution.getConflictingDisksStreamed(), Solution.getConflictingDisks(), "Should work")
+
+        for photo_id, disk_id in sorted(links)[:6]:
+            Solution.removePhotoFromDisk(photos[photo_id - 1], disk_id)
+            links.discard((photo_id, disk_id))
+        Solution.deletePhoto(photos[9])
+        Solution.deleteDisk(3)
+        links = {(photo_id, disk_id) for photo_id, disk_id in links if photo_id != 10 and disk_id != 3}
+        self.assertEqual(self.expected_counts(links), self.replica_counts(), "Should follow deletes")
+        self.assertEqual(self.expected_conflicts(links), Solution.getConflictingDisks(), "Should work")
+
+        self.execute('UPDATE "PhotoReplicaCount" SET replicas = 7')
+        self.assertEqual(ReturnValue.OK, Solution.rebuildReplicaCounts(), "Should work")
+        self.assertEqual(self.expected_counts(links), self.replica_counts(), "Should be rebuilt")
+
+    def test_watch(self) -> None:
+        Solution.addDisks([Disk(disk_id, "DELL", 1, 1000, 1) for disk_id in range(1, 6)])
+        Solution.addPhotos([Photo(photo_id, "Tree", 1) for photo_id in range(1, 4)])
+        Solution.addPhotoToDisk(Photo(1, "Tree", 1), 1)
+        Solution.addPhotoToDisk(Photo(1, "Tree", 1), 2)
+        Solution.addPhotoToDisk(Photo(2, "Tree", 1), 3)
+        watch = Solution.watchConflictingDisks(timeout=5)
+        self.assertEqual([1, 2], [next(watch), next(watch)], "Should start with the current conflicts")
+
+        def conflict():
+            Solution.addPhotoToDisk(Photo(3, "Tree", 1), 5)
+            Solution.addPhotoToDisk(Photo(1, "Tree", 1), 5)
+            Solution.addPhotoToDisk(Photo(2, "Tree", 1), 4)
+        writer = threading.Thread(target=conflict)
+        writer.start()
+        self.assertEqual([5, 3, 4], [next(watch), next(watch), next(watch)], "Should report new conflicts")
+        writer.join()
+        watch.close()
+        self.assertEqual([1, 2, 3, 4, 5], list(Solution.watchConflictingDisks(timeout=0)), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
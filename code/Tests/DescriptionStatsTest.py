@@ -0,0 +1,95 @@
+import random
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+DESCRIPTIONS = ["Tree", "Sky", "Sea"]
+
+
+class Test(AbstractTest):
+    @staticmethod
+    def stats():
+        return (Test.rows('SELECT description, disk_id, photos, bytes FROM "DescriptionDiskCount" '
+                          'ORDER BY description, disk_id'),
+                Test.rows('SELECT description, total_cost FROM "DescriptionStats" ORDER BY description'))
+
+    @staticmethod
+    def expected_stats(links, photos, costs):
+        counts, totals = {}, {}
+        for photo_id, disk_id in links:
+            description, size = photos[photo_id]
+            photo_count, used = counts.get((description, disk_id), (0, 0))
+            counts[(description, disk_id)] = (photo_count + 1, used + size)
+            totals[description] = totals.get(description, 0) + size * costs[disk_id]
+        return ([(description, disk_id, photo_count, used)
+                 for (description, disk_id), (photo_count, used) in sorted(counts.items())], sorted(totals.items()))
+
+    def check(self, links, photos, costs, message):
+        expected_counts, expected_totals = self.expected_stats(links, photos, costs)
+        self.assertEqual((expected_counts, expected_totals), self.stats(), message)
+        totals = dict(expected_totals)
+        for description in DESCRIPTIONS + ["Moon"]:
+            self.assertEqual(totals.get(description, 0), Solution.getCostForDescription(description), message)
+            most = max([count for tag, _, count, _ in expected_counts if tag == description], default=0)
+            for num in {1, max(most, 1), most + 1}:
+                self.assertEqual(most >= num, Solution.isDiskContainingAtLeastNumExists(description, num), message)
+
+    def test_stats_follow_writes(self) -> None:
+        rnd = random.Random(23)
+        photos = {photo_id: (rnd.choice(DESCRIPTIONS), rnd.randint(0, 20)) for photo_id in range(1, 41)}
+        costs = {disk_id: rnd.randint(1, 5) for disk_id in range(1, 9)}
+        Solution.addDisks([Disk(disk_id, "DELL", 1, 1000, cost) for disk_id, cost in costs.items()])
+        Solution.addPhotos([Photo(photo_id, *photos[photo_id]) for photo_id in photos])
+        self.check(set(), photos, costs, "Nothing is placed yet")
+
+        links = self.place([(Photo(photo_id, *photos[photo_id]), rnd.randint(1, 8)) for photo_id in photos
+                            for _ in range(2)])
+        for photo_id in range(1, 6):
+            if Solution.addPhotoToDisk(Photo(photo_id, *photos[photo_id]), 8) == ReturnValue.OK:
+                links.add((photo_id, 8))
+        self.check(links, photos, costs, "Should follow placements")
+
+        for photo_id, disk_id in sorted(links)[:10]:
+            Solution.removePhotoFromDisk(Photo(photo_id, *photos[photo_id]), disk_id)
+            links.discard((photo_id, disk_id))
+        self.check(links, photos, costs, "Should follow removals")
+
+        costs[2], costs[5] = 7, 1
+        self.execute('UPDATE "Disk" SET cost_per_byte = 7 WHERE id = 2; '
+                     'UPDATE "Disk" SET cost_per_byte = 1 WHERE id = 5')
+        self.check(links, photos, costs, "Should follow cost changes")
+
+        photos[30], photos[31] = ("Moon", photos[30][1]), (photos[31][0], 3)
+        self.execute('UPDATE "Photo" SET description = \'Moon\' WHERE id = 30; '
+                     'UPDATE "Photo" SET disk_free_space_needed = 3 WHERE id = 31')
+        self.check(links, photos, costs, "Should follow photo changes")
+
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(12, *photos[12])), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.deleteDisk(3), "Should work")
+        links = {(photo_id, disk_id) for photo_id, disk_id in links if photo_id != 12 and disk_id != 3}
+        self.check(links, photos, costs, "Should follow deletes")
+
+        self.execute('DELETE FROM "DescriptionStats" WHERE description = \'Tree\'; '
+                     'UPDATE "DescriptionDiskCount" SET photos = 0')
+        self.assertEqual(ReturnValue.OK, Solution.rebuildDescriptionStats(), "Should work")
+        self.check(links, photos, costs, "Should be rebuilt")
+
+    def test_drop_removes_functions(self) -> None:
+        Solution.dropTables()
+        functions = self.rows("SELECT proname FROM pg_proc WHERE proname LIKE 'description\\_stats\\_%'")
+        Solution.createTables()
+        self.assertEqual([], functions, "dropTables should drop every function createTables made")
+
+    def test_retired_index_is_dropped(self) -> None:
+        query = "SELECT indexname FROM pg_indexes WHERE indexname = 'photo_description_idx'"
+        for upgrade in (Solution.createTables, Solution.applyIndexes):
+            self.execute('CREATE INDEX photo_description_idx ON "Photo" (description, id)')
+            upgrade()
+            self.assertEqual([], self.rows(query), "The index nothing reads any more should be dropped")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
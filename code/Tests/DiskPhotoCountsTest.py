@@ -0,0 +1,18 @@
+import unittest
+import Solution
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def test_mostAvailableDisks(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 1, 10, 1), Disk(2, "DELL", 5, 10, 1), Disk(3, "DELL", 5, 5, 1),
+                           Disk(4, "DELL", 9, 0, 1), Disk(5, "DELL", 5, 10, 1), Disk(6, "DELL", 1, 4, 1)])
+        Solution.addPhotos([Photo(1, "Tree", 10), Photo(2, "Tree", 5), Photo(3, "Tree", 0)])
+        # photo_count DESC, speed DESC, id ASC; a photo exactly as big as the free space fits
+        self.assertEqual([2, 5, 1, 3, 4], Solution.mostAvailableDisks(), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,52 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+class Test(AbstractTest):
+    def individual(self, disk_id):
+        disk = Solution.getDiskByID(disk_id)
+        return [(disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(), disk.getCost()),
+                Solution.getTotalRamOnDisk(disk_id), Solution.averagePhotosSizeOnDisk(disk_id),
+                Solution.isCompanyExclusive(disk_id), Solution.getPhotosCanBeAddedToDisk(disk_id),
+                Solution.getPhotosCanBeAddedToDiskAndRAM(disk_id)]
+
+    def summarized(self, summary):
+        disk = summary.getDisk()
+        return [(disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(), disk.getCost()),
+                summary.getTotalRam(), summary.getAveragePhotosSize(), summary.isCompanyExclusive(),
+                summary.getPhotosCanBeAdded(), summary.getPhotosCanBeAddedWithRAM()]
+
+    def test_matches_individual_functions(self) -> None:
+        for disk_id in range(1, 5):
+            self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(disk_id, "DELL", disk_id, 4 * disk_id, disk_id)),
+                             "Should work")
+        for photo_id in range(1, 9):
+            photo = Photo(photo_id, "Tree", photo_id)
+            self.assertEqual(ReturnValue.OK, Solution.addPhoto(photo), "Should work")
+            Solution.addPhotoToDisk(photo, 1 + photo_id % 4)
+        Solution.addRAM(RAM(1, "DELL", 3))
+        Solution.addRAM(RAM(2, "HP", 6))
+        Solution.addRAMToDisk(1, 2)
+        Solution.addRAMToDisk(1, 3)
+        Solution.addRAMToDisk(2, 3)
+        disk_ids = [1, 2, 3, 4, 5, 2]
+        summaries = Solution.getDiskSummaries(disk_ids)
+        self.assertEqual(len(disk_ids), len(summaries), "Should return one summary per id")
+        for disk_id, summary in zip(disk_ids, summaries):
+            expected = self.individual(disk_id)
+            self.assertEqual(expected, self.summarized(summary), "Should match the individual functions")
+            self.assertEqual([type(value) for value in expected],
+                             [type(value) for value in self.summarized(summary)], "Should have the same types")
+            self.assertEqual(str(Solution.averagePhotosSizeOnDisk(disk_id)), str(summary.getAveragePhotosSize()),
+                             "Should keep the scale of the average")
+        self.assertEqual(self.summarized(summaries[2]), self.summarized(Solution.getDiskSummary(3)), "Should work")
+        self.assertEqual([], Solution.getDiskSummaries([]), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
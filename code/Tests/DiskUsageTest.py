@@ -0,0 +1,55 @@
+import random
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    @staticmethod
+    def usage():
+        return Test.rows('SELECT disk_id, used_bytes, photos FROM "DiskUsage" ORDER BY disk_id')
+
+    def test_usage_follows_writes(self) -> None:
+        rnd = random.Random(11)
+        photos = [Photo(photo_id, "Tree", rnd.randint(0, 20)) for photo_id in range(1, 31)]
+        sizes = {photo.getPhotoID(): photo.getSize() for photo in photos}
+        Solution.addDisks([Disk(disk_id, "DELL", 1, 1000, 1) for disk_id in range(1, 11)])
+        Solution.addPhotos(photos)
+        self.assertEqual([], Solution.getDisksContainingTheMostData(), "Disks without photos should not be listed")
+        links = set()
+        for photo in photos[:15]:
+            disk_id = rnd.randint(1, 10)
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(photo, disk_id), "Should work")
+            links.add((photo.getPhotoID(), disk_id))
+        links |= self.place([(photo, rnd.randint(1, 10)) for photo in photos])
+        self.assertEqual(self.disk_usage(links, sizes), self.usage(), "Should follow placements")
+        most = self.most_data_disks(links, sizes)
+        self.assertEqual(most[:5], Solution.getDisksContainingTheMostData(), "Should work")
+        self.assertEqual(most[:3], Solution.getDisksContainingTheMostData(3), "Should work")
+        self.assertEqual(most[:20], Solution.getDisksContainingTheMostData(k=20), "Should work")
+
+        for photo_id, disk_id in sorted(links)[:8]:
+            Solution.removePhotoFromDisk(photos[photo_id - 1], disk_id)
+            links.discard((photo_id, disk_id))
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(photos[20]), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.deleteDisk(4), "Should work")
+        links = {(photo_id, disk_id) for photo_id, disk_id in links if photo_id != 21 and disk_id != 4}
+        self.assertEqual(self.disk_usage(links, sizes), self.usage(), "Should follow deletes")
+        most = self.most_data_disks(links, sizes)
+        self.assertEqual(most[:5], Solution.getDisksContainingTheMostData(), "Should work")
+        with Solution.batch() as reads:
+            top = reads.getDisksContainingTheMostData()
+            top_two = reads.getDisksContainingTheMostData(2)
+        self.assertEqual(most[:5], top.result(), "Should work in a batch")
+        self.assertEqual(most[:2], top_two.result(), "Should work in a batch")
+
+        self.execute('DELETE FROM "DiskUsage" WHERE disk_id = 1; UPDATE "DiskUsage" SET used_bytes = 0')
+        self.assertEqual(ReturnValue.OK, Solution.rebuildDiskUsage(), "Should work")
+        self.assertEqual(self.disk_usage(links, sizes), self.usage(), "Should be rebuilt")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,96 @@
+import threading
+import unittest
+import Solution
+from GroupCommit import GroupCommitWriter
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+class Test(AbstractTest):
+    def test_results_per_call(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 10, 10, 1), Disk(2, "HP", 10, 100, 1)])
+        Solution.addPhotos([Photo(photo_id, "Tree", 4) for photo_id in range(1, 5)])
+        Solution.addRAM(RAM(1, "DELL", 5))
+        with GroupCommitWriter(maxBatch=50, maxDelay=0.05) as writer:
+            futures = [writer.addPhotoToDisk(Photo(1, "Tree", 4), 1),
+                       writer.addPhotoToDisk(Photo(1, "Tree", 4), 1),
+                       writer.addPhotoToDisk(Photo(2, "Tree", 4), 1),
+                       writer.addPhotoToDisk(Photo(3, "Tree", 4), 1),
+                       writer.addPhotoToDisk(Photo(9, "Tree", 4), 1),
+                       writer.addRAMToDisk(1, 2),
+                       writer.addRAMToDisk(1, 2),
+                       writer.removePhotoFromDisk(Photo(2, "Tree", 4), 1),
+                       writer.addPhotoToDisk(Photo(3, "Tree", 4), 1),
+                       writer.addPhoto(Photo(1, "Sky", 1)),
+                       writer.deletePhoto(Photo(4, "Tree", 4))]
+            results = [future.result(timeout=10) for future in futures]
+        self.assertEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.OK, ReturnValue.BAD_PARAMS,
+                          ReturnValue.NOT_EXISTS, ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.OK,
+                          ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.OK], results,
+                         "Every call should get the result it would get on its own")
+        self.assertEqual(2, Solution.getDiskByID(1).getFreeSpace(), "Should be committed")
+        self.assertEqual(5, Solution.getTotalRamOnDisk(2), "Should be committed")
+        self.assertEqual(None, Solution.getPhotoByID(4).getPhotoID(), "Should be committed")
+        self.assertEqual(11, writer.stats()['calls'], "Should work")
+        self.assertEqual(0, writer.stats()['failedCommits'], "Should work")
+        with self.assertRaises(RuntimeError):
+            writer.addPhoto(Photo(5, "Tree", 1))
+        with self.assertRaises(AttributeError):
+            GroupCommitWriter.__getattr__(writer, "getPhotoByID")
+
+    def test_threads_share_batches(self) -> None:
+        Solution.addDisks([Disk(disk_id, "DELL", 10, 1000, 1) for disk_id in range(1, 5)])
+        Solution.addPhotos([Photo(photo_id, "Tree", 1) for photo_id in range(1, 201)])
+        results = {}
+
+        def place(worker):
+            for photo_id in range(worker, 201, 8):
+                disk_id = 1 + photo_id % 4
+                results[(photo_id, disk_id)] = writer.addPhotoToDisk(Photo(photo_id, "Tree", 1), disk_id).result()
+
+        with GroupCommitWriter(maxBatch=20, maxDelay=0.01) as writer:
+            threads = [threading.Thread(target=place, args=(worker,)) for worker in range(1, 9)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual({ReturnValue.OK}, set(results.values()), "Should work")
+        self.assertEqual(200, len(results), "Should work")
+        self.assertEqual([950] * 4, [Solution.getDiskByID(disk_id).getFreeSpace() for disk_id in range(1, 5)],
+                         "Should be committed")
+        self.assertLess(writer.stats()['batches'], 200, "Calls of different threads should share batches")
+
+
+    def test_failing_calls_stay_alone(self) -> None:
+        Solution.addDisk(Disk(1, "DELL", 10, 100, 1))
+        Solution.addPhotos([Photo(photo_id, "Tree", 1) for photo_id in range(1, 4)])
+        # the batch stays open long enough for the cancel below to reach a queued call
+        with GroupCommitWriter(maxBatch=50, maxDelay=0.5) as writer:
+            with self.assertRaises(TypeError):
+                writer.addPhoto()
+            futures = [writer.addPhoto(Photo(4, "Sky", 1)),
+                       writer.addPhoto(None),
+                       writer.addPhotoToDisk(Photo(1, "Tree", 1), 1),
+                       writer.addPhotoToDisk(None, 1),
+                       writer.addPhotoToDisk(Photo(2, "Tree", 1), 1),
+                       writer.addPhoto(Photo(5, "Sky", 1))]
+            cancelled = writer.addPhoto(Photo(6, "Sky", 1))
+            self.assertTrue(cancelled.cancel(), "A queued call should be cancellable")
+            self.assertEqual(ReturnValue.OK, futures[0].result(timeout=10), "Should work")
+            self.assertRaises(AttributeError, futures[1].result, 10)
+            self.assertEqual(ReturnValue.OK, futures[2].result(timeout=10), "Should work")
+            self.assertRaises(AttributeError, futures[3].result, 10)
+            self.assertEqual([ReturnValue.OK] * 2, [future.result(timeout=10) for future in futures[4:]],
+                             "Should work")
+            self.assertEqual(ReturnValue.OK, writer.addPhoto(Photo(7, "Sky", 1)).result(timeout=10),
+                             "The writer should survive cancelled and failing calls")
+        self.assertEqual([4, 5, None, 7], [Solution.getPhotoByID(photo_id).getPhotoID() for photo_id in (4, 5, 6, 7)],
+                         "Should be committed")
+        self.assertEqual(98, Solution.getDiskByID(1).getFreeSpace(), "Should be committed")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
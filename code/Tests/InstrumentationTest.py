@@ -0,0 +1,69 @@
+import unittest
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.Instrumentation import Recorder, SlowQueryLog
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.recorder = DBConnector.addHook(Recorder())
+
+    def tearDown(self) -> None:
+        DBConnector.removeHook(self.recorder)
+        super().tearDown()
+
+    def test_statements_are_named_after_the_api_function(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+        self.assertEqual(1, Solution.getPhotoByID(1).getPhotoID(), "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(1, "Tree", 4)), "Should work")
+        queries = self.recorder.snapshot()['queries']
+        self.assertEqual(2, queries['addPhoto']['count'], "Should record every execution")
+        self.assertEqual({'UNIQUE_VIOLATION': 1}, queries['addPhoto']['errors'], "Should record the error class")
+        self.assertEqual(1, queries['getPhotoByID']['rows'], "Should count the fetched rows")
+        self.assertLess(0, queries['getPhotoByID']['bytesReceived'], "Should estimate the result size")
+        # deletePhoto runs through the generic delete helper
+        self.assertIn('deletePhoto', queries, "Helpers should be attributed to their caller")
+        self.assertLessEqual(4, self.recorder.snapshot()['acquire']['count'], "Should time connecting")
+
+    def test_slow_query_log(self) -> None:
+        slow = DBConnector.addHook(SlowQueryLog(threshold=0.0))
+        try:
+            self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+            self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+            self.assertEqual([], Solution.getClosePhotos(1), "Should work")
+        finally:
+            DBConnector.removeHook(slow)
+        plans = {name: plan for name, _, _, plan in slow.entries}
+        self.assertIsNone(plans['addDisk'], "Writes should not be explained")
+        self.assertIn("Buffers", plans['getDiskByID'], "SELECTs should be explained with buffers")
+        self.assertIn("Buffers", plans['getClosePhotos'], "Reads starting with WITH should be explained too")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Explaining should not change anything")
+
+    def test_slow_cte_query(self) -> None:
+        Solution.addPhoto(Photo(1, "Tree", 4))
+        read = 'WITH slow AS (SELECT pg_sleep(0.05)) SELECT count(*) FROM slow'
+        write = 'WITH gone AS (DELETE FROM "Photo" WHERE id = 1 RETURNING id) SELECT count(*), pg_sleep(0.05) FROM gone'
+        slow = DBConnector.addHook(SlowQueryLog(threshold=0.04))
+        try:
+            with DBConnector() as conn:
+                conn.execute(read)
+                conn.execute(write)
+                conn.commit()
+        finally:
+            DBConnector.removeHook(slow)
+        plans = {statement: plan for _, _, statement, plan in slow.entries}
+        self.assertEqual({read, write}, set(plans), "Only the sleeping statements are slow")
+        self.assertIn("CTE slow", plans[read], "A read starting with WITH should be explained")
+        self.assertIsNone(plans[write], "A WITH that deletes should not be explained")
+        self.assertIsNone(Solution.getPhotoByID(1).getPhotoID(), "The delete should run once")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
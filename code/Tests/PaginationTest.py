@@ -0,0 +1,81 @@
+import random
+import unittest
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        rnd = random.Random(9)
+        self.disks = [Disk(disk_id, "DELL", rnd.randint(1, 3), rnd.randint(0, 40), 1) for disk_id in range(1, 13)]
+        self.photos = [Photo(photo_id, "Tree", rnd.randint(0, 30)) for photo_id in range(1, 41)]
+        self.ram = {disk.getDiskID(): 0 for disk in self.disks}
+        Solution.addDisks(self.disks)
+        Solution.addPhotos(self.photos)
+        for ram_id, disk in enumerate(self.disks[:8], 1):
+            Solution.addRAM(RAM(ram_id, "DELL", 3 * ram_id))
+            Solution.addRAMToDisk(ram_id, disk.getDiskID())
+            self.ram[disk.getDiskID()] = 3 * ram_id
+        self.links = set()
+        for photo in self.photos[:30]:
+            for disk_id in rnd.sample(range(1, 13), 3):
+                if Solution.addPhotoToDisk(photo, disk_id) == ReturnValue.OK:
+                    self.links.add((photo.getPhotoID(), disk_id))
+        self.free = {disk.getDiskID(): Solution.getDiskByID(disk.getDiskID()).getFreeSpace() for disk in self.disks}
+
+    def fitting(self, disk_id, with_ram=False):
+        return [photo.getPhotoID() for photo in self.photos if photo.getSize() <= self.free[disk_id] and
+                (not with_ram or photo.getSize() <= self.ram[disk_id])]
+
+    def check(self, expected, paged, page, limited, params=()):
+        self.assertEqual(expected, list(paged(*params, pageSize=3)), "Should list everything in order")
+        self.assertEqual(expected, list(paged(*params)), "Should work with one page")
+        self.assertEqual(expected[:len(limited(*params))], limited(*params), "Should start like the LIMIT read")
+        ids, after = page(*params, pageSize=4)
+        self.assertEqual(expected[:4], ids, "Should work")
+        if after is None:
+            self.assertLess(len(expected), 4, "Only the last page should have no token")
+            return
+        self.assertEqual(expected[4:8], page(*params, after=after, pageSize=4)[0], "Should continue after the token")
+        self.assertEqual(expected[4:], list(paged(*params, pageSize=2, after=after)), "Should resume from a token")
+
+    def test_pages(self) -> None:
+        self.check_pages()
+
+    # pooled connections run the statements PREPAREd, with parameter types inferred by the server
+    def test_pages_pooled(self) -> None:
+        DBConnector.enablePool(minSize=1, maxSize=2)
+        try:
+            self.check_pages()
+        finally:
+            DBConnector.disablePool()
+
+    def check_pages(self) -> None:
+        for disk_id in (1, 5, 12):
+            self.check(sorted(self.fitting(disk_id), reverse=True), Solution.getPhotosCanBeAddedToDiskPaged,
+                       Solution.getPhotosCanBeAddedToDiskPage, Solution.getPhotosCanBeAddedToDisk, (disk_id,))
+            self.check(sorted(self.fitting(disk_id, True)), Solution.getPhotosCanBeAddedToDiskAndRAMPaged,
+                       Solution.getPhotosCanBeAddedToDiskAndRAMPage, Solution.getPhotosCanBeAddedToDiskAndRAM,
+                       (disk_id,))
+        sizes = {photo.getPhotoID(): photo.getSize() for photo in self.photos}
+        self.check(self.most_data_disks(self.links, sizes),
+                   Solution.getDisksContainingTheMostDataPaged, Solution.getDisksContainingTheMostDataPage,
+                   Solution.getDisksContainingTheMostData)
+        speed = {disk.getDiskID(): disk.getSpeed() for disk in self.disks}
+        self.check(sorted(speed, key=lambda disk_id: (-len(self.fitting(disk_id)), -speed[disk_id], disk_id)),
+                   Solution.mostAvailableDisksPaged, Solution.mostAvailableDisksPage, Solution.mostAvailableDisks)
+        for photo_id in (1, 7, 35):
+            expected = self.close_photos(photo_id, [photo.getPhotoID() for photo in self.photos], self.links)
+            self.check(expected, Solution.getClosePhotosPaged, Solution.getClosePhotosPage, Solution.getClosePhotos,
+                       (photo_id,))
+        self.assertEqual(([], None), Solution.getClosePhotosPage(1, after=(10 ** 9,)), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
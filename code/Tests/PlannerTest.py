@@ -0,0 +1,67 @@
+import random
+import unittest
+import Planner
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+class Test(AbstractTest):
+    # the planner's rules applied one photo at a time
+    @staticmethod
+    def reference(photos, disks, strategy, objective, respect_ram, ram):
+        disks = Planner.preference(disks, objective)
+        free = {disk.getDiskID(): disk.getFreeSpace() for disk in disks}
+        placements, unplaced = [], []
+        for photo in sorted(photos, key=lambda photo: -photo.getSize()):
+            fits = [disk.getDiskID() for disk in disks if free[disk.getDiskID()] >= photo.getSize() and
+                    (not respect_ram or ram.get(disk.getDiskID(), 0) >= photo.getSize())]
+            if strategy == "best-fit":
+                fits.sort(key=lambda disk_id: free[disk_id])
+            if fits:
+                free[fits[0]] -= photo.getSize()
+                placements.append((photo, fits[0]))
+            else:
+                unplaced.append(photo)
+        return placements, unplaced
+
+    def test_matches_reference(self) -> None:
+        rnd = random.Random(2)
+        for _ in range(20):
+            disks = [Disk(disk_id, "DELL", rnd.randint(1, 5), rnd.randint(0, 60), rnd.randint(1, 5))
+                     for disk_id in range(1, rnd.randint(2, 12))]
+            ram = {disk.getDiskID(): rnd.randint(0, 20) for disk in disks}
+            photos = [Photo(photo_id, "Tree", rnd.randint(0, 15)) for photo_id in range(1, rnd.randint(2, 60))]
+            for strategy in Planner.STRATEGIES:
+                for objective in Planner.OBJECTIVES:
+                    for respect_ram in (False, True):
+                        plan = Planner.plan(photos, disks, strategy, objective, respect_ram, ram)
+                        expected = self.reference(photos, disks, strategy, objective, respect_ram, ram)
+                        self.assertEqual(expected, (plan.placements, plan.unplaced), "Should follow the rules")
+        self.assertRaises(ValueError, Planner.plan, [], [], "worst-fit")
+
+    def test_place_photos(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 1, 15, 3), Disk(2, "DELL", 9, 10, 1), Disk(3, "DELL", 5, 4, 2)])
+        Solution.addPhotos([Photo(photo_id, "Tree", size) for photo_id, size in enumerate([6, 5, 4, 3, 9], 1)])
+        Solution.addRAM(RAM(1, "DELL", 5))
+        Solution.addRAMToDisk(1, 1)
+        Solution.addPhotoToDisk(Photo(5, "Tree", 9), 1)
+        self.assertEqual([1, 2, 3, 4], [photo.getPhotoID() for photo in Planner.unplacedPhotos()], "Should work")
+        plan, results = Planner.placePhotos(objective="speed", respectRam=True)
+        self.assertEqual([(2, 1)], [(photo.getPhotoID(), disk_id) for photo, disk_id in plan.placements],
+                         "Only disk 1 has RAM, photos of at most 5 fit it")
+        self.assertEqual([ReturnValue.OK], results, "Should work")
+        plan, results = Planner.placePhotos(objective="speed")
+        self.assertEqual([(1, 2), (3, 2), (4, 3)],
+                         [(photo.getPhotoID(), disk_id) for photo, disk_id in plan.placements], "Should work")
+        self.assertEqual([ReturnValue.OK] * 3, results, "Should work")
+        self.assertEqual([], plan.unplaced, "Should work")
+        self.assertEqual([1, 0, 1], [Solution.getDiskByID(disk_id).getFreeSpace() for disk_id in (1, 2, 3)],
+                         "Should place the plan")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,44 @@
+import unittest
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        DBConnector.enablePool(minSize=1, maxSize=2)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        DBConnector.disablePool()
+
+    def test_connections_are_reused(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+        self.assertEqual(1, Solution.getDiskByID(1).getDiskID(), "Should work")
+        stats = DBConnector.poolStats()
+        self.assertEqual(1, stats['creates'], "Sequential calls should share one connection")
+        self.assertEqual(stats['checkouts'], stats['returns'], "Every connection should be returned")
+        self.assertEqual(0, stats['inUse'], "Every connection should be returned")
+
+    def test_close_returns_to_pool(self) -> None:
+        with DBConnector() as conn:
+            conn.execute('INSERT INTO "RAM" VALUES (1, 10, \'HP\')')
+            self.assertEqual(1, DBConnector.poolStats()['inUse'], "Connection should be borrowed")
+        # the uncommitted insert must not leak to the next borrower
+        self.assertEqual(None, Solution.getRAMByID(1).getRamID(), "Uncommitted work should be rolled back")
+        self.assertEqual(0, DBConnector.poolStats()['inUse'], "Connection should be returned")
+
+    def test_prepared_statements_are_reused(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+        for _ in range(3):
+            self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+        with DBConnector() as conn:
+            _, entries = conn.execute("SELECT name FROM pg_prepared_statements WHERE name = 'getDiskByID'")
+            self.assertEqual(1, entries.size(), "The statement should be prepared once per connection")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
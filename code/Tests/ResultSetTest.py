@@ -0,0 +1,37 @@
+import array
+import unittest
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def test_rows_and_views(self) -> None:
+        disks = [Disk(disk_id, "DELL", 10, 100 * disk_id, 10) for disk_id in range(1, 4)]
+        self.assertEqual([ReturnValue.OK] * 3, Solution.addDisks(disks), "Should work")
+        with DBConnector() as conn:
+            rows, entries = conn.execute('SELECT id, manufacturing_company, free_space FROM "Disk" ORDER BY id')
+        self.assertEqual(3, rows, "Should work")
+        self.assertEqual(3, entries.size(), "Should work")
+        self.assertEqual((1, "DELL", 100), entries.rows[0], "rows should hold the fetched tuples")
+        self.assertEqual(2, entries.cols['free_space'], "cols should map names to positions")
+        self.assertEqual(200, entries[1]['FREE_SPACE'], "Row lookups should ignore case")
+        self.assertEqual(None, entries[1][0], "Only column names index a row")
+        self.assertEqual((3, "DELL", 300), entries[2].values(), "Should work")
+        self.assertEqual({'id': 1, 'manufacturing_company': "DELL", 'free_space': 100}, entries[0], "Should work")
+        self.assertEqual([1, 2, 3], [row['id'] for row in entries], "Should iterate the rows")
+        self.assertEqual(array.array('q', [100, 200, 300]), entries.column('free_space'), "Should work")
+        self.assertEqual(["DELL"] * 3, entries.column(1), "Non-integer columns should be lists")
+        self.assertEqual(0, len(entries[3]), "An invalid row should be empty")
+
+    def test_empty(self) -> None:
+        with DBConnector() as conn:
+            _, entries = conn.execute('SELECT * FROM "Disk"')
+        self.assertTrue(entries.isEmpty(), "Should work")
+        self.assertEqual([], list(entries), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
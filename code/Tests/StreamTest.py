@@ -0,0 +1,45 @@
+import unittest
+import Solution
+from Utility.DBConnector import DBConnector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def place(self) -> None:
+        for disk_id in range(1, 4):
+            self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(disk_id, "DELL", 10, 100, 10)), "Should work")
+        photos = [Photo(photo_id, "Tree", 1) for photo_id in range(1, 6)]
+        self.assertEqual([ReturnValue.OK] * 5, Solution.addPhotos(photos), "Should work")
+        placements = [(photos[0], 1), (photos[0], 3), (photos[1], 2), (photos[2], 2), (photos[3], 1)]
+        self.assertEqual([ReturnValue.OK] * 5, Solution.addPhotosToDisks(placements), "Should work")
+
+    def test_export_in_batches(self) -> None:
+        self.assertEqual([], list(Solution.exportPhotosInDisks()), "Should work on empty tables")
+        self.place()
+        self.assertEqual([(1, 1), (1, 3), (2, 2), (3, 2), (4, 1)], list(Solution.exportPhotosInDisks(batchSize=2)),
+                         "Should stream every link in photo order")
+
+    def test_streamed_conflicts(self) -> None:
+        self.assertEqual([], Solution.getConflictingDisksStreamed(), "Should work")
+        self.place()
+        self.assertEqual(Solution.getConflictingDisks(), Solution.getConflictingDisksStreamed(batchSize=1),
+                         "Should match the server-side computation")
+        self.assertEqual([1, 3], Solution.getConflictingDisksStreamed(), "Should work")
+
+    def test_stream_rows(self) -> None:
+        self.place()
+        with DBConnector() as conn:
+            with conn.stream('SELECT photo_id, disk_id FROM "PhotoInDisk" ORDER BY photo_id, disk_id', 2) as rows:
+                streamed = [(row['Photo_ID'], row['disk_id']) for row in rows]
+            self.assertEqual(['photo_id', 'disk_id'], rows.cols_header, "Should expose the columns")
+            self.assertEqual(5, rows.rowsFetched, "Should count the fetched rows")
+            _, entries = conn.execute('SELECT photo_id, disk_id FROM "PhotoInDisk" ORDER BY photo_id, disk_id')
+            self.assertEqual([(row['photo_id'], row['disk_id']) for row in entries], streamed,
+                             "Streaming should return the same rows as execute")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,94 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+class Test(AbstractTest):
+    def tearDown(self) -> None:
+        super().tearDown()
+        Solution.disableEntityCache()
+        Solution.disableCoLocationIndex()
+
+    # what another connection sees, outside any unit of work
+    @staticmethod
+    def committed_photos():
+        return [row[0] for row in Test.rows('SELECT id FROM "Photo" ORDER BY id')]
+
+    def test_calls_commit_together(self) -> None:
+        with Solution.transaction() as unit:
+            self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+            self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addPhoto(Photo(1, "Tree", 4)),
+                             "A failing call keeps its own result")
+            self.assertEqual(ReturnValue.BAD_PARAMS, Solution.addPhoto(Photo(2, "Sky", -1)), "Should work")
+            self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(3, "Sky", 2)), "Calls after a failure still run")
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(1, "Tree", 4), 1), "Should work")
+            self.assertEqual(6, Solution.getDiskByID(1).getFreeSpace(), "Should read its own writes")
+            self.assertEqual([3, 1], Solution.getPhotosCanBeAddedToDisk(1), "Should read its own writes")
+            self.assertEqual([], self.committed_photos(), "Nothing is visible before the unit commits")
+        self.assertTrue(unit.committed, "Should be committed")
+        self.assertEqual([1, 3], self.committed_photos(), "Should be visible once committed")
+        self.assertEqual(6, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+
+    def test_rollback(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+        with self.assertRaises(KeyError):
+            with Solution.transaction():
+                self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(2, "Sky", 2)), "Should work")
+                self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(1, "Tree", 4)), "Should work")
+                raise KeyError("abort")
+        self.assertEqual([1], self.committed_photos(), "An exception should roll every call back")
+
+        with Solution.transaction() as unit:
+            self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(2, "Sky", 2)), "Should work")
+            with Solution.transaction() as nested:
+                self.assertIs(unit, nested, "A nested transaction should join the enclosing unit")
+                self.assertEqual(ReturnValue.OK, Solution.addRAM(RAM(1, "DELL", 5)), "Should work")
+            unit.setRollbackOnly()
+        self.assertFalse(unit.committed, "Should be rolled back")
+        self.assertEqual([1], self.committed_photos(), "Should be rolled back")
+        self.assertEqual(None, Solution.getRAMByID(1).getRamID(), "Should be rolled back")
+
+    def test_add_disk_and_photo(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+        with Solution.transaction():
+            self.assertEqual(ReturnValue.OK, Solution.addDiskAndPhoto(Disk(1, "DELL", 10, 10, 10), Photo(2, "Sky", 1)),
+                             "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS,
+                             Solution.addDiskAndPhoto(Disk(2, "HP", 1, 1, 1), Photo(1, "Tree", 4)), "Should work")
+            self.assertEqual(None, Solution.getDiskByID(2).getDiskID(), "The failed call should be undone alone")
+        self.assertEqual(1, Solution.getDiskByID(1).getDiskID(), "Should be committed")
+        self.assertEqual(None, Solution.getDiskByID(2).getDiskID(), "Should not be committed")
+        self.assertEqual(ReturnValue.ALREADY_EXISTS,
+                         Solution.addDiskAndPhoto(Disk(2, "HP", 1, 1, 1), Photo(1, "Tree", 4)), "Should work")
+        self.assertEqual(None, Solution.getDiskByID(2).getDiskID(), "Should be rolled back")
+
+    def test_side_effects_after_commit(self) -> None:
+        Solution.enableEntityCache(maxSize=10, ttl=60.0)
+        Solution.enableCoLocationIndex()
+        Solution.addDisks([Disk(disk_id, "DELL", 10, 10, 10) for disk_id in (1, 2)])
+        Solution.addPhotos([Photo(1, "Tree", 1), Photo(2, "Tree", 1)])
+        Solution.addPhotoToDisk(Photo(1, "Tree", 1), 1)
+        self.assertEqual(9, Solution.getDiskByID(1).getFreeSpace(), "Should be cached")
+
+        with Solution.transaction() as unit:
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(2, "Tree", 1), 1), "Should work")
+            self.assertEqual(8, Solution.getDiskByID(1).getFreeSpace(), "Should not be served from the cache")
+            unit.setRollbackOnly()
+        self.assertEqual(9, Solution.getDiskByID(1).getFreeSpace(), "Uncommitted rows should not be cached")
+        self.assertEqual([], Solution.getClosePhotos(1), "A rolled back link should not reach the index")
+
+        with Solution.transaction():
+            self.assertEqual([ReturnValue.OK], Solution.addPhotosToDisks([(Photo(2, "Tree", 1), 1)]), "Should work")
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(2, "Tree", 1), 2), "Should work")
+            self.assertEqual(ReturnValue.OK, Solution.removePhotoFromDisk(Photo(2, "Tree", 1), 2), "Should work")
+        self.assertEqual(8, Solution.getDiskByID(1).getFreeSpace(), "Should be invalidated on commit")
+        self.assertEqual([2], Solution.getClosePhotos(1), "Committed links should reach the index")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -1,5 +1,7 @@
 import unittest
 import Solution
+from Utility.DBConnector import DBConnector
+from Utility.ReturnValue import ReturnValue
 
 
 class AbstractTest(unittest.TestCase):
@@ -10,3 +12,53 @@ class AbstractTest(unittest.TestCase):
     # after each test, tearDown is executed
     def tearDown(self) -> None:
         Solution.dropTables()
+
+    # the rows of a query, read behind Solution's back
+    @staticmethod
+    def rows(query) -> list:
+        with DBConnector() as conn:
+            _, entries = conn.execute(query)
+        return entries.rows
+
+    # runs and commits statements behind Solution's back
+    @staticmethod
+    def execute(query) -> None:
+        with DBConnector() as conn:
+            conn.execute(query)
+            conn.commit()
+
+    # the (photo_id, disk_id) links of the placements addPhotosToDisks accepted
+    @staticmethod
+    def place(placements) -> set:
+        return {(photo.getPhotoID(), disk_id)
+                for (photo, disk_id), result in zip(placements, Solution.addPhotosToDisks(placements))
+                if result == ReturnValue.OK}
+
+    # the reference answers below are computed in python from (photo_id, disk_id) links
+
+    # (disk_id, used_bytes, photos) of every disk holding a photo, sizes maps photo_id to size
+    @staticmethod
+    def disk_usage(links, sizes) -> list:
+        usage = {}
+        for photo_id, disk_id in links:
+            used, photos = usage.get(disk_id, (0, 0))
+            usage[disk_id] = (used + sizes[photo_id], photos + 1)
+        return [(disk_id, used, photos) for disk_id, (used, photos) in sorted(usage.items())]
+
+    # the disks holding a photo, most data first
+    @staticmethod
+    def most_data_disks(links, sizes) -> list:
+        usage = AbstractTest.disk_usage(links, sizes)
+        return [disk_id for disk_id, _, _ in sorted(usage, key=lambda row: (-row[1], row[0]))]
+
+    # getClosePhotos as the assignment defines it, before its limit of 10
+    @staticmethod
+    def close_photos(photo_id, photo_ids, links) -> list:
+        disks = {disk_id for linked, disk_id in links if linked == photo_id}
+        if not disks:
+            return sorted(other for other in photo_ids if other != photo_id)
+        shared = {}
+        for other, disk_id in links:
+            if other != photo_id and disk_id in disks:
+                shared[other] = shared.get(other, 0) + 1
+        return sorted(other for other, count in shared.items() if count >= len(disks) * 0.5)
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# thread-safe LRU cache with an optional time-to-live per entry and hit/miss/eviction counters.
+# every invalidation bumps a generation counter; a reader that loaded a value from the database passes the
+# generation it saw before loading to put(), so a value read before a concurrent write is never cached after it
+class LRUCache:
+    MISSING = object()
+
+    def __init__(self, maxSize: int = 10000, ttl: float = None):
+        if maxSize < 1:
+            raise ValueError("maxSize must be positive")
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__generation = 0
+        self.__stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    # the cached value for key, or LRUCache.MISSING
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__stats['misses'] += 1
+                return LRUCache.MISSING
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self.__entries[key]
+                self.__stats['expirations'] += 1
+                self.__stats['misses'] += 1
+                return LRUCache.MISSING
+            self.__entries.move_to_end(key)
+            self.__stats['hits'] += 1
+            return value
+
+    def generation(self) -> int:
+        return self.__generation
+
+    # cache value unless something was invalidated since generation was read
+    def put(self, key, value, generation: int = None):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.__lock:
+            if generation is not None and generation != self.__generation:
+                return
+            self.__entries[key] = (value, expires)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxSize:
+                self.__entries.popitem(last=False)
+                self.__stats['evictions'] += 1
+
+    def invalidate(self, *keys):
+        with self.__lock:
+            self.__generation += 1
+            for key in keys:
+                if self.__entries.pop(key, None) is not None:
+                    self.__stats['invalidations'] += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__generation += 1
+            self.__stats['invalidations'] += len(self.__entries)
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['size'] = len(self.__entries)
+            return stats
@@ -0,0 +1,121 @@
+import bisect
+import heapq
+import itertools
+import threading
+
+
+# in-process inverted index of "PhotoInDisk": disk id -> sorted ids of the photos on it, and photo id -> its disks.
+# closePhotos() merges the sorted lists of the target's disks, so a query costs the size of the target's
+# neighbourhood instead of a pass over the links.
+# the index only sees the writes reported to it; a rebuild started with beginRebuild() records the writes reported
+# while the links are read and replays them on the fresh copy in finishRebuild(), so none of them is lost
+class CoLocationIndex:
+    def __init__(self):
+        self.__disks = {}
+        self.__photos = {}
+        self.__journal = None
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __add(disks, photos, photo_id, disk_id):
+        on_disk = disks.setdefault(disk_id, [])
+        position = bisect.bisect_left(on_disk, photo_id)
+        if position == len(on_disk) or on_disk[position] != photo_id:
+            on_disk.insert(position, photo_id)
+        photos.setdefault(photo_id, set()).add(disk_id)
+
+    @staticmethod
+    def __remove(disks, photos, photo_id, disk_id):
+        on_disk = disks.get(disk_id)
+        if on_disk is not None:
+            position = bisect.bisect_left(on_disk, photo_id)
+            if position < len(on_disk) and on_disk[position] == photo_id:
+                del on_disk[position]
+            if not on_disk:
+                del disks[disk_id]
+        photo_disks = photos.get(photo_id)
+        if photo_disks is not None:
+            photo_disks.discard(disk_id)
+            if not photo_disks:
+                del photos[photo_id]
+
+    @staticmethod
+    def __removePhoto(disks, photos, photo_id):
+        for disk_id in list(photos.get(photo_id, ())):
+            CoLocationIndex.__remove(disks, photos, photo_id, disk_id)
+
+    @staticmethod
+    def __removeDisk(disks, photos, disk_id):
+        for photo_id in list(disks.get(disk_id, ())):
+            CoLocationIndex.__remove(disks, photos, photo_id, disk_id)
+
+    @staticmethod
+    def __clear(disks, photos):
+        disks.clear()
+        photos.clear()
+
+    def __apply(self, operation, *args):
+        with self.__lock:
+            operation(self.__disks, self.__photos, *args)
+            if self.__journal is not None:
+                self.__journal.append((operation, args))
+
+    def add(self, photo_id, disk_id):
+        self.__apply(CoLocationIndex.__add, photo_id, disk_id)
+
+    def remove(self, photo_id, disk_id):
+        self.__apply(CoLocationIndex.__remove, photo_id, disk_id)
+
+    def removePhoto(self, photo_id):
+        self.__apply(CoLocationIndex.__removePhoto, photo_id)
+
+    def removeDisk(self, disk_id):
+        self.__apply(CoLocationIndex.__removeDisk, disk_id)
+
+    def clear(self):
+        self.__apply(CoLocationIndex.__clear)
+
+    # call before reading the links a rebuild loads
+    def beginRebuild(self):
+        with self.__lock:
+            self.__journal = []
+
+    # replace the index with (photo_id, disk_id) links read after beginRebuild(), plus the writes since then
+    def finishRebuild(self, links):
+        disks, photos = {}, {}
+        for photo_id, disk_id in links:
+            disks.setdefault(disk_id, []).append(photo_id)
+            photos.setdefault(photo_id, set()).add(disk_id)
+        for on_disk in disks.values():
+            on_disk.sort()
+        with self.__lock:
+            for operation, args in self.__journal or ():
+                operation(disks, photos, *args)
+            self.__disks, self.__photos = disks, photos
+            self.__journal = None
+
+    def abortRebuild(self):
+        with self.__lock:
+            self.__journal = None
+
+    # the (at most limit) smallest ids of the photos sharing at least half of photo_id's disks,
+    # None when the index has photo_id on no disk
+    def closePhotos(self, photo_id, limit: int = 10):
+        with self.__lock:
+            photo_disks = self.__photos.get(photo_id)
+            if not photo_disks:
+                return None
+            needed = len(photo_disks) * 0.5
+            close = []
+            merged = heapq.merge(*(self.__disks[disk_id] for disk_id in photo_disks))
+            for other, copies in itertools.groupby(merged):
+                if other != photo_id and sum(1 for _ in copies) >= needed:
+                    close.append(other)
+                    if len(close) == limit:
+                        break
+            return close
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {'disks': len(self.__disks), 'photos': len(self.__photos),
+                    'links': sum(len(on_disk) for on_disk in self.__disks.values())}
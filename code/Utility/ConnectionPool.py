@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+from Utility.Exceptions import DatabaseException
+
+
+# a physical connection owned by a ConnectionPool together with the pool's bookkeeping for it.
+# prepared holds the names of the server-side prepared statements that live on this connection
+class PooledConnection:
+    __slots__ = ('connection', 'created', 'lastUsed', 'prepared')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = time.monotonic()
+        self.lastUsed = self.created
+        self.prepared = set()
+
+
+# thread-safe, bounded pool of psycopg2 connections.
+# connections are handed out LIFO so the warmest connection is reused first, connections idle for longer than
+# maxIdle are closed (never going below minSize), and a connection idle for longer than healthCheckAfter is
+# pinged before it is handed out again
+class ConnectionPool:
+    def __init__(self, params: dict, minSize: int = 1, maxSize: int = 10, timeout: float = 30.0,
+                 maxIdle: float = 300.0, healthCheckAfter: float = 5.0):
+        if minSize < 0 or maxSize < 1 or minSize > maxSize:
+            raise ValueError("pool bounds must satisfy 0 <= minSize <= maxSize and maxSize >= 1")
+        self.params = dict(params)
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.timeout = timeout
+        self.maxIdle = maxIdle
+        self.healthCheckAfter = healthCheckAfter
+        self.__lock = threading.Condition(threading.Lock())
+        self.__idle = deque()
+        self.__size = 0
+        self.__closed = False
+        self.__stats = {'creates': 0, 'checkouts': 0, 'returns': 0, 'waits': 0, 'waitTime': 0.0, 'timeouts': 0,
+                        'evictions': 0, 'healthCheckFailures': 0, 'discards': 0}
+        for _ in range(minSize):
+            pooled = self.__create()
+            with self.__lock:
+                self.__size += 1
+                self.__idle.append(pooled)
+
+    # borrow a connection, waiting up to timeout seconds when the pool is exhausted
+    def acquire(self, timeout: float = None) -> PooledConnection:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None
+        while True:
+            pooled = None
+            with self.__lock:
+                while True:
+                    if self.__closed:
+                        raise DatabaseException.ConnectionInvalid("Connection pool is closed")
+                    self.__evictIdle()
+                    if self.__idle:
+                        pooled = self.__idle.pop()
+                        break
+                    if self.__size < self.maxSize:
+                        # reserve the slot now, connect outside the lock
+                        self.__size += 1
+                        break
+                    now = time.monotonic()
+                    if deadline is None:
+                        deadline = now + timeout
+                        self.__stats['waits'] += 1
+                    if now >= deadline:
+                        self.__stats['timeouts'] += 1
+                        raise DatabaseException.ConnectionInvalid("Timed out waiting for a pooled connection")
+                    self.__lock.wait(deadline - now)
+                    self.__stats['waitTime'] += time.monotonic() - now
+            if pooled is None:
+                try:
+                    pooled = self.__create()
+                except Exception:
+                    self.__forget()
+                    raise
+            elif not self.__healthy(pooled):
+                self.__discard(pooled, 'healthCheckFailures')
+                continue
+            with self.__lock:
+                self.__stats['checkouts'] += 1
+            return pooled
+
+    # give a connection back; any open transaction is rolled back so the next borrower starts clean
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        connection = pooled.connection
+        if not discard and not connection.closed:
+            try:
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                if connection.autocommit:
+                    connection.autocommit = False
+            except Exception:
+                discard = True
+        if discard or connection.closed:
+            self.__discard(pooled, 'discards')
+            return
+        pooled.lastUsed = time.monotonic()
+        with self.__lock:
+            self.__stats['returns'] += 1
+            if self.__closed:
+                self.__size -= 1
+                connection.close()
+            else:
+                self.__idle.append(pooled)
+            self.__lock.notify()
+
+    # borrow a raw connection for the duration of a with block
+    @contextmanager
+    def connection(self, timeout: float = None):
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled.connection
+        except BaseException:
+            self.release(pooled, discard=pooled.connection.closed != 0)
+            raise
+        self.release(pooled)
+
+    # snapshot of the pool counters
+    def stats(self) -> dict:
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['size'] = self.__size
+            stats['idle'] = len(self.__idle)
+            stats['inUse'] = self.__size - len(self.__idle)
+            return stats
+
+    # close every idle connection; connections still borrowed are closed when they are returned
+    def closeAll(self):
+        with self.__lock:
+            self.__closed = True
+            idle, self.__idle = list(self.__idle), deque()
+            self.__size -= len(idle)
+            self.__lock.notify_all()
+        for pooled in idle:
+            pooled.connection.close()
+
+    def __create(self) -> PooledConnection:
+        connection = psycopg2.connect(**self.params)
+        connection.autocommit = False
+        with self.__lock:
+            self.__stats['creates'] += 1
+        return PooledConnection(connection)
+
+    def __healthy(self, pooled: PooledConnection) -> bool:
+        connection = pooled.connection
+        if connection.closed:
+            return False
+        if time.monotonic() - pooled.lastUsed < self.healthCheckAfter:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def __discard(self, pooled: PooledConnection, reason: str):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+        with self.__lock:
+            self.__stats[reason] += 1
+        self.__forget()
+
+    def __forget(self):
+        with self.__lock:
+            self.__size -= 1
+            self.__lock.notify()
+
+    # must be called with the lock held; the oldest idle connections sit at the left end of the deque
+    def __evictIdle(self):
+        now = time.monotonic()
+        while self.__idle and self.__size > self.minSize and now - self.__idle[0].lastUsed > self.maxIdle:
+            pooled = self.__idle.popleft()
+            self.__size -= 1
+            self.__stats['evictions'] += 1
+            try:
+                pooled.connection.close()
+            except Exception:
+                pass
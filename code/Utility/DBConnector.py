@@ -2,9 +2,21 @@ import psycopg2
 from psycopg2 import errors, sql
 from configparser import ConfigParser
 from Utility.Exceptions import DatabaseException
+from Utility.ConnectionPool import ConnectionPool
+import Utility.Instrumentation as Instrumentation
+import array
+import io
+import itertools
+import logging
 import os
-from typing import Union
-from typing import Tuple
+import select
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+import re
+from typing import NamedTuple, Union
+from typing import List, Tuple
 
 class ResultSetDict(dict):
     def __getitem__(self, item):
@@ -13,17 +25,78 @@ class ResultSetDict(dict):
         return super().__getitem__(item.lower())
 
 
+# read-only view of one row of a ResultSet, indexed by column name like ResultSetDict (case-insensitive, None for
+# a key that is not a str) but backed by the fetched tuple and the ResultSet's column map instead of a new dict
+class ResultRow:
+    __slots__ = ('__values', '__cols')
+
+    def __init__(self, values: tuple, cols: dict):
+        self.__values = values
+        self.__cols = cols
+
+    def __getitem__(self, item):
+        if type(item) is not str:
+            return None
+        return self.__values[self.__cols[item.lower()]]
+
+    def get(self, item, default=None):
+        if type(item) is not str or item.lower() not in self.__cols:
+            return default
+        return self[item]
+
+    # the values in column order, the fetched tuple itself
+    def values(self) -> tuple:
+        return self.__values
+
+    def keys(self):
+        return self.__cols.keys()
+
+    # a repeated column name maps to its last occurrence, as it did in ResultSetDict
+    def items(self):
+        values = self.__values
+        return ((col, values[index]) for col, index in self.__cols.items())
+
+    def __iter__(self):
+        return iter(self.__cols)
+
+    def __len__(self):
+        return len(self.__cols)
+
+    def __contains__(self, item):
+        return type(item) is str and item.lower() in self.__cols
+
+    def __eq__(self, other):
+        if isinstance(other, (ResultRow, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __str__(self):
+        return str(dict(self.items()))
+
+    __repr__ = __str__
+
+
 class ResultSet:
-    # constructor
+    __slots__ = ('rows', 'cols_header', 'cols', '__columns')
+    __NO_COLS = ResultSetDict()
+
+    # constructor, results (the list returned by fetchall) is kept as is, not copied
     def __init__(self, description=None, results=None):
         self.rows = []
         self.cols_header = []
         self.cols = ResultSetDict()
+        self.__columns = None
         self.__fromQuery(description, results)
 
     def __getitem__(self, row):
         return self.__getRow(row)
 
+    # iterate the rows, each as a ResultRow like ResultSet[i]
+    def __iter__(self):
+        cols = self.cols
+        for values in self.rows:
+            yield ResultRow(values, cols)
+
     # so you can use print(ResultSet)
     def __str__(self):
         string = ""
@@ -44,46 +117,249 @@ class ResultSet:
     def isEmpty(self):
         return self.size() == 0
 
+    # every value of one column (by name or position), built on first use. a column holding only integers is
+    # an array.array('q'), 8 bytes per value instead of a list of int objects
+    def column(self, col):
+        index = self.cols[col] if type(col) is str else col
+        if self.__columns is None:
+            self.__columns = {}
+        column = self.__columns.get(index)
+        if column is None:
+            values = [row[index] for row in self.rows]
+            if all(type(value) is int for value in values):
+                try:
+                    values = array.array('q', values)
+                except OverflowError:
+                    pass
+            column = self.__columns[index] = values
+        return column
+
     def __getRow(self, row: int):
         if len(self.rows) <= row:
             print('Invalid row ' + str(row))
-            return ResultSetDict()
-        row_to_return = ResultSetDict()
-        for val, col in zip(self.rows[row], self.cols_header):
-            row_to_return[col] = val
-        return row_to_return
+            return ResultRow((), ResultSet.__NO_COLS)
+        return ResultRow(self.rows[row], self.cols)
 
     def __fromQuery(self, description, results: list):
         if results is None or len(results) == 0:  # no results
             self.cols = ResultSetDict()
         else:
-            self.rows = results.copy()
+            self.rows = results
             self.cols_header = [d.name for d in description]
             self.cols = ResultSetDict()
             for col, index in zip(self.cols_header, range(len(results[0]))):
                 self.cols[col] = index
 
 
+# the rows of a SELECT read through a server-side cursor, batchSize rows per round trip, so only one batch is held
+# in memory at a time. it can be iterated once, row by row (ResultRow, like ResultSet[i]) or batch by batch
+# (lists of tuples), and needs the DBConnector that created it to stay open with its transaction in progress.
+# cols_header and cols are filled in once the first batch has been fetched
+class StreamingResultSet:
+    def __init__(self, cursor, batchSize: int, onClose=None):
+        self.batchSize = batchSize
+        self.cols_header = []
+        self.cols = ResultSetDict()
+        self.rowsFetched = 0
+        self.fetchTime = 0.0
+        self.__cursor = cursor
+        self.__onClose = onClose
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # lists of at most batchSize tuples, the cursor is closed once the last batch was read
+    def batches(self):
+        try:
+            while self.__cursor is not None:
+                start = time.perf_counter()
+                batch = self.__cursor.fetchmany(self.batchSize)
+                self.fetchTime += time.perf_counter() - start
+                if not self.cols_header and self.__cursor.description is not None:
+                    self.cols_header = [d.name for d in self.__cursor.description]
+                    for index, col in enumerate(self.cols_header):
+                        self.cols[col] = index
+                if not batch:
+                    break
+                self.rowsFetched += len(batch)
+                yield batch
+        finally:
+            self.close()
+
+    # the rows as plain tuples
+    def tuples(self):
+        for batch in self.batches():
+            yield from batch
+
+    def __iter__(self):
+        for row in self.tuples():
+            yield ResultRow(row, self.cols)
+
+    # release the server-side cursor, also done when iteration finishes
+    def close(self):
+        cursor, self.__cursor = self.__cursor, None
+        if cursor is None:
+            return
+        try:
+            cursor.close()
+        except psycopg2.Error:
+            pass
+        if self.__onClose is not None:
+            self.__onClose(self)
+
+
+# a named query with $1, $2, ... placeholders. on a pooled connection it is PREPAREd once and then EXECUTEd with
+# the bound params, on a one-shot connection the params are inlined as literals
+class PreparedQuery(NamedTuple):
+    name: str
+    text: str
+    params: tuple = ()
+
+    PLACEHOLDER = re.compile(r"\$(\d+)")
+
+    # the same query with every $n replaced by the literal value of params[n - 1]
+    def inline(self) -> sql.Composed:
+        parts = PreparedQuery.PLACEHOLDER.split(self.text)
+        composed = [sql.SQL(parts[0])]
+        for index in range(1, len(parts), 2):
+            composed.append(sql.Literal(self.params[int(parts[index]) - 1]))
+            composed.append(sql.SQL(parts[index + 1]))
+        return sql.Composed(composed)
+
+
+# immutable connection parameters, resolved once from database.ini and the environment
+class DatabaseSettings:
+    __slots__ = ('params', 'source')
+
+    def __init__(self, params: dict, source: str):
+        object.__setattr__(self, 'params', MappingProxyType(dict(params)))
+        object.__setattr__(self, 'source', source)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("DatabaseSettings is immutable")
+
+    def __getitem__(self, key):
+        return self.params[key]
+
+    def __str__(self):
+        return ", ".join(key + "=" + ("***" if key == 'password' else str(value))
+                         for key, value in self.params.items())
+
+
 class DBConnector:
+    ENV_PREFIX = 'DB2_'
+    # the connection keys DB2_<KEY> may override; other DB2_* variables (IBM Db2 client tools set several) are
+    # not ours and must not reach psycopg2.connect
+    ENV_KEYS = frozenset(('host', 'hostaddr', 'port', 'dbname', 'database', 'user', 'password', 'passfile',
+                          'connect_timeout', 'options', 'application_name', 'sslmode', 'sslcert', 'sslkey',
+                          'sslrootcert', 'sslcrl', 'target_session_attrs'))
+
+    # process-wide pool, None while DBConnector opens a dedicated connection per instance
+    __pool = None
+    __poolLock = threading.Lock()
+    __settings = None
+    __settingsLock = threading.Lock()
+    # installed QueryHooks, replaced (never mutated) so execute can read it without locking
+    __hooks = ()
+    __hooksLock = threading.Lock()
+    # names of the server-side cursors opened by stream, unique within the process
+    __streamIds = itertools.count(1)
+    __COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
     # constructor
     def __init__(self):
+        self.__owner = DBConnector.__pool
+        self.__pooled = None
+        self.__listening = False
+        start = time.perf_counter()
         try:
-            # Obtain the configuration parameters
-            params = DBConnector.__config()
-            self.connection = psycopg2.connect(**params)
-            self.connection.autocommit = False
+            if self.__owner is not None:
+                self.__pooled = self.__owner.acquire()
+                self.connection = self.__pooled.connection
+            else:
+                # Obtain the configuration parameters
+                self.connection = psycopg2.connect(**DBConnector.getSettings().params)
+                self.connection.autocommit = False
             self.cursor = self.connection.cursor()
         except Exception as e:
+            if self.__pooled is not None:
+                self.__owner.release(self.__pooled, discard=True)
+                self.__pooled = None
             self.connection = None
             self.cursor = None
             raise DatabaseException.ConnectionInvalid("Could not connect to database")
+        hooks = DBConnector.__hooks
+        if hooks:
+            elapsed = time.perf_counter() - start
+            DBConnector.__notify(hooks, "onAcquire", elapsed, self.__pooled is not None)
+
+    # so you can use "with DBConnector() as conn:", the connection is closed (or returned to the pool) on exit
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
 
-    # close connection
+    # close connection, in pooled mode the connection is returned to the pool instead
     def close(self):
+        if self.__listening and self.__pooled is not None:
+            try:
+                self.cursor.execute("UNLISTEN *")
+            except Exception:
+                self.__owner.release(self.__pooled, discard=True)
+                self.__pooled = None
+            self.__listening = False
         if self.cursor is not None:
             self.cursor.close()
-        if self.connection is not None:
+            self.cursor = None
+        if self.__pooled is not None:
+            self.__owner.release(self.__pooled)
+            self.__pooled = None
+        elif self.connection is not None:
             self.connection.close()
+        self.connection = None
+
+    # switch every DBConnector created from now on to pooled mode, see ConnectionPool for the parameters
+    @staticmethod
+    def enablePool(minSize: int = 1, maxSize: int = 10, timeout: float = 30.0, maxIdle: float = 300.0,
+                   healthCheckAfter: float = 5.0) -> ConnectionPool:
+        with DBConnector.__poolLock:
+            old = DBConnector.__pool
+            pool = ConnectionPool(DBConnector.getSettings().params, minSize=minSize, maxSize=maxSize,
+                                  timeout=timeout, maxIdle=maxIdle, healthCheckAfter=healthCheckAfter)
+            DBConnector.__pool = pool
+        if old is not None:
+            old.closeAll()
+        return pool
+
+    # go back to one dedicated connection per DBConnector and close the pool's idle connections
+    @staticmethod
+    def disablePool():
+        with DBConnector.__poolLock:
+            old, DBConnector.__pool = DBConnector.__pool, None
+        if old is not None:
+            old.closeAll()
+
+    @staticmethod
+    def getPool() -> ConnectionPool:
+        return DBConnector.__pool
+
+    # pool counters (creates, checkouts, waits, ...), None when pooling is disabled
+    @staticmethod
+    def poolStats():
+        pool = DBConnector.__pool
+        return None if pool is None else pool.stats()
+
+    # statements such as CREATE INDEX CONCURRENTLY cannot run inside a transaction block and need autocommit,
+    # a pooled connection is switched back when it is returned
+    def setAutocommit(self, autocommit: bool):
+        if self.connection is not None:
+            self.connection.autocommit = autocommit
 
     # commit connection's changes
     def commit(self):
@@ -101,24 +377,88 @@ class DBConnector:
             except Exception:
                 raise DatabaseException.ConnectionInvalid("Could not rollback changes")
 
+    # LISTEN on channel. the connection is switched to autocommit so a notification is received as soon as the
+    # transaction that sent it commits; a pooled connection stops listening when it is returned
+    def listen(self, channel: str):
+        self.setAutocommit(True)
+        self.execute(sql.SQL("LISTEN {channel}").format(channel=sql.Identifier(channel)))
+        self.__listening = True
+
+    # (channel, payload) of every notification received, waiting up to timeout seconds (None waits forever)
+    # for the first one; [] when none arrived in time
+    def notifications(self, timeout: float = None) -> List[Tuple[str, str]]:
+        try:
+            self.connection.poll()
+            if not self.connection.notifies:
+                if select.select([self.connection], [], [], timeout) == ([], [], []):
+                    return []
+                self.connection.poll()
+            received = [(notify.channel, notify.payload) for notify in self.connection.notifies]
+            del self.connection.notifies[:]
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            raise DatabaseException.ConnectionInvalid("Could not receive notifications")
+        return received
+
+    # install a QueryHook (e.g. Instrumentation.Recorder or Instrumentation.SlowQueryLog) for every connector
+    @staticmethod
+    def addHook(hook: Instrumentation.QueryHook) -> Instrumentation.QueryHook:
+        with DBConnector.__hooksLock:
+            DBConnector.__hooks = DBConnector.__hooks + (hook,)
+        return hook
+
+    @staticmethod
+    def removeHook(hook: Instrumentation.QueryHook):
+        with DBConnector.__hooksLock:
+            DBConnector.__hooks = tuple(installed for installed in DBConnector.__hooks if installed is not hook)
+
+    # a failing hook is logged and otherwise ignored, it must never change the outcome of a query
+    @staticmethod
+    def __notify(hooks, callback, *args):
+        for hook in hooks:
+            try:
+                getattr(hook, callback)(*args)
+            except Exception:
+                logging.getLogger("DB2.instrumentation").exception("query hook %r failed", hook)
+
     # executes the query, if it is SELECT you may ask to print the results with printSchema
-    # returns the number of rows effected and a ResultSet (for SELECT)
-    def execute(self, query: Union[str, sql.Composed], printSchema=False) -> Tuple[int, ResultSet]:
+    # returns the number of rows effected and a ResultSet (for SELECT).
+    # name is the logical query name reported to the installed hooks, by default the PreparedQuery's name or
+    # the calling API function (see Instrumentation.logicalName)
+    def execute(self, query: Union[str, sql.Composed, PreparedQuery], printSchema=False,
+                name: str = None) -> Tuple[int, ResultSet]:
         if self.connection is None:
             raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        hooks = DBConnector.__hooks
+        if not hooks:
+            return self.__execute(query, printSchema)
 
-        # try execute the query
+        if name is None:
+            name = query.name if isinstance(query, PreparedQuery) else Instrumentation.logicalName()
+        start = time.perf_counter()
+        error, rows, received = None, 0, 0
         try:
-            self.cursor.execute(query)
+            row_effected, entries = self.__execute(query, printSchema)
+            rows = entries.size() if self.cursor.description is not None else row_effected
+            received = Instrumentation.resultBytes(entries.rows)
+            return row_effected, entries
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            sent = (self.cursor.query if self.cursor is not None else None) or b""
+            statement = query.text if isinstance(query, PreparedQuery) else sent.decode(errors="replace")
+            DBConnector.__notify(hooks, "onQuery", Instrumentation.QueryEvent(
+                name, statement, elapsed, rows, len(sent), received, error, self, query))
+
+    def __execute(self, query, printSchema) -> Tuple[int, ResultSet]:
+        # try execute the query
+        with DBConnector.__violations():
+            if isinstance(query, PreparedQuery):
+                self.__executePrepared(query)
+            else:
+                self.cursor.execute(query)
             row_effected = max(self.cursor.rowcount, 0)
-        except errors.lookup("23502"):
-            raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
-        except errors.lookup("23503"):
-            raise DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
-        except errors.lookup("23505"):
-            raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
-        except errors.lookup("23514"):
-            raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
 
         # get entries in case of SELECT
         if self.cursor.description is not None:
@@ -132,25 +472,205 @@ class DBConnector:
 
         return row_effected, entries
 
-    # grant credentials
+    # runs a SELECT on a named server-side cursor and returns its rows as a StreamingResultSet, fetching batchSize
+    # rows per round trip. the cursor lives in the current transaction, so iterate it before commit / rollback /
+    # close. the hooks see one event per stream, reported when it is closed, with the time spent fetching
+    def stream(self, query: Union[str, sql.Composed, PreparedQuery], batchSize: int = 1000,
+               name: str = None) -> StreamingResultSet:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        hooks = DBConnector.__hooks
+        if hooks and name is None:
+            name = query.name if isinstance(query, PreparedQuery) else Instrumentation.logicalName()
+        statement = query.text if isinstance(query, PreparedQuery) else query
+        if isinstance(query, PreparedQuery):
+            query = query.inline()
+        cursor = self.connection.cursor(name="stream_%d" % next(DBConnector.__streamIds))
+        cursor.itersize = batchSize
+        start = time.perf_counter()
+        try:
+            with DBConnector.__violations():
+                cursor.execute(query)
+        except Exception:
+            cursor.close()
+            raise
+        declared = time.perf_counter() - start
+        if not hooks:
+            return StreamingResultSet(cursor, batchSize)
+
+        sent = len(cursor.query or b"")
+        if not isinstance(statement, str):
+            statement = statement.as_string(self.connection)
+
+        def report(rows: StreamingResultSet):
+            DBConnector.__notify(hooks, "onQuery", Instrumentation.QueryEvent(
+                name, statement, declared + rows.fetchTime, rows.rowsFetched, sent, 0, None, self, query))
+
+        return StreamingResultSet(cursor, batchSize, report)
+
+    # statements are only prepared on pooled connections, a one-shot connection would never reuse the plan
+    def __executePrepared(self, query: PreparedQuery):
+        if self.__pooled is None:
+            self.cursor.execute(query.inline())
+            return
+        if query.name not in self.__pooled.prepared:
+            self.cursor.execute(sql.SQL("PREPARE {name} AS ").format(name=sql.Identifier(query.name)) +
+                                sql.SQL(query.text))
+            self.__pooled.prepared.add(query.name)
+        self.cursor.execute(DBConnector.__executeStatement(query))
+
+    @staticmethod
+    def __executeStatement(query: PreparedQuery) -> sql.Composed:
+        name = sql.Identifier(query.name)
+        if query.params:
+            return sql.SQL("EXECUTE {name} ({params})").format(
+                name=name, params=sql.SQL(", ").join(sql.Literal(param) for param in query.params))
+        return sql.SQL("EXECUTE {name}").format(name=name)
+
+    # the EXPLAIN (ANALYZE, BUFFERS) output of query on this connection, None if it cannot be explained.
+    # ANALYZE runs the query, so only pass statements without side effects. the EXPLAIN runs under a savepoint,
+    # a failure does not abort the caller's transaction, and it is not reported to the hooks
+    def explain(self, query: Union[str, sql.Composed, PreparedQuery]) -> str:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        if isinstance(query, PreparedQuery):
+            prepared = self.__pooled is not None and query.name in self.__pooled.prepared
+            body = DBConnector.__executeStatement(query) if prepared else query.inline()
+        else:
+            body = sql.SQL(query) if isinstance(query, str) else query
+        savepoint = not self.connection.autocommit
+        cursor = self.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT explain_query")
+            try:
+                cursor.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS) ") + body)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except psycopg2.Error:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT explain_query")
+                return None
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT explain_query")
+            return plan
+        finally:
+            cursor.close()
+
+    # streams rows (tuples matching columns) into table with a single COPY, returns the number of rows copied.
+    # raises the same DatabaseException violations as execute
+    def copyFrom(self, table: str, columns, rows) -> int:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        query = sql.SQL("COPY {table} ({columns}) FROM STDIN").format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns))
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(DBConnector.__copyValue(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        hooks = DBConnector.__hooks
+        if not hooks:
+            with DBConnector.__violations():
+                self.cursor.copy_expert(query.as_string(self.connection), buffer)
+            return max(self.cursor.rowcount, 0)
+
+        name = Instrumentation.logicalName()
+        start = time.perf_counter()
+        error = None
+        try:
+            with DBConnector.__violations():
+                self.cursor.copy_expert(query.as_string(self.connection), buffer)
+            return max(self.cursor.rowcount, 0)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            rows = max(self.cursor.rowcount, 0) if error is None else 0
+            DBConnector.__notify(hooks, "onQuery", Instrumentation.QueryEvent(
+                name, query.as_string(self.connection), elapsed, rows, len(buffer.getvalue()), 0, error, self,
+                query))
+
+    # COPY text format: NULL is \N, and backslash, tab and newlines must be escaped
+    @staticmethod
+    def __copyValue(value) -> str:
+        if value is None:
+            return "\\N"
+        return str(value).translate(DBConnector.__COPY_ESCAPES)
+
+    # translate integrity errors raised inside the block into the matching DatabaseException
     @staticmethod
-    def __config(filename=os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini'),
-                 section='postgresql'):
+    @contextmanager
+    def __violations():
+        try:
+            yield
+        except errors.lookup("23502"):
+            raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
+        except errors.lookup("23503"):
+            raise DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
+        except errors.lookup("23505"):
+            raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
+        except errors.lookup("23514"):
+            raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
+
+    # connection parameters, resolved once per process (see reloadSettings)
+    @staticmethod
+    def getSettings() -> DatabaseSettings:
+        settings = DBConnector.__settings
+        if settings is None:
+            with DBConnector.__settingsLock:
+                if DBConnector.__settings is None:
+                    DBConnector.__settings = DBConnector.__loadSettings()
+                settings = DBConnector.__settings
+        return settings
+
+    # re-read database.ini and the environment; an enabled pool opens its new connections with the new settings
+    @staticmethod
+    def reloadSettings() -> DatabaseSettings:
+        with DBConnector.__settingsLock:
+            DBConnector.__settings = DBConnector.__loadSettings()
+            settings = DBConnector.__settings
+        pool = DBConnector.__pool
+        if pool is not None:
+            pool.params = dict(settings.params)
+        return settings
+
+    # DB2_CONFIG points at an explicit ini file, DB2_<KEY> (e.g. DB2_HOST, DB2_PASSWORD) overrides a single key
+    # of ENV_KEYS
+    @staticmethod
+    def __loadSettings(section='postgresql') -> DatabaseSettings:
+        explicit = os.environ.get(DBConnector.ENV_PREFIX + 'CONFIG')
+        if explicit:
+            candidates = [explicit]
+        else:
+            candidates = [os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini'),
+                          os.path.join(os.path.join(os.path.dirname(os.getcwd()), 'Utility'), 'database.ini'),
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database.ini')]
+        for filename in candidates:
+            db = DBConnector.__config(filename, section)
+            if db is not None:
+                break
+        else:
+            raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
+        for key, value in os.environ.items():
+            name = key[len(DBConnector.ENV_PREFIX):].lower()
+            if key.startswith(DBConnector.ENV_PREFIX) and name in DBConnector.ENV_KEYS:
+                db[name] = value
+        return DatabaseSettings(db, filename)
+
+    # grant credentials, None if the file (or its section) is missing
+    @staticmethod
+    def __config(filename, section='postgresql'):
         # create a parser
         parser = ConfigParser()
         # read config file
         parser.read(filename)
 
         # get section
+        if not parser.has_section(section):
+            return None
         db = {}
-        if parser.has_section(section):
-            params = parser.items(section)
-            for param in params:
-                db[param[0]] = param[1]
-        else:
-            # file not found
-            db = DBConnector.__config(
-                filename=os.path.join(os.path.join(os.path.dirname(os.getcwd()), 'Utility'), 'database.ini'))
-            if db is None:
-                raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
+        for param in parser.items(section):
+            db[param[0]] = param[1]
         return db
@@ -0,0 +1,180 @@
+import bisect
+import logging
+import re
+import sys
+import threading
+from collections import deque
+
+
+# one statement as seen by DBConnector: name is the logical query name (see logicalName), statement the SQL as
+# written (for a PreparedQuery its $n text), rows the rows fetched or affected, bytesSent the size of the query
+# sent to the server and bytesReceived an estimate of the result size from the text form of its values.
+# error is the exception class name, None when the statement succeeded
+class QueryEvent:
+    __slots__ = ('name', 'statement', 'wallTime', 'rows', 'bytesSent', 'bytesReceived', 'error', 'connector',
+                 'query')
+
+    def __init__(self, name, statement, wallTime, rows, bytesSent, bytesReceived, error, connector, query):
+        self.name = name
+        self.statement = statement
+        self.wallTime = wallTime
+        self.rows = rows
+        self.bytesSent = bytesSent
+        self.bytesReceived = bytesReceived
+        self.error = error
+        self.connector = connector
+        self.query = query
+
+
+# base class of the hooks installed with DBConnector.addHook, both callbacks run on the thread that executed the
+# statement, after its results were fetched and before control returns to the caller
+class QueryHook:
+    # seconds spent opening (or borrowing from the pool) the connection of a new DBConnector
+    def onAcquire(self, seconds: float, pooled: bool):
+        pass
+
+    def onQuery(self, event: QueryEvent):
+        pass
+
+
+# latency histogram with fixed, roughly logarithmic buckets (upper bounds in seconds), so recording is O(log n)
+# and the memory used does not grow with the number of statements
+class Histogram:
+    BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+              10.0, 30.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(Histogram.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(Histogram.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    # upper bound of the bucket holding the p-th percentile, the largest value seen for the overflow bucket
+    def percentile(self, p: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(Histogram.BOUNDS[index], self.max) if index < len(Histogram.BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {'count': self.count,
+                'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+                'p50_ms': self.percentile(50) * 1000,
+                'p95_ms': self.percentile(95) * 1000,
+                'p99_ms': self.percentile(99) * 1000,
+                'max_ms': self.max * 1000}
+
+
+# aggregates every statement by logical name: latency histogram, rows, bytes and errors per exception class
+class Recorder(QueryHook):
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__queries = {}
+        self.__acquire = Histogram()
+
+    def onAcquire(self, seconds: float, pooled: bool):
+        with self.__lock:
+            self.__acquire.record(seconds)
+
+    def onQuery(self, event: QueryEvent):
+        with self.__lock:
+            stats = self.__queries.get(event.name)
+            if stats is None:
+                stats = self.__queries[event.name] = {'latency': Histogram(), 'rows': 0, 'bytesSent': 0,
+                                                      'bytesReceived': 0, 'errors': {}}
+            stats['latency'].record(event.wallTime)
+            stats['rows'] += event.rows
+            stats['bytesSent'] += event.bytesSent
+            stats['bytesReceived'] += event.bytesReceived
+            if event.error is not None:
+                stats['errors'][event.error] = stats['errors'].get(event.error, 0) + 1
+
+    # {name: {count, mean_ms, p50_ms, ..., rows, bytesSent, bytesReceived, errors}} plus the acquire latencies
+    def snapshot(self) -> dict:
+        with self.__lock:
+            queries = {}
+            for name, stats in self.__queries.items():
+                summary = stats['latency'].summary()
+                summary.update(rows=stats['rows'], bytesSent=stats['bytesSent'],
+                               bytesReceived=stats['bytesReceived'], errors=dict(stats['errors']))
+                queries[name] = summary
+            return {'queries': queries, 'acquire': self.__acquire.summary()}
+
+    def reset(self):
+        with self.__lock:
+            self.__queries = {}
+            self.__acquire = Histogram()
+
+
+# logs every statement slower than threshold seconds. a slow read (see isReadOnly) is explained with
+# EXPLAIN (ANALYZE, BUFFERS) on the same connection, which runs it a second time, so keep the threshold well above
+# the typical latency.
+# the last maxEntries entries are kept in entries as (name, seconds, statement, plan or None)
+class SlowQueryLog(QueryHook):
+    def __init__(self, threshold: float = 0.1, explain: bool = True, maxEntries: int = 100,
+                 logger: logging.Logger = None):
+        self.threshold = threshold
+        self.explain = explain
+        self.entries = deque(maxlen=maxEntries)
+        self.logger = logger or logging.getLogger("DB2.slowQueries")
+
+    def onQuery(self, event: QueryEvent):
+        if event.wallTime < self.threshold:
+            return
+        plan = None
+        # EXPLAIN ANALYZE executes the statement, only do that for statements without side effects
+        if self.explain and event.error is None and isReadOnly(event.statement):
+            plan = event.connector.explain(event.query)
+        self.entries.append((event.name, event.wallTime, event.statement, plan))
+        self.logger.warning("slow query %s took %.1f ms%s", event.name, event.wallTime * 1000,
+                            "" if plan is None else "\n" + plan)
+
+
+WRITE_KEYWORD = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b")
+
+
+# a statement that only reads: a SELECT, or a WITH whose common table expressions do not write either.
+# errs on the side of not explaining, a WITH mentioning FOR UPDATE counts as a write
+def isReadOnly(statement: str) -> bool:
+    words = statement.lstrip().upper()
+    if words.startswith("SELECT"):
+        return True
+    return words.startswith("WITH") and WRITE_KEYWORD.search(words) is None
+
+
+# the logical name of the statement being executed: the first caller outside the Utility package that is not a
+# snake_case helper (add, delete, copy_chunk, ...), so statements run by Solution's generic helpers are
+# attributed to the API function that called them. falls back to the nearest caller outside Utility
+def logicalName() -> str:
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        if not frame.f_globals.get('__name__', '').startswith('Utility.'):
+            name = frame.f_code.co_name
+            if fallback is None:
+                fallback = name
+            if name != name.lower():
+                return name
+        frame = frame.f_back
+    return fallback or "<unknown>"
+
+
+# approximate size of the result on the wire, from the text form of every value
+def resultBytes(rows) -> int:
+    total = 0
+    for row in rows:
+        for value in row:
+            if value is not None:
+                total += len(value) if isinstance(value, (str, bytes)) else len(str(value))
+    return total